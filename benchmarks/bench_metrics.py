@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_season_stats
+from src.transform.metrics import DELTA_SUFFIX, METRICS, compute_metrics
+from src.utils.schema import STATS_SCHEMA, apply_dtypes
+
+N_ROWS = 1_000_000
+
+# The row-by-row baseline is timed on this many rows and scaled up; running it over a
+# million rows takes minutes
+BASELINE_ROWS = 20_000
+
+def _divide(numerator, denominator):
+    if pd.isna(numerator) or pd.isna(denominator) or denominator == 0:
+        return np.nan
+    return numerator / denominator
+
+def metrics_row_by_row(stats):
+    """
+    The notebook version: one Python dict of metrics per row, then a lookup of the
+    player's previous season for the deltas. Kept here as the baseline.
+    """
+    by_key = {}
+    for row in stats.itertuples(index=False):
+        obp = _divide(row.Hits + row.Walks + row.HitByPitch, row.AtBats + row.Walks + row.HitByPitch + row.SacrificeFlies)
+        slg = _divide(row.Hits + row.Doubles + 2 * row.Triples + 3 * row.HomeRuns, row.AtBats)
+        by_key[(row.PlayerID, row.SeasonType, row.Season)] = {
+            'AVG': _divide(row.Hits, row.AtBats),
+            'OBP': obp,
+            'SLG': slg,
+            'OPS': obp + slg,
+            'ERA': _divide(27 * row.PitchingEarnedRuns, row.TotalOutsPitched),
+            'WHIP': _divide(3 * (row.PitchingWalks + row.PitchingHits), row.TotalOutsPitched),
+            'K9': _divide(27 * row.PitchingStrikeouts, row.TotalOutsPitched),
+        }
+    rows = []
+    for (player_id, season_type, season), metrics in by_key.items():
+        previous = by_key.get((player_id, season_type, season - 1))
+        deltas = {f'{name}{DELTA_SUFFIX}': value - previous[name] if previous else np.nan for name, value in metrics.items()}
+        rows.append({'PlayerID': player_id, 'SeasonType': season_type, 'Season': season, **metrics, **deltas})
+    return pd.DataFrame(rows)
+
+def check_same(vectorized, baseline):
+    """
+    Both versions give the same metrics (to float32 precision) and the same nulls.
+    """
+    keys = ['PlayerID', 'SeasonType', 'Season']
+    merged = vectorized.astype({key: 'int64' for key in keys}).merge(
+        baseline.astype({key: 'int64' for key in keys}), on=keys, suffixes=('', '_baseline')
+    )
+    assert len(merged) == len(baseline)
+    for name in METRICS:
+        for column in (name, f'{name}{DELTA_SUFFIX}'):
+            expected = merged[f'{column}_baseline'].to_numpy(dtype='float64')
+            actual = merged[column].to_numpy(dtype='float64')
+            assert np.allclose(actual, expected, rtol=1e-5, atol=1e-5, equal_nan=True), column
+
+def run_benchmark(n_rows=N_ROWS, baseline_rows=BASELINE_ROWS):
+    stats = apply_dtypes(make_season_stats(n_rows), STATS_SCHEMA)
+    # Whole players, so the sample has their earlier seasons for the deltas
+    players = stats['PlayerID'].unique()[:max(1, baseline_rows // stats['Season'].nunique())]
+    sample = stats[stats['PlayerID'].isin(players)]
+
+    start = time.perf_counter()
+    baseline = metrics_row_by_row(sample)
+    row_by_row = (time.perf_counter() - start) * n_rows / len(sample)
+
+    start = time.perf_counter()
+    vectorized = compute_metrics(stats)
+    whole_column = time.perf_counter() - start
+
+    check_same(compute_metrics(sample), baseline)
+
+    result = {
+        'rows': n_rows,
+        'row_by_row_s': row_by_row,
+        'vectorized_s': whole_column,
+        'speedup': row_by_row / whole_column,
+        'metrics': len(vectorized.columns) - 3,
+    }
+    print(f"{n_rows} player seasons, {result['metrics']} metric columns: row-by-row {row_by_row:.2f}s "
+          f"(scaled from {len(sample)} rows), vectorized {whole_column:.3f}s ({result['speedup']:.0f}x)")
+    return result
+
+if __name__ == "__main__":
+    # python benchmarks/bench_metrics.py [rows]
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else N_ROWS)
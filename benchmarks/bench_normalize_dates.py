@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from src.ingest.normalize import normalize_players
+
+N_PLAYERS = 10_000
+
+def make_player_payload(n_players, seed=0):
+    """
+    Build a synthetic API payload: player dicts with API-formatted dates and some nulls.
+    """
+    rng = np.random.default_rng(seed)
+    birth_dates = pd.Timestamp('1980-01-01') + pd.to_timedelta(rng.integers(0, 9000, n_players), unit='D')
+    debuts = pd.Timestamp('2005-01-01') + pd.to_timedelta(rng.integers(0, 7000, n_players), unit='D')
+    has_debut = rng.random(n_players) > 0.4
+    return [
+        {
+            'PlayerID': 10000000 + i,
+            'FirstName': f'First{i}',
+            'LastName': f'Last{i}',
+            'BirthDate': birth_dates[i].strftime('%Y-%m-%dT%H:%M:%S'),
+            'ProDebut': debuts[i].strftime('%Y-%m-%dT%H:%M:%S') if has_debut[i] else None,
+        }
+        for i in range(n_players)
+    ]
+
+def convert_datetime_format(players):
+    """
+    The previous per-player implementation, kept here as the baseline.
+    """
+    for player in players:
+        if 'BirthDate' in player and player['BirthDate']:
+            player['BirthDate'] = pd.to_datetime(player['BirthDate'], format='%Y-%m-%dT%H:%M:%S', errors='coerce').strftime('%Y-%m-%d')
+        if 'ProDebut' in player and player['ProDebut']:
+            player['ProDebut'] = pd.to_datetime(player['ProDebut'], format='%Y-%m-%dT%H:%M:%S', errors='coerce').strftime('%Y-%m-%d')
+    return players
+
+def run_benchmark(n_players=N_PLAYERS):
+    payload = make_player_payload(n_players)
+
+    start = time.perf_counter()
+    baseline = pd.DataFrame(convert_datetime_format([dict(player) for player in payload]))
+    per_player = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = normalize_players([dict(player) for player in payload])
+    column_wise = time.perf_counter() - start
+
+    assert baseline['BirthDate'].equals(vectorized['BirthDate'])
+    assert baseline['ProDebut'].fillna('').equals(vectorized['ProDebut'].fillna(''))
+
+    result = {
+        'players': n_players,
+        'per_player_s': per_player,
+        'column_wise_s': column_wise,
+        'speedup': per_player / column_wise,
+    }
+    print(f"{n_players} players: per-player {per_player:.3f}s, column-wise {column_wise:.3f}s "
+          f"({result['speedup']:.0f}x)")
+    return result
+
+if __name__ == "__main__":
+    run_benchmark()
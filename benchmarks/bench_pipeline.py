@@ -0,0 +1,148 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the unknown spellings the benchmark data contains out of the reviewed mapping file;
+# must be set before src.transform.normalization is imported
+os.environ.setdefault('LOCATION_MAPPINGS_PATH', os.path.join(tempfile.mkdtemp(), 'location_mappings.json'))
+
+import pandas as pd
+
+from benchmarks.synthetic import make_player_payload, make_season_stats, churn_players
+from src.ingest.normalize import normalize_players
+from src.ingest.streaming import write_records_to_parquet
+from src.transform.transform_data import clean_data
+from src.load.load_data import load_data_to_db
+from src.utils.db_utils import dispose_engines
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+LOAD_MODES = ['replace', 'upsert']
+
+# Load branches in the order they run against one database: the first load creates the
+# tables, the reload changes nothing, then 1% and 50% of the players change
+LOAD_STEPS = [('first_load', None), ('noop_reload', None), ('churn_1pct', 0.01), ('churn_50pct', 0.5)]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def timed(function, *args, **kwargs):
+    """
+    Run function with its progress output silenced.
+
+    Returns:
+    tuple: (result, wall time in seconds)
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def bench_size(n_rows, tmp_dir, modes=LOAD_MODES):
+    """
+    Time every stage for one size.
+
+    Returns:
+    dict: Seconds per stage, e.g. {'normalize_players': 0.1, 'load_replace_first_load': 0.5}
+    """
+    timings = {}
+
+    payload = make_player_payload(n_rows)
+    players, timings['normalize_players'] = timed(normalize_players, payload)
+    del payload
+    cleaned, timings['clean_data'] = timed(clean_data, players)
+    del players
+
+    # Season stats go through the streaming ingest path: record dicts to Parquet batches
+    stats_records = make_season_stats(n_rows).to_dict('records')
+    _, timings['ingest_season_stats'] = timed(
+        write_records_to_parquet, iter(stats_records), os.path.join(tmp_dir, f'stats_{n_rows}.parquet')
+    )
+    del stats_records
+
+    for mode in modes:
+        db_path = os.path.join(tmp_dir, f'{mode}_{n_rows}.db')
+        current = cleaned
+        for step, churn in LOAD_STEPS:
+            if churn is not None:
+                current = churn_players(current, churn, seed=len(timings))
+            # load_data_to_db adds its bookkeeping columns to the frame it is given
+            _, timings[f'load_{mode}_{step}'] = timed(load_data_to_db, current.copy(), db_path, 'players', mode=mode)
+        # Closing the pooled connections checkpoints the WAL into the database file
+        dispose_engines()
+        timings[f'db_size_mb_{mode}'] = os.path.getsize(db_path) / 1e6
+    return timings
+
+def run_benchmark(sizes=SIZES, modes=LOAD_MODES):
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'sizes': {},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in sizes:
+            timings = bench_size(n_rows, tmp_dir, modes)
+            results['sizes'][str(n_rows)] = timings
+            print(f"{n_rows:>9} rows")
+            for stage, value in timings.items():
+                unit = 'MB' if stage.startswith('db_size') else 's'
+                print(f"    {stage:<28}{value:10.3f} {unit}")
+    return results
+
+def save_results(results, output=None):
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"pipeline_{results['timestamp'].replace(':', '')}_{results['commit']}.json")
+    with open(output, 'w') as results_file:
+        json.dump(results, results_file, indent=4)
+    print(f"Saved results to {output}")
+    return output
+
+def compare_results(baseline, results, threshold=1.2):
+    """
+    Print each stage's time against a baseline run, flagging slowdowns beyond threshold.
+    """
+    print(f"Compared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    for size, timings in results['sizes'].items():
+        for stage, value in timings.items():
+            previous = baseline['sizes'].get(size, {}).get(stage)
+            if not previous or stage.startswith('db_size'):
+                continue
+            ratio = value / previous
+            flag = '  <-- slower' if ratio > threshold else ''
+            print(f"{size:>9} {stage:<28}{previous:10.3f}s -> {value:10.3f}s  ({ratio:5.2f}x){flag}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time ingest normalization, transform and loads on synthetic data.')
+    parser.add_argument('sizes', nargs='*', type=int, default=SIZES, help='row counts to run (default: 1k to 1M)')
+    parser.add_argument('--modes', nargs='+', default=LOAD_MODES, choices=LOAD_MODES)
+    parser.add_argument('--output', help='results JSON path (default: benchmarks/results/pipeline_<time>_<commit>.json)')
+    parser.add_argument('--compare', help='earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.modes)
+    save_results(results, args.output)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare_results(json.load(baseline_file), results)
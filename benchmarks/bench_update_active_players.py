@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from src.load.load_data import update_records
+
+SIZES = [1_000, 10_000, 100_000]
+
+def make_active_players(n_rows, seed=0):
+    """
+    Build a synthetic active_players frame with the roster column set.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'PlayerID': np.arange(10000000, 10000000 + n_rows),
+        'Status': 'Active',
+        'TeamID': rng.integers(1, 31, n_rows),
+        'Team': rng.choice(['MIA', 'NYY', 'BOS', 'CHC', 'LAD'], n_rows),
+        'Jersey': rng.integers(1, 100, n_rows).astype('float64'),
+        'PositionCategory': rng.choice(['P', 'IF', 'OF', 'C'], n_rows),
+        'Position': rng.choice(['SP', 'RP', 'C', '1B', 'SS', 'CF'], n_rows),
+        'FirstName': [f'First{i}' for i in range(n_rows)],
+        'LastName': [f'Last{i}' for i in range(n_rows)],
+        'Height': rng.integers(66, 82, n_rows).astype('float64'),
+        'Weight': rng.integers(160, 260, n_rows).astype('float64'),
+        'BirthDate': pd.Timestamp('1985-01-01') + pd.to_timedelta(rng.integers(0, 8000, n_rows), unit='D'),
+        'BirthState': rng.choice(['FL', 'CA', 'TX', None], n_rows),
+        'BirthCountry': rng.choice(['USA', 'Dominican Republic', 'Venezuela'], n_rows),
+        'operation_timestamp': pd.Timestamp.now(),
+    })
+
+def update_row_by_row(connection, records):
+    """
+    The previous iterrows path: one statement per player.
+    """
+    columns = list(records.columns)
+    for _, row in records.iterrows():
+        row_dict = {k: (None if pd.isna(v) else v) for k, v in row.to_dict().items()}
+        for key in ['BirthDate', 'operation_timestamp']:
+            if isinstance(row_dict[key], pd.Timestamp):
+                row_dict[key] = row_dict[key].strftime('%Y-%m-%d %H:%M:%S')
+        row_dict = {k: (v.item() if isinstance(v, np.generic) else v) for k, v in row_dict.items()}
+        connection.exec_driver_sql(
+            f"UPDATE active_players SET {', '.join(f'{col} = ?' for col in columns)} WHERE PlayerID = ?",
+            tuple(row_dict.values()) + (row_dict['PlayerID'],)
+        )
+
+def time_update(db_path, records, update):
+    engine = create_engine(f'sqlite:///{db_path}')
+    records.to_sql('active_players', con=engine, if_exists='replace', index=False)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE UNIQUE INDEX ix_active_players_PlayerID ON active_players (PlayerID)')
+
+    changed = records.copy()
+    changed['Weight'] = changed['Weight'] + 1
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        update(connection, changed)
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return elapsed
+
+def run_benchmark(sizes=SIZES):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in sizes:
+            records = make_active_players(n_rows)
+            row_by_row = time_update(os.path.join(tmp_dir, f'rows_{n_rows}.db'), records, update_row_by_row)
+            batched = time_update(
+                os.path.join(tmp_dir, f'batch_{n_rows}.db'), records,
+                lambda connection, changed: update_records(connection, 'active_players', changed)
+            )
+            results.append({
+                'rows': n_rows,
+                'iterrows_us_per_row': row_by_row / n_rows * 1e6,
+                'executemany_us_per_row': batched / n_rows * 1e6,
+                'speedup': row_by_row / batched,
+            })
+            print(f"{n_rows:>7} rows: iterrows {results[-1]['iterrows_us_per_row']:8.1f} us/row, "
+                  f"executemany {results[-1]['executemany_us_per_row']:8.1f} us/row "
+                  f"({results[-1]['speedup']:.1f}x)")
+    return results
+
+if __name__ == "__main__":
+    run_benchmark()
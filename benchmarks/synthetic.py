@@ -0,0 +1,238 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic SportsDataIO payloads with the same column set and the same kinds of mess the
+# real feeds have, shared by the benchmarks in this directory
+
+API_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+TEAMS = ['MIA', 'NYY', 'BOS', 'CHC', 'LAD', 'ATL', 'HOU', 'SD', 'SEA', 'TOR', 'TEX', 'PHI', 'NYM', 'STL', 'SF']
+
+# Mixed roster statuses; about half the players are 'Active'
+STATUSES = ['Active', 'Inactive', 'Minors', '10 Day Injured List', '60 Day Injured List', 'Free Agent', 'Retired']
+STATUS_WEIGHTS = [0.5, 0.1, 0.25, 0.04, 0.03, 0.05, 0.03]
+
+POSITIONS = {'P': ['SP', 'RP'], 'C': ['C'], 'IF': ['1B', '2B', '3B', 'SS'], 'OF': ['LF', 'CF', 'RF', 'DH']}
+
+# Raw birth countries as the API spells them: canonical names, known misspellings, stray
+# whitespace and case, and one spelling the mapping tables don't know yet
+COUNTRIES = [
+    'USA', 'USA', 'USA', 'USA', 'USA`', 'usa', 'Dominican Republic', 'Dominican Republic', 'Domincan Republic',
+    'dominican rublic', ' Dominican Republic ', 'Venezuela', 'Venezuela', 'venezula', 'Venezuala', 'Cuba',
+    'Puerto Rico', 'puerto rico', 'Mexico', 'Columbia', 'Colombia', 'Canada', 'Japan', 'Panama', 'Curacao',
+    'South Korea', 'Taiwan', 'Australia', 'Dominican Repulbic',
+]
+
+# Raw US birth states: abbreviations, full names in any case, and the 'CAL' typo
+US_STATES = [
+    'FL', 'CA', 'TX', 'GA', 'AZ', 'NY', 'NC', 'IL', 'OH', 'PA', 'Texas', 'California', 'FLORIDA', 'georgia',
+    'New York', 'north carolina', 'CAL', ' tx ', None,
+]
+
+# Birth "states" of players born outside the US, which clean_state_labels leaves alone
+FOREIGN_STATES = ['Santo Domingo', 'Zulia', 'Carabobo', 'Havana', 'Ontario', None, None]
+
+CITIES = ['Miami', 'Houston', 'San Diego', 'Atlanta', 'Santo Domingo', 'Maracaibo', 'Havana', 'Toronto', 'Tokyo']
+
+# Raw API columns clean_data drops
+DROPPED_COLUMNS = [
+    'UsaTodayPlayerID', 'UsaTodayHeadshotUrl', 'UsaTodayHeadshotNoBackgroundUrl',
+    'UsaTodayHeadshotUpdated', 'UsaTodayHeadshotNoBackgroundUpdated', 'Salary', 'PhotoUrl',
+    'SportRadarPlayerID', 'RotoworldPlayerID', 'RotoWirePlayerID', 'FantasyAlarmPlayerID',
+    'StatsPlayerID', 'SportsDirectPlayerID', 'XmlTeamPlayerID', 'InjuryStatus', 'InjuryBodyPart',
+    'InjuryStartDate', 'InjuryNotes', 'FanDuelPlayerID', 'DraftKingsPlayerID', 'YahooPlayerID',
+    'UpcomingGameID', 'FanDuelName', 'DraftKingsName', 'YahooName', 'GlobalTeamID',
+    'FantasyDraftName', 'FantasyDraftPlayerID'
+]
+
+FIRST_PLAYER_ID = 10000000
+
+def _api_dates(rng, start, days, n_rows, null_fraction):
+    """
+    API-formatted date strings, null for about null_fraction of the rows.
+    """
+    dates = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, n_rows), unit='D')
+    values = np.asarray(dates.strftime(API_DATETIME_FORMAT), dtype=object)
+    values[rng.random(n_rows) < null_fraction] = None
+    return values
+
+def _names(prefix, ids):
+    return np.char.add(prefix, ids.astype(str)).astype(object)
+
+def make_player_payload(n_rows, seed=0, first_player_id=FIRST_PLAYER_ID):
+    """
+    Build a raw player payload as the API returns it, one row per player.
+
+    Returned as a DataFrame of raw values rather than a list of dicts, so a million
+    players fit in memory; normalize_players takes either.
+    """
+    rng = np.random.default_rng(seed)
+    player_ids = np.arange(first_player_id, first_player_id + n_rows)
+
+    position_category = rng.choice(list(POSITIONS), n_rows, p=[0.5, 0.1, 0.2, 0.2])
+    position = np.empty(n_rows, dtype=object)
+    for category, positions in POSITIONS.items():
+        rows = position_category == category
+        position[rows] = rng.choice(positions, rows.sum())
+
+    country = rng.choice(COUNTRIES, n_rows)
+    state = rng.choice(np.array(US_STATES, dtype=object), n_rows)
+    foreign = ~np.isin(np.char.lower(np.char.strip(country.astype(str))), ['usa', 'usa`'])
+    state[foreign] = rng.choice(np.array(FOREIGN_STATES, dtype=object), foreign.sum())
+
+    first_names, last_names = _names('First', player_ids), _names('Last', player_ids)
+    jersey = rng.integers(1, 100, n_rows).astype('float64')
+    jersey[rng.random(n_rows) < 0.1] = np.nan
+    injured = rng.random(n_rows) < 0.05
+
+    payload = {
+        'PlayerID': player_ids,
+        'SportsDataID': '',
+        'Status': rng.choice(STATUSES, n_rows, p=STATUS_WEIGHTS),
+        'TeamID': rng.integers(1, 31, n_rows),
+        'Team': rng.choice(TEAMS, n_rows),
+        'Jersey': jersey,
+        'PositionCategory': position_category,
+        'Position': position,
+        'MLBAMID': player_ids - FIRST_PLAYER_ID + 500000,
+        'FirstName': first_names,
+        'LastName': last_names,
+        'BatHand': rng.choice(['R', 'L', 'S'], n_rows, p=[0.6, 0.3, 0.1]),
+        'ThrowHand': rng.choice(['R', 'L'], n_rows, p=[0.7, 0.3]),
+        'Height': rng.integers(66, 82, n_rows).astype('float64'),
+        'Weight': rng.integers(160, 270, n_rows).astype('float64'),
+        'BirthDate': _api_dates(rng, '1980-01-01', 9000, n_rows, null_fraction=0.01),
+        'BirthCity': rng.choice(CITIES, n_rows),
+        'BirthState': state,
+        'BirthCountry': country,
+        'HighSchool': None,
+        'College': rng.choice(np.array(['Miami', 'LSU', 'Vanderbilt', 'UCLA', None], dtype=object), n_rows),
+        'ProDebut': _api_dates(rng, '2005-01-01', 7000, n_rows, null_fraction=0.4),
+        'Experience': rng.integers(0, 20, n_rows),
+        'RosterTeam': None,
+    }
+    for column in DROPPED_COLUMNS:
+        if column.endswith('Url'):
+            payload[column] = np.char.add(f'https://example.com/{column}/', player_ids.astype(str)).astype(object)
+        elif column.endswith('Name'):
+            payload[column] = first_names
+        elif column.endswith('Updated') or column == 'InjuryStartDate':
+            payload[column] = np.where(injured, '2024-06-01T00:00:00', None)
+        elif column.startswith('Injury'):
+            payload[column] = np.where(injured, 'Elbow', None)
+        else:
+            payload[column] = player_ids
+    return pd.DataFrame(payload)
+
+def _assign(df, rows, column, values):
+    """
+    Set some rows of a column, adding any new values to its categories first.
+    """
+    if isinstance(df[column].dtype, pd.CategoricalDtype):
+        new_categories = pd.Index(pd.unique(np.asarray(values, dtype=object))).difference(df[column].cat.categories)
+        df[column] = df[column].cat.add_categories(new_categories)
+    df.loc[rows, column] = pd.Series(values, index=rows).astype(df[column].dtype)
+
+def churn_players(df, fraction, seed=0):
+    """
+    Return a copy of a player frame with about fraction of its players changed.
+
+    Most churned players get a new team, jersey, weight and status (updates); a tenth of
+    them leave the roster and are replaced by as many new players (deletes and inserts).
+    """
+    rng = np.random.default_rng(seed)
+    n_churn = int(len(df) * fraction)
+    churned = rng.choice(len(df), n_churn, replace=False)
+    n_replace = n_churn // 10
+    replaced, updated = churned[:n_replace], churned[n_replace:]
+
+    df = df.copy()
+    rows = df.index[updated]
+    _assign(df, rows, 'Team', rng.choice(TEAMS, len(updated)))
+    _assign(df, rows, 'Jersey', rng.integers(1, 100, len(updated)))
+    _assign(df, rows, 'Weight', df.loc[rows, 'Weight'] + rng.integers(1, 10, len(updated)))
+    _assign(df, rows, 'Status', rng.choice(STATUSES, len(updated), p=STATUS_WEIGHTS))
+
+    newcomers = df.iloc[replaced].copy()
+    first_new_id = int(pd.to_numeric(df['PlayerID']).max()) + 1
+    new_ids = pd.Series(np.arange(first_new_id, first_new_id + n_replace), index=newcomers.index)
+    newcomers['PlayerID'] = new_ids.astype(df['PlayerID'].dtype)
+    df = df.drop(index=df.index[replaced])
+    return pd.concat([df, newcomers], ignore_index=True)
+
+def make_season_stats(n_rows, seed=0, first_season=2015, n_seasons=10, first_player_id=FIRST_PLAYER_ID):
+    """
+    Build a PlayerSeasonStats payload: one row per (PlayerID, Season), with batting and
+    pitching counting stats and the API's pre-computed rate stats.
+    """
+    rng = np.random.default_rng(seed)
+    n_players = max(1, n_rows // n_seasons)
+    player_ids = first_player_id + np.arange(n_rows) % n_players
+    seasons = first_season + np.arange(n_rows) // n_players % n_seasons
+    pitcher = rng.random(n_rows) < 0.45
+
+    games = rng.integers(1, 163, n_rows)
+    at_bats = np.where(pitcher, rng.integers(0, 10, n_rows), games * rng.integers(2, 5, n_rows))
+    hits = rng.binomial(at_bats, 0.25)
+    home_runs = rng.binomial(hits, 0.12)
+    doubles = rng.binomial(hits - home_runs, 0.25)
+    triples = rng.binomial(hits - home_runs - doubles, 0.05)
+    walks = rng.binomial(at_bats, 0.09)
+    hit_by_pitch = rng.binomial(at_bats, 0.01)
+    sacrifice_flies = rng.binomial(at_bats, 0.01)
+    outs_pitched = np.where(pitcher, rng.integers(0, 650, n_rows), 0)
+    innings = outs_pitched / 3
+    earned_runs = rng.binomial(outs_pitched, 0.15)
+    pitching_hits = rng.binomial(outs_pitched, 0.3)
+    pitching_walks = rng.binomial(outs_pitched, 0.11)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        batting_average = np.round(hits / at_bats, 3)
+        on_base = np.round((hits + walks + hit_by_pitch) / (at_bats + walks + hit_by_pitch + sacrifice_flies), 3)
+        total_bases = hits + doubles + 2 * triples + 3 * home_runs
+        slugging = np.round(total_bases / at_bats, 3)
+        era = np.round(earned_runs * 9 / innings, 2)
+        whip = np.round((pitching_walks + pitching_hits) / innings, 2)
+
+    return pd.DataFrame({
+        'StatID': np.arange(1, n_rows + 1),
+        'TeamID': rng.integers(1, 31, n_rows),
+        'PlayerID': player_ids,
+        'SeasonType': 1,
+        'Season': seasons,
+        'Name': np.char.add(np.char.add(_names('First', player_ids).astype(str), ' '), _names('Last', player_ids).astype(str)),
+        'Team': rng.choice(TEAMS, n_rows),
+        'Position': np.where(pitcher, rng.choice(['SP', 'RP'], n_rows), rng.choice(['C', '1B', 'SS', 'CF'], n_rows)),
+        'PositionCategory': np.where(pitcher, 'P', rng.choice(['C', 'IF', 'OF'], n_rows)),
+        'Games': games,
+        'AtBats': at_bats,
+        'Runs': rng.binomial(hits + walks, 0.4),
+        'Hits': hits,
+        'Singles': hits - doubles - triples - home_runs,
+        'Doubles': doubles,
+        'Triples': triples,
+        'HomeRuns': home_runs,
+        'RunsBattedIn': rng.binomial(hits + walks, 0.45),
+        'BattingAverage': batting_average,
+        'Strikeouts': rng.binomial(at_bats, 0.22),
+        'Walks': walks,
+        'HitByPitch': hit_by_pitch,
+        'SacrificeFlies': sacrifice_flies,
+        'StolenBases': rng.binomial(hits + walks, 0.05),
+        'OnBasePercentage': on_base,
+        'SluggingPercentage': slugging,
+        'OnBasePlusSlugging': np.round(on_base + slugging, 3),
+        'Wins': np.where(pitcher, rng.integers(0, 20, n_rows), 0),
+        'Losses': np.where(pitcher, rng.integers(0, 15, n_rows), 0),
+        'Saves': np.where(pitcher, rng.integers(0, 40, n_rows), 0),
+        'InningsPitchedDecimal': np.round(innings, 1),
+        'TotalOutsPitched': outs_pitched,
+        'PitchingHits': pitching_hits,
+        'PitchingEarnedRuns': earned_runs,
+        'PitchingWalks': pitching_walks,
+        'PitchingStrikeouts': rng.binomial(outs_pitched, 0.3),
+        'PitchingHomeRuns': rng.binomial(pitching_hits, 0.1),
+        'EarnedRunAverage': era,
+        'WalksHitsPerInningsPitched': whip,
+        'Updated': np.where(rng.random(n_rows) < 0.02, None, '2024-10-01T04:12:33'),
+    })
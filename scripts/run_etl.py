@@ -1,11 +1,56 @@
 import os
 import sys
+from contextlib import contextmanager
 
 # Add the project root directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.transform.transform_data import transform_data
+from src.ingest.ingest_data import ingest_marlins_roster
+from src.ingest.fetch_all_player_data import ingest_all_active_players
+from src.transform.transform_data import transform_data, clean_data
+from src.transform.manifest import TransformManifest
 from src.load.load_data import load_data_to_db
+from src.load.history import snapshot_if_due
+from src.load.load_stats import default_stats_path, load_stats_to_db, read_stats_file
+from src.transform.metrics import update_season_metrics
+from src.utils.player_io import write_players
+from src.utils.instrumentation import RunReport
+
+@contextmanager
+def run_report(name):
+    """
+    Instrument one pipeline run and write its report when the run ends, failed or not.
+
+    The JSON report goes to ETL_REPORT_DIR; set ETL_RUNS_DB_PATH to also append it to the
+    etl_runs table of that database, and ETL_PROFILE_STAGES to profile stages with cProfile.
+    """
+    report = RunReport(name)
+    try:
+        yield report
+    except BaseException:
+        report.finish('failed')
+        raise
+    else:
+        report.finish()
+    finally:
+        report.print_summary()
+        print(f"Run report saved to {report.save()}")
+        runs_db_path = os.getenv('ETL_RUNS_DB_PATH')
+        if runs_db_path:
+            report.append_to_db(runs_db_path)
+
+def get_db_configs():
+    return [
+        {'db_path': os.getenv('DB_PATH'), 'table_name': 'marlins_players'},
+        {'db_path': os.getenv('DB_PATH_PLAYERS'), 'table_name': 'players'}
+    ]
+
+def snapshot_loaded_tables(db_config):
+    """
+    Write a history snapshot of the loaded tables once enough audit rows have piled up.
+    """
+    for table_name in (db_config['table_name'], 'active_players'):
+        snapshot_if_due(db_config['db_path'], table_name)
 
 def run_etl():
     # List of file paths to process
@@ -14,17 +59,118 @@ def run_etl():
         os.getenv('CLEANED_PLAYERS_DATA_PATH')
     ]
 
-    # Step 1: Transform data
-    transformed_data_list = transform_data(file_paths)
+    db_configs = get_db_configs()
 
-    # Step 2: Load data into the database
-    db_configs = [
-        {'db_path': os.getenv('DB_PATH'), 'table_name': 'marlins_players'},
-        {'db_path': os.getenv('DB_PATH_PLAYERS'), 'table_name': 'players'}
-    ]
+    with run_report('run_etl') as report:
+        # Step 1: Transform data, skipping inputs that haven't changed since the last run
+        # unless TRANSFORM_INCREMENTAL=0. An input only counts as unchanged while its table
+        # still holds what the last load wrote there
+        incremental = os.getenv('TRANSFORM_INCREMENTAL', '1') != '0'
+        manifest = None
+        if incremental:
+            manifest = TransformManifest(load_targets={
+                file_path: (db_config['db_path'], db_config['table_name'])
+                for file_path, db_config in zip(file_paths, db_configs)
+            })
+        with report.stage('transform'):
+            transformed_data_list = transform_data(file_paths, manifest=manifest)
+
+        # Step 2: Load data into the database
+
+        # 'upsert' only writes the changed rows, 'replace' keeps the original full-table diff
+        load_mode = os.getenv('LOAD_MODE', 'replace')
+
+        for file_path, transformed_data, db_config in zip(file_paths, transformed_data_list, db_configs):
+            if transformed_data is None:
+                print(f"No changed input for the '{db_config['table_name']}' table, skipping load.")
+                continue
+            with report.stage(f"load_{db_config['table_name']}"):
+                load_data_to_db(transformed_data, db_config['db_path'], db_config['table_name'], mode=load_mode)
+            with report.stage(f"snapshot_{db_config['table_name']}"):
+                snapshot_loaded_tables(db_config)
+            if manifest is not None:
+                manifest.record_load(file_path)
+
+        # Only remember the inputs as done once their data is in the database
+        if manifest is not None:
+            manifest.save()
+
+def run_etl_in_memory(checkpoint_dir=None):
+    """
+    Run ingest -> transform -> load end to end, passing DataFrames between the stages
+    without writing intermediate files.
+
+    Parameters:
+    checkpoint_dir (str): If set, the raw and cleaned frames are also saved there as
+        Parquet, for debugging or restarting a stage by hand.
+
+    Returns:
+    dict: Wall time in seconds per stage.
+    """
+    load_mode = os.getenv('LOAD_MODE', 'replace')
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    with run_report('run_etl_in_memory') as report:
+        # Step 1: Ingest data, in the same order as get_db_configs()
+        with report.stage('ingest'):
+            raw_frames = {
+                'marlins_roster': ingest_marlins_roster(store=False),
+                'all_players': ingest_all_active_players(store=False),
+            }
+
+        if checkpoint_dir:
+            with report.stage('checkpoint_raw'):
+                for name, frame in raw_frames.items():
+                    write_players(frame, os.path.join(checkpoint_dir, f'raw_{name}.parquet'))
+
+        # Step 2: Transform data
+        with report.stage('transform') as counters:
+            counters['rows_in'] = sum(len(frame) for frame in raw_frames.values())
+            transformed_frames = {name: clean_data(frame) for name, frame in raw_frames.items()}
+            counters['rows_out'] = sum(len(frame) for frame in transformed_frames.values())
+
+        if checkpoint_dir:
+            with report.stage('checkpoint_cleaned'):
+                for name, frame in transformed_frames.items():
+                    write_players(frame, os.path.join(checkpoint_dir, f'cleaned_{name}.parquet'))
+
+        # Step 3: Load data into the database
+        for transformed_data, db_config in zip(transformed_frames.values(), get_db_configs()):
+            with report.stage(f"load_{db_config['table_name']}"):
+                load_data_to_db(transformed_data, db_config['db_path'], db_config['table_name'], mode=load_mode)
+            with report.stage(f"snapshot_{db_config['table_name']}"):
+                snapshot_loaded_tables(db_config)
+
+    return report.stage_timings()
+
+def run_stats_etl(stats_path=None):
+    """
+    Load the ingested season stats (see fetch_all_player_stats.py) into the stats table and,
+    unless STATS_METRICS=0, recompute the derived metrics of the seasons it loaded.
+
+    Parameters:
+    stats_path (str): Stats file or season dataset directory, the one in RAW_STATS_DATA_PATH
+        if not given.
+    """
+    with run_report('run_stats_etl') as report:
+        with report.stage('read_stats') as counters:
+            stats = read_stats_file(stats_path or default_stats_path())
+            counters['rows_out'] = len(stats)
+
+        with report.stage('load_stats'):
+            load_stats_to_db(stats)
 
-    for transformed_data, db_config in zip(transformed_data_list, db_configs):
-        load_data_to_db(transformed_data, db_config['db_path'], db_config['table_name'])
+        if os.getenv('STATS_METRICS', '1') != '0':
+            with report.stage('metrics'):
+                update_season_metrics(seasons=stats['Season'].dropna().unique().tolist())
 
 if __name__ == "__main__":
-    run_etl()
+    # python scripts/run_etl.py full  -> in-memory ingest + transform + load
+    # python scripts/run_etl.py stats [path]  -> load season stats and their derived metrics
+    if len(sys.argv) > 1 and sys.argv[1] == 'full':
+        run_etl_in_memory(checkpoint_dir=os.getenv('ETL_CHECKPOINT_DIR'))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'stats':
+        run_stats_etl(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        run_etl()
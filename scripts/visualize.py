@@ -1,45 +1,211 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from dotenv import load_dotenv
+import hashlib
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from importlib.metadata import version
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from src.analytics.query import PlayerAnalytics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Where render writes the PNGs, and the cache of what each one was drawn from
+CHARTS_DIR = os.getenv('CHARTS_DIR', os.path.join(PROJECT_ROOT, 'charts'))
+CHART_CACHE_FILE_NAME = '.chart_cache.json'
+
+# Worker processes for rendering; a single changed chart is drawn without a pool
+RENDER_MAX_WORKERS = int(os.getenv('RENDER_MAX_WORKERS', os.cpu_count() or 1))
+
+# Every chart, by file name in CHARTS_DIR. 'histogram' charts draw one column's values,
+# 'counts' charts the value counts of one column; 'where' and 'parameters' filter the rows.
+# The tables are the ones PlayerAnalytics registers (CLEANED_DATA_PATH as marlins_players).
+CHARTS = {
+    'height_distribution': {
+        'kind': 'histogram', 'table': 'marlins_players', 'column': 'Height', 'bins': 20, 'kde': True,
+        'title': 'Distribution of Player Heights', 'xlabel': 'Height (inches)', 'ylabel': 'Frequency',
+        'figsize': [10, 6],
+    },
+    'weight_distribution': {
+        'kind': 'histogram', 'table': 'marlins_players', 'column': 'Weight', 'bins': 20, 'kde': True,
+        'title': 'Distribution of Player Weights', 'xlabel': 'Weight (lbs)', 'ylabel': 'Frequency',
+        'figsize': [10, 6],
+    },
+    'position_category_count': {
+        'kind': 'counts', 'table': 'marlins_players', 'column': 'PositionCategory', 'orient': 'x',
+        'title': 'Count of Players by Position Category', 'xlabel': 'Position Category', 'ylabel': 'Count',
+        'figsize': [10, 6], 'xticks_rotation': 45,
+    },
+    # clean_data spells the USA 'Usa'
+    'birth_state_counts': {
+        'kind': 'counts', 'table': 'marlins_players', 'column': 'BirthState', 'orient': 'y',
+        'where': 'BirthCountry = ?', 'parameters': ['Usa'],
+        'title': 'Count of Players by Birth State (USA)', 'xlabel': 'Count', 'ylabel': 'Birth State',
+        'figsize': [12, 8],
+    },
+}
+
+def chart_input(analytics, spec):
+    """
+    The data a chart is drawn from: the column's values for a histogram, its value counts
+    otherwise. Only that column is read.
+    """
+    if spec['kind'] == 'histogram':
+        return analytics.values(spec['table'], spec['column'], spec.get('where'), spec.get('parameters'))
+    return analytics.value_counts(spec['table'], spec['column'], spec.get('where'), spec.get('parameters'))
+
+def _render_version():
+    """
+    Hash of the drawing code and library versions; a change re-renders every chart.
+    """
+    digest = hashlib.sha256()
+    with open(os.path.abspath(__file__), 'rb') as source:
+        digest.update(source.read())
+    for package in ('matplotlib', 'seaborn'):
+        digest.update(f'{package}=={version(package)}'.encode())
+    return digest.hexdigest()
+
+def chart_key(spec, data, render_version):
+    """
+    Hash of a chart's input data, its plot parameters and the drawing code.
+    """
+    digest = hashlib.sha256(render_version.encode())
+    digest.update(json.dumps(spec, sort_keys=True).encode())
+    if isinstance(data, pd.DataFrame):
+        digest.update(','.join(data.columns).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    else:
+        digest.update(str(data.dtype).encode())
+        digest.update(np.ascontiguousarray(data).tobytes())
+    return digest.hexdigest()
+
+def draw_chart(spec, data):
+    """
+    Draw one chart on a new figure and return the figure.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    figure = plt.figure(figsize=spec['figsize'])
+    if spec['kind'] == 'histogram':
+        sns.histplot(data, bins=spec['bins'], kde=spec['kde'])
+    elif spec['orient'] == 'y':
+        sns.barplot(data=data, y=spec['column'], x='count', color=sns.color_palette()[0])
+    else:
+        sns.barplot(data=data, x=spec['column'], y='count', color=sns.color_palette()[0])
+    plt.title(spec['title'])
+    plt.xlabel(spec['xlabel'])
+    plt.ylabel(spec['ylabel'])
+    if spec.get('xticks_rotation'):
+        plt.xticks(rotation=spec['xticks_rotation'])
+    return figure
+
+def render_chart(spec, data, path):
+    """
+    Draw one chart headlessly into a PNG. Runs in the worker processes.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    figure = draw_chart(spec, data)
+    tmp_path = f'{path}.tmp.png'
+    figure.savefig(tmp_path, bbox_inches='tight')
+    plt.close(figure)
+    os.replace(tmp_path, path)
+    return path
+
+def _load_cache(cache_path):
+    if os.path.exists(cache_path):
+        with open(cache_path) as cache_file:
+            return json.load(cache_file)
+    return {}
+
+def _save_cache(cache, cache_path):
+    tmp_path = f'{cache_path}.tmp'
+    with open(tmp_path, 'w') as cache_file:
+        json.dump(cache, cache_file, indent=4, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+def render_charts(charts=CHARTS, output_dir=CHARTS_DIR, analytics=None, max_workers=None, force=False):
+    """
+    Render every chart to output_dir/<name>.png, skipping charts whose key is unchanged.
+
+    A chart's key hashes the exact input it is drawn from (one column's values or counts),
+    its plot parameters and the drawing code, so unchanged data costs one small query and a
+    hash per chart. Changed charts are drawn in a process pool on the Agg backend.
+
+    Parameters:
+    charts (dict): Chart specs by name, CHARTS if not given.
+    output_dir (str): Directory for the PNGs and the cache file.
+    analytics (PlayerAnalytics): Query layer to read the inputs from; if not given, one over
+        the processed files (the charts don't read the databases).
+    max_workers (int): Worker processes, RENDER_MAX_WORKERS if not given.
+    force (bool): Render every chart regardless of the cache.
+
+    Returns:
+    dict: 'rendered' or 'unchanged' per chart.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, CHART_CACHE_FILE_NAME)
+    cache = _load_cache(cache_path)
+    render_version = _render_version()
+
+    pending = {}
+    # Only close the query layer if it was opened here
+    with nullcontext(analytics) if analytics is not None else PlayerAnalytics(databases={}) as analytics:
+        for name, spec in charts.items():
+            data = chart_input(analytics, spec)
+            key = chart_key(spec, data, render_version)
+            path = os.path.join(output_dir, f'{name}.png')
+            if not force and cache.get(name) == key and os.path.exists(path):
+                continue
+            pending[name] = (spec, data, path, key)
+
+    status = {name: 'unchanged' for name in charts}
+    max_workers = max_workers or RENDER_MAX_WORKERS
+    if len(pending) < 2 or max_workers <= 1:
+        for name, (spec, data, path, key) in pending.items():
+            render_chart(spec, data, path)
+            cache[name] = key
+            status[name] = 'rendered'
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            futures = {
+                name: executor.submit(render_chart, spec, data, path)
+                for name, (spec, data, path, key) in pending.items()
+            }
+            for name, future in futures.items():
+                future.result()
+                cache[name] = pending[name][3]
+                status[name] = 'rendered'
+
+    if pending:
+        _save_cache(cache, cache_path)
+    return status
+
+def show_charts(charts=CHARTS):
+    """
+    Draw every chart in interactive windows, one after another.
+    """
+    import matplotlib.pyplot as plt
+
+    with PlayerAnalytics(databases={}) as analytics:
+        for spec in charts.values():
+            draw_chart(spec, chart_input(analytics, spec))
+            plt.show()
 
-load_dotenv()
-# Load the cleaned data
-file_path = os.getenv('CLEANED_DATA_PATH')
-cleaned_data = pd.read_csv(file_path)
-all_players_file_path = os.getenv('ALL_PLAYERS_CSV_PATH')
-all_players_data = pd.read_csv(all_players_file_path)
-# Example visualization: Distribution of player heights
-plt.figure(figsize=(10, 6))
-sns.histplot(cleaned_data['Height'], bins=20, kde=True)
-plt.title('Distribution of Player Heights')
-plt.xlabel('Height (inches)')
-plt.ylabel('Frequency')
-plt.show()
-
-# Example visualization: Distribution of player weights
-plt.figure(figsize=(10, 6))
-sns.histplot(cleaned_data['Weight'], bins=20, kde=True)
-plt.title('Distribution of Player Weights')
-plt.xlabel('Weight (lbs)')
-plt.ylabel('Frequency')
-plt.show()
-
-# Example visualization: Count of players by position category
-plt.figure(figsize=(10, 6))
-sns.countplot(data=cleaned_data, x='PositionCategory', order=cleaned_data['PositionCategory'].value_counts().index)
-plt.title('Count of Players by Position Category')
-plt.xlabel('Position Category')
-plt.ylabel('Count')
-plt.xticks(rotation=45)
-plt.show()
-
-# Example visualization: Count of players by birth state (USA only)
-usa_players = cleaned_data[cleaned_data['BirthCountry'] == 'USA']
-plt.figure(figsize=(12, 8))
-sns.countplot(data=usa_players, y='BirthState', order=usa_players['BirthState'].value_counts().index)
-plt.title('Count of Players by Birth State (USA)')
-plt.xlabel('Count')
-plt.ylabel('Birth State')
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    # python scripts/visualize.py               -> show the charts interactively
+    # python scripts/visualize.py render [force] -> write changed charts to CHARTS_DIR headlessly
+    if len(sys.argv) > 1 and sys.argv[1] == 'render':
+        status = render_charts(force='force' in sys.argv[2:])
+        for name, state in status.items():
+            print(f"{name}: {state}")
+    else:
+        show_charts()
@@ -0,0 +1,217 @@
+import os
+import sys
+
+# Add the root directory of the project to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import duckdb
+import pandas as pd
+from dotenv import load_dotenv
+from src.utils.db_utils import get_engine
+from src.utils.schema import apply_dtypes
+
+load_dotenv()
+
+# Tables registered by default: name -> environment variable holding the processed file
+DEFAULT_SOURCES = {
+    'marlins_players': 'CLEANED_DATA_PATH',
+    'players': 'CLEANED_PLAYERS_DATA_PATH',
+}
+
+# The season-partitioned stats dataset written by fetch_all_player_stats.py backfill
+STATS_DATASET = 'player_season_stats'
+
+# SQLite databases attached by default: schema name -> environment variable with the path
+DEFAULT_DATABASES = {
+    'marlins_db': 'DB_PATH',
+    'players_db': 'DB_PATH_PLAYERS',
+}
+
+def _quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _where(where, *conditions):
+    """
+    WHERE clause combining a caller's filter with other conditions, empty if there are none.
+    """
+    conditions = ([f'({where})'] if where else []) + list(conditions)
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ''
+
+def default_sources():
+    """
+    The processed player files and the season-stats dataset that exist, by table name.
+    """
+    sources = {name: os.getenv(variable) for name, variable in DEFAULT_SOURCES.items()}
+    stats_root = os.getenv('RAW_STATS_DATA_PATH')
+    if stats_root:
+        sources['season_stats'] = os.path.join(stats_root, STATS_DATASET)
+    return {name: path for name, path in sources.items() if path and os.path.exists(path)}
+
+def default_databases():
+    databases = {name: os.getenv(variable) for name, variable in DEFAULT_DATABASES.items()}
+    return {name: path for name, path in databases.items() if path and os.path.exists(path)}
+
+class PlayerAnalytics:
+    """
+    Embedded DuckDB over the pipeline outputs, for visualize.py and the notebooks.
+
+    Filters and aggregations run in DuckDB's vectorized engine and only the result comes
+    back as a DataFrame. Parquet files and the Hive-partitioned stats dataset are views, so
+    every query reads only the columns (and, with a season filter, the partitions) it uses.
+    CSV files have no columnar layout to skip through, so each is read into a DuckDB table
+    once, when it is registered. SQLite databases are attached read-only with DuckDB's
+    sqlite extension, or copied in once where the extension can't be loaded.
+
+    Parameters:
+    sources (dict): {table name: file or dataset directory}, default_sources() if not given.
+    databases (dict): {schema name: SQLite file}, default_databases() if not given. Their
+        tables are queried as schema.table, e.g. players_db.active_players.
+    """
+
+    def __init__(self, sources=None, databases=None):
+        self.connection = duckdb.connect()
+        self.sources = {}
+        for name, path in (default_sources() if sources is None else sources).items():
+            self.register(name, path)
+        for name, db_path in (default_databases() if databases is None else databases).items():
+            self.attach_sqlite(name, db_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def register(self, name, path):
+        """
+        Make a Parquet file, a Parquet dataset directory or a CSV file queryable as a table.
+        """
+        if os.path.isdir(path):
+            scan = f"read_parquet({_quote(os.path.join(path, '**', '*.parquet'))}, hive_partitioning = true)"
+            self.connection.execute(f'CREATE OR REPLACE VIEW {_identifier(name)} AS SELECT * FROM {scan}')
+        elif os.path.splitext(path)[1].lower() == '.parquet':
+            scan = f'read_parquet({_quote(path)})'
+            self.connection.execute(f'CREATE OR REPLACE VIEW {_identifier(name)} AS SELECT * FROM {scan}')
+        else:
+            scan = f'read_csv({_quote(path)}, header = true)'
+            self.connection.execute(f'CREATE OR REPLACE TABLE {_identifier(name)} AS SELECT * FROM {scan}')
+        self.sources[name] = path
+
+    def attach_sqlite(self, name, db_path):
+        """
+        Make the tables of a SQLite database queryable as name.table.
+        """
+        try:
+            self.connection.execute(f'ATTACH {_quote(os.path.abspath(db_path))} AS {_identifier(name)} (TYPE sqlite, READ_ONLY)')
+        except duckdb.Error:
+            # No sqlite extension (e.g. offline and not installed): copy the tables in instead
+            self.connection.execute(f'CREATE SCHEMA IF NOT EXISTS {_identifier(name)}')
+            with get_engine(db_path).connect() as connection:
+                table_names = [row[0] for row in connection.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                )]
+                for table_name in table_names:
+                    frame = apply_dtypes(pd.read_sql_table(table_name, connection))
+                    self.connection.register('_sqlite_table', frame)
+                    self.connection.execute(
+                        f'CREATE OR REPLACE TABLE {_identifier(name)}.{_identifier(table_name)} AS SELECT * FROM _sqlite_table'
+                    )
+                    self.connection.unregister('_sqlite_table')
+        self.sources[name] = db_path
+
+    def tables(self):
+        """
+        Every queryable table and view, as schema-qualified names.
+        """
+        return self.query('''
+            SELECT CASE WHEN table_schema = 'main' THEN table_name ELSE table_schema || '.' || table_name END AS name
+            FROM information_schema.tables
+            WHERE table_name NOT LIKE 'sqlite_%'
+            ORDER BY table_schema = 'main' DESC, name
+        ''')['name'].tolist()
+
+    def query(self, sql, parameters=None):
+        """
+        Run a SQL query and return the result as a DataFrame.
+
+        Parameters:
+        sql (str): DuckDB SQL; ? placeholders are bound from parameters.
+        parameters (list): Values for the placeholders.
+
+        Returns:
+        DataFrame: The result.
+        """
+        return self.connection.execute(sql, parameters or []).df()
+
+    def values(self, table, column, where=None, parameters=None):
+        """
+        One column's non-null values, e.g. the heights to draw a histogram of.
+
+        Returns:
+        ndarray: The values.
+        """
+        column_sql = _identifier(column)
+        return self.connection.execute(
+            f'SELECT {column_sql} FROM {table}{_where(where, f"{column_sql} IS NOT NULL")}', parameters or []
+        ).fetchnumpy()[column]
+
+    def value_counts(self, table, column, where=None, parameters=None):
+        """
+        Count and share of each non-null value of a column, most frequent first, like
+        pandas' value_counts.
+
+        Parameters:
+        table (str): Table or view, e.g. 'players' or 'players_db.active_players'.
+        column (str): Column to count.
+        where (str): Optional SQL filter, e.g. "BirthCountry = ?".
+        parameters (list): Values for the filter's placeholders.
+
+        Returns:
+        DataFrame: column, count and percentage.
+        """
+        column_sql = _identifier(column)
+        return self.query(f'''
+            SELECT {column_sql}, COUNT(*) AS count, 100.0 * COUNT(*) / SUM(COUNT(*)) OVER () AS percentage
+            FROM {table}{_where(where, f"{column_sql} IS NOT NULL")}
+            GROUP BY {column_sql}
+            ORDER BY count DESC, {column_sql}
+        ''', parameters)
+
+    def summary(self, table, by, columns, where=None, parameters=None):
+        """
+        Row count and the mean of some columns per group, e.g. average height and weight by
+        position.
+
+        Parameters:
+        table (str): Table or view.
+        by (str or list): Column(s) to group by; None for a single overall row.
+        columns (list): Columns to average.
+        where (str): Optional SQL filter.
+        parameters (list): Values for the filter's placeholders.
+
+        Returns:
+        DataFrame: The group columns, count and one mean column per averaged column.
+        """
+        by = [by] if isinstance(by, str) else list(by or [])
+        group_columns = ', '.join(_identifier(column) for column in by)
+        means = ''.join(f', AVG({_identifier(column)}) AS {_identifier(column)}' for column in columns)
+        select = f'{group_columns + ", " if by else ""}COUNT(*) AS count{means}'
+        group_by = f' GROUP BY {group_columns} ORDER BY {group_columns}' if by else ''
+        return self.query(f'SELECT {select} FROM {table}{_where(where)}{group_by}', parameters)
+
+if __name__ == "__main__":
+    # python src/analytics/query.py tables
+    # python src/analytics/query.py "SELECT Team, COUNT(*) FROM players GROUP BY Team"
+    with PlayerAnalytics() as analytics:
+        if len(sys.argv) > 1 and sys.argv[1] != 'tables':
+            with pd.option_context('display.max_rows', 200, 'display.width', 200):
+                print(analytics.query(sys.argv[1]))
+        else:
+            for table in analytics.tables():
+                print(table)
@@ -1,42 +1,45 @@
+import sys
+import os
+
+# Add the root directory of the project to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
 import pandas as pd
-import requests
 from dotenv import load_dotenv
-import os
-import time
+from src.ingest.sportsdata_client import ingest_data_from_api, get_default_client, create_session, API_BASE_URL
+from src.ingest.streaming import iter_json_array, write_records_to_parquet
+from src.utils.schema import STATS_SCHEMA, apply_dtypes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import json
+import time
 
 # Load environment variables from .env file
 load_dotenv()
 
-def ingest_data_from_api(api_url, headers, retries=3, delay=5):
-    for attempt in range(retries):
-        print(f"Fetching data from API: {api_url} (Attempt {attempt + 1})")
-        response = requests.get(api_url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            # Print out the first item to inspect for timestamps
-            if data:
-                print("Sample data:", data[0])
-            return data
-        else:
-            print(f"Failed to fetch data from API. Status code: {response.status_code}, Response: {response.text}")
-            if attempt < retries - 1:
-                time.sleep(delay)
-            else:
-                raise Exception("Failed to fetch data from API after multiple attempts.")
+# The backfill partitions keep every field the API sends. The STATS_SCHEMA columns are written
+# in these wide types, the ones inference would pick, so every partition agrees on them whatever
+# a season's first batch holds; read_player_season_stats narrows them to STATS_SCHEMA.
+RAW_STATS_SCHEMA = pa.schema([
+    pa.field(field.name, pa.int64() if pa.types.is_integer(field.type)
+             else pa.float64() if pa.types.is_floating(field.type) else pa.string())
+    for field in STATS_SCHEMA
+])
 
 def fetch_player_season_stats(api_key, season):
-    url = f"https://api.sportsdata.io/v3/mlb/stats/json/PlayerSeasonStats/{season}?key={api_key}"
+    url = f"{API_BASE_URL}/v3/mlb/stats/json/PlayerSeasonStats/{season}?key={api_key}"
     headers = {'Ocp-Apim-Subscription-Key': api_key}
     return ingest_data_from_api(url, headers)
 
-def convert_datetime_format(players):
-    for player in players:
-        if 'BirthDate' in player and player['BirthDate']:
-            player['BirthDate'] = pd.to_datetime(player['BirthDate'], format='%Y-%m-%dT%H:%M:%S', errors='coerce').strftime('%Y-%m-%d')
-        if 'ProDebut' in player and player['ProDebut']:
-            player['ProDebut'] = pd.to_datetime(player['ProDebut'], format='%Y-%m-%dT%H:%M:%S', errors='coerce').strftime('%Y-%m-%d')
-    return players
+def stream_player_season_stats(api_key, season, session=None):
+    """
+    Stream the PlayerSeasonStats payload, yielding one player record at a time.
+    """
+    url = f"{API_BASE_URL}/v3/mlb/stats/json/PlayerSeasonStats/{season}?key={api_key}"
+    headers = {'Ocp-Apim-Subscription-Key': api_key}
+    return iter_json_array(get_default_client().stream(url, headers, session=session))
 
 def store_json(data, json_file_path):
     with open(json_file_path, 'w') as json_file:
@@ -61,8 +64,201 @@ def ingest_player_season_stats(season):
     df = pd.DataFrame(players)
     print("Player Season Stats Data:")
     print(df.head())
+    get_default_client().print_stats()
+
+def ingest_player_season_stats_streaming(season, batch_size=5000):
+    """
+    Stream a season's stats straight into a typed Parquet file.
+
+    The response is parsed incrementally and written in batches of batch_size records,
+    so peak memory does not grow with the size of the season payload.
+
+    Parameters:
+    season (str): Season to fetch, e.g. '2024'.
+    batch_size (int): Number of player records parsed and written at a time.
+    """
+    api_key = os.getenv('SPORTS_DATA_API_KEY')
+
+    raw_data_path = os.getenv('RAW_STATS_DATA_PATH')
+    parquet_file_path = os.path.join(raw_data_path, 'player_season_stats.parquet')
+
+    rows = write_records_to_parquet(stream_player_season_stats(api_key, season), parquet_file_path, batch_size)
+    print(f"Streamed {rows} player season stats into {parquet_file_path}")
+
+    # Print the first few rows without reading the whole file back
+    if rows:
+        first_rows = next(pq.ParquetFile(parquet_file_path).iter_batches(batch_size=5))
+        print("Player Season Stats Data:")
+        print(first_rows.to_pandas())
+    get_default_client().print_stats()
+
+def season_partition_path(dataset_path, season):
+    """
+    Path of the Parquet file holding one season in the Hive-style season=YYYY/ dataset.
+    """
+    return os.path.join(dataset_path, f'season={season}', 'part-0.parquet')
+
+def verify_season_partition(dataset_path, season):
+    """
+    Check that a season's partition exists, has a readable Parquet footer, has the
+    STATS_SCHEMA columns in the types of RAW_STATS_SCHEMA and holds rows of that season only. An empty partition never
+    verifies, so a season the API had no stats for yet is fetched again.
+
+    Parameters:
+    dataset_path (str): Root directory of the partitioned dataset.
+    season (int): Season to check.
+
+    Returns:
+    bool: True if the partition is complete and can be skipped.
+    """
+    partition_path = season_partition_path(dataset_path, season)
+    if not os.path.exists(partition_path):
+        return False
+    try:
+        parquet_file = pq.ParquetFile(partition_path)
+    except Exception as error:
+        print(f"Partition for season {season} is unreadable and will be fetched again: {error}")
+        return False
+    metadata = parquet_file.metadata
+    if metadata.num_rows == 0:
+        print(f"Partition for season {season} is empty and will be fetched again.")
+        return False
+    file_schema = parquet_file.schema_arrow
+    mismatched = [
+        field.name for field in RAW_STATS_SCHEMA
+        if field.name not in file_schema.names or file_schema.field(field.name).type != field.type
+    ]
+    if mismatched:
+        print(f"Partition for season {season} isn't in the stats schema and will be fetched again.")
+        return False
+
+    # Use the row group statistics so the check doesn't read any data pages
+    season_index = file_schema.get_field_index('Season')
+    for row_group in range(metadata.num_row_groups):
+        statistics = metadata.row_group(row_group).column(season_index).statistics
+        if statistics is not None and statistics.has_min_max and not (statistics.min == statistics.max == int(season)):
+            print(f"Partition for season {season} contains other seasons and will be fetched again.")
+            return False
+    return True
+
+def ingest_season_partition(api_key, season, dataset_path, batch_size=5000, session=None):
+    """
+    Stream one season into its partition of the dataset. Every field of the payload is
+    kept; the STATS_SCHEMA columns are typed by RAW_STATS_SCHEMA, the others inferred.
+    An empty payload leaves no partition behind.
+
+    Returns:
+    int: Number of rows written.
+    """
+    partition_path = season_partition_path(dataset_path, season)
+    os.makedirs(os.path.dirname(partition_path), exist_ok=True)
+    rows = write_records_to_parquet(
+        stream_player_season_stats(api_key, season, session=session), partition_path, batch_size,
+        declared=RAW_STATS_SCHEMA
+    )
+    if rows == 0:
+        os.remove(partition_path)
+        os.rmdir(os.path.dirname(partition_path))
+    return rows
+
+def backfill_player_season_stats(start_season, end_season, dataset_path=None, max_workers=4, batch_size=5000, force=False):
+    """
+    Fetch a range of seasons concurrently into a season-partitioned Parquet dataset.
+
+    The backfill is resumable: seasons whose partition already exists and verifies are
+    skipped, so an interrupted run only fetches what is missing.
+
+    Parameters:
+    start_season (int): First season to fetch.
+    end_season (int): Last season to fetch (inclusive).
+    dataset_path (str): Dataset root, defaults to RAW_STATS_DATA_PATH/player_season_stats.
+    max_workers (int): Maximum number of seasons fetched at the same time.
+    batch_size (int): Number of records parsed and written at a time per season.
+    force (bool): Re-fetch seasons even if their partition verifies.
+
+    Returns:
+    dict: Rows written per fetched season; skipped seasons are not included.
+    """
+    api_key = os.getenv('SPORTS_DATA_API_KEY')
+    dataset_path = dataset_path or os.path.join(os.getenv('RAW_STATS_DATA_PATH'), 'player_season_stats')
+
+    seasons = list(range(int(start_season), int(end_season) + 1))
+    pending = [season for season in seasons if force or not verify_season_partition(dataset_path, season)]
+    if len(pending) < len(seasons):
+        print(f"Skipping {len(seasons) - len(pending)} seasons that are already in {dataset_path}")
+    if not pending:
+        return {}
+
+    written = {}
+    failed = {}
+    max_workers = max(1, min(max_workers, len(pending)))
+    start = time.perf_counter()
+    with create_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(ingest_season_partition, api_key, season, dataset_path, batch_size, session): season
+            for season in pending
+        }
+        for future in as_completed(futures):
+            season = futures[future]
+            try:
+                written[season] = future.result()
+                print(f"Wrote {written[season]} rows for season {season}")
+            except Exception as error:
+                failed[season] = error
+                print(f"Failed to backfill season {season}: {error}")
+
+    print(f"Backfilled {len(written)} seasons in {time.perf_counter() - start:.2f}s")
+    get_default_client().print_stats()
+    if failed:
+        raise Exception(f"Failed to backfill seasons {sorted(failed)}; re-run to resume.")
+    return written
+
+def unify_partition_schemas(fragments, partitioning_schema):
+    """
+    One schema over the given partition files and the partition columns.
+
+    Each column keeps the type its files agree on. A field outside RAW_STATS_SCHEMA can be
+    typed differently in different seasons (e.g. strings in a season whose first batch had
+    no values for it); it is read as strings then.
+    """
+    types = {}
+    for fragment in fragments:
+        for field in fragment.physical_schema:
+            if types.setdefault(field.name, field.type) != field.type:
+                types[field.name] = pa.string()
+    fields = [pa.field(name, arrow_type) for name, arrow_type in types.items()]
+    return pa.schema(fields + [field for field in partitioning_schema if field.name not in types])
+
+def read_player_season_stats(dataset_path=None, seasons=None, columns=None):
+    """
+    Read the season-partitioned stats dataset, only opening the partitions that are needed.
+
+    Parameters:
+    dataset_path (str): Dataset root, defaults to RAW_STATS_DATA_PATH/player_season_stats.
+    seasons (list): Seasons to read, all of them if not given.
+    columns (list): Columns to read, all of them if not given.
+
+    Returns:
+    DataFrame: The selected stats, in the compact dtypes of STATS_SCHEMA.
+    """
+    dataset_path = dataset_path or os.path.join(os.getenv('RAW_STATS_DATA_PATH'), 'player_season_stats')
+    dataset = ds.dataset(dataset_path, format='parquet', partitioning='hive')
+    season_filter = ds.field('season').isin([int(season) for season in seasons]) if seasons else None
+
+    # Seasons can carry different fields; read them all rather than only the first file's
+    schema = unify_partition_schemas(dataset.get_fragments(filter=season_filter), dataset.partitioning.schema)
+    dataset = ds.dataset(dataset_path, format='parquet', partitioning='hive', schema=schema)
+    return apply_dtypes(dataset.to_table(columns=columns, filter=season_filter).to_pandas(), STATS_SCHEMA)
 
 # Example usage
 if __name__ == "__main__":
     season = '2024'  # Specify the season you want to fetch stats for
-    ingest_player_season_stats(season)
\ No newline at end of file
+    # python src/ingest/fetch_all_player_stats.py stream  -> bounded-memory Parquet ingest
+    # python src/ingest/fetch_all_player_stats.py backfill 2015 2024 [workers]  -> season=YYYY/ dataset
+    if len(sys.argv) > 1 and sys.argv[1] == 'stream':
+        ingest_player_season_stats_streaming(season)
+    elif len(sys.argv) > 3 and sys.argv[1] == 'backfill':
+        max_workers = int(sys.argv[4]) if len(sys.argv) > 4 else int(os.getenv('INGEST_MAX_WORKERS', '4'))
+        backfill_player_season_stats(sys.argv[2], sys.argv[3], max_workers=max_workers)
+    else:
+        ingest_player_season_stats(season)
\ No newline at end of file
@@ -1,58 +1,98 @@
+import sys
+import os
+
+# Add the root directory of the project to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
 import pandas as pd
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import os
+from src.ingest.sportsdata_client import ingest_data_from_api, get_default_client, create_session, API_BASE_URL
+from src.ingest.normalize import normalize_players
+from src.utils.player_io import write_players
+from src.utils.instrumentation import record
 import time
 
 # Load environment variables from .env file
 load_dotenv()
 
-def ingest_data_from_api(api_url, headers, retries=3, delay=5):
-    for attempt in range(retries):
-        print(f"Fetching data from API: {api_url} (Attempt {attempt + 1})")
-        response = requests.get(api_url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            # Print out the first item to inspect for timestamps
-            if data:
-                print("Sample data:", data[0])
-            return data
-        else:
-            print(f"Failed to fetch data from API. Status code: {response.status_code}, Response: {response.text}")
-            if attempt < retries - 1:
-                time.sleep(delay)
-            else:
-                raise Exception("Failed to fetch data from API after multiple attempts.")
-
-def fetch_team_roster(team, api_key):
-    url = f"https://api.sportsdata.io/v3/mlb/scores/json/PlayersBasic/{team}?key={api_key}"
+# SportsDataIO team keys for all 30 MLB clubs
+MLB_TEAMS = [
+    'ARI', 'ATL', 'BAL', 'BOS', 'CHC', 'CHW', 'CIN', 'CLE', 'COL', 'DET',
+    'HOU', 'KC', 'LAA', 'LAD', 'MIA', 'MIL', 'MIN', 'NYM', 'NYY', 'OAK',
+    'PHI', 'PIT', 'SD', 'SEA', 'SF', 'STL', 'TB', 'TEX', 'TOR', 'WSH'
+]
+
+def fetch_team_roster(team, api_key, session=None, base_url=API_BASE_URL):
+    url = f"{base_url}/v3/mlb/scores/json/PlayersBasic/{team}?key={api_key}"
     headers = {'Ocp-Apim-Subscription-Key': api_key}
-    return ingest_data_from_api(url, headers)
-
-def convert_datetime_format(players):
-    for player in players:
-        if 'BirthDate' in player and player['BirthDate']:
-            player['BirthDate'] = pd.to_datetime(player['BirthDate'], format='%Y-%m-%dT%H:%M:%S', errors='coerce').strftime('%Y-%m-%d')
-        if 'ProDebut' in player and player['ProDebut']:
-            player['ProDebut'] = pd.to_datetime(player['ProDebut'], format='%Y-%m-%dT%H:%M:%S', errors='coerce').strftime('%Y-%m-%d')
-    return players
+    return ingest_data_from_api(url, headers, session=session)
+
+def fetch_league_rosters(api_key, teams=None, max_workers=8, base_url=API_BASE_URL):
+    """
+    Fetch several team rosters concurrently over one pooled session and merge them.
+
+    Parameters:
+    api_key (str): SportsDataIO API key.
+    teams (list): Team keys to fetch, all 30 MLB teams by default.
+    max_workers (int): Maximum number of requests in flight at once.
+    base_url (str): API root, e.g. a local stub server in tests.
 
+    Returns:
+    DataFrame: All rosters, with a RosterTeam column naming the roster each player came from.
+    """
+    teams = list(teams or MLB_TEAMS)
+    max_workers = max(1, min(max_workers, len(teams)))
 
-def store_players_in_csv(players, csv_file_path):
-    df = pd.DataFrame(players)
-    df.to_csv(csv_file_path, index=False)
+    with create_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        rosters = list(executor.map(
+            lambda team: fetch_team_roster(team, api_key, session=session, base_url=base_url), teams
+        ))
 
-def ingest_marlins_roster():
+    frames = []
+    for team, players in zip(teams, rosters):
+        roster = pd.DataFrame(players or [])
+        roster['RosterTeam'] = team
+        frames.append(roster)
+
+    # Normalize dates once over the merged frame rather than per team or per player
+    return normalize_players(pd.concat(frames, ignore_index=True))
+
+def ingest_marlins_roster(store=True):
     api_key = os.getenv('SPORTS_DATA_API_KEY')
     team = 'MIA'
     players = fetch_team_roster(team, api_key)
-    players = convert_datetime_format(players)
-    csv_file_path = os.getenv('RAW_DATA_PATH')
-    store_players_in_csv(players, csv_file_path)
+    players = normalize_players(players)
+    record(rows_out=len(players))
+    if store:
+        # RAW_DATA_PATH ending in .parquet hands the roster on as typed Parquet instead of CSV
+        raw_data_path = os.getenv('RAW_DATA_PATH')
+        write_players(players, raw_data_path)
 
     # Print the first few rows of the DataFrame to inspect the data
-    print(pd.DataFrame(players).head())
+    print(players.head())
+    get_default_client().print_stats()
+    return players
+
+def ingest_league_rosters():
+    api_key = os.getenv('SPORTS_DATA_API_KEY')
+    max_workers = int(os.getenv('INGEST_MAX_WORKERS', '8'))
+
+    start = time.perf_counter()
+    rosters = fetch_league_rosters(api_key, max_workers=max_workers)
+    print(f"Fetched {len(rosters)} players from {rosters['RosterTeam'].nunique()} rosters "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    raw_data_path = os.getenv('RAW_LEAGUE_DATA_PATH')
+    write_players(rosters, raw_data_path)
+
+    print(rosters.head())
+    get_default_client().print_stats()
 
 # Example usage
 if __name__ == "__main__":
-    ingest_marlins_roster()
\ No newline at end of file
+    # python src/ingest/ingest_data.py league  -> every team's roster
+    if len(sys.argv) > 1 and sys.argv[1] == 'league':
+        ingest_league_rosters()
+    else:
+        ingest_marlins_roster()
\ No newline at end of file
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+# Format the SportsDataIO API uses for dates, e.g. '1992-07-04T00:00:00'
+API_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+OUTPUT_DATE_FORMAT = '%Y-%m-%d'
+
+# Date columns that don't follow the *Date naming pattern
+EXTRA_DATE_COLUMNS = ('ProDebut',)
+
+def find_date_columns(df):
+    """
+    Return the columns of a player frame that hold API dates.
+    """
+    return [column for column in df.columns if column.endswith('Date') or column in EXTRA_DATE_COLUMNS]
+
+def normalize_date_column(series, input_format=API_DATETIME_FORMAT, output_format=OUTPUT_DATE_FORMAT):
+    """
+    Reformat a column of date strings, parsing each distinct value only once.
+
+    Birth and debut dates repeat a lot across a roster, so the column is factorized and
+    only the unique strings are parsed (with an explicit format) and formatted; the
+    results are then mapped back to every row through the factor codes.
+
+    Parameters:
+    series (Series): Column of date strings, may contain nulls.
+    input_format (str): strptime format of the incoming values.
+    output_format (str): strftime format of the returned values.
+
+    Returns:
+    Series: Reformatted strings, null where the value was missing or unparseable.
+    """
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return pd.Series(None, index=series.index, dtype=object)
+
+    uniques = pd.Series(uniques).astype(str)
+    parsed = pd.to_datetime(uniques, format=input_format, errors='coerce')
+
+    # Fall back to ISO 8601 for the few values in another shape (e.g. already date-only)
+    unparsed = parsed.isna()
+    if unparsed.any():
+        parsed[unparsed] = pd.to_datetime(uniques[unparsed], format='ISO8601', errors='coerce')
+
+    formatted = np.array(parsed.dt.strftime(output_format), dtype=object)
+    formatted[parsed.isna().to_numpy()] = None
+
+    # Code -1 marks missing values; point it at an extra trailing None
+    formatted = np.append(formatted, None)
+    return pd.Series(formatted[codes], index=series.index, dtype=object)
+
+def normalize_players(players, date_columns=None):
+    """
+    Build a DataFrame from API player records and normalize its date columns column-wise.
+
+    Parameters:
+    players (list or DataFrame): Player records from the API.
+    date_columns (list): Columns to normalize, detected from the column names if not given.
+
+    Returns:
+    DataFrame: The players with dates formatted as YYYY-MM-DD.
+    """
+    df = players if isinstance(players, pd.DataFrame) else pd.DataFrame(players)
+    for column in date_columns or find_date_columns(df):
+        if column in df.columns:
+            df[column] = normalize_date_column(df[column])
+    return df
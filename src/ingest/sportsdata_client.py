@@ -0,0 +1,366 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from src.utils.instrumentation import record, record_http
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Overridable so the ingestion can be pointed at a local stub server
+API_BASE_URL = os.getenv('SPORTS_DATA_API_BASE_URL', 'https://api.sportsdata.io')
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+DEFAULT_CACHE_DIR = os.getenv('API_CACHE_DIR', os.path.join(PROJECT_ROOT, 'data', 'cache', 'http'))
+DEFAULT_CACHE_TTL = float(os.getenv('API_CACHE_TTL', '300'))
+DEFAULT_CACHE_MAX_BYTES = int(os.getenv('API_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+def strip_api_key(url):
+    """
+    Remove the API key from a URL's query string so it can be logged and used as a cache key.
+    """
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name.lower() != 'key']
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def create_session(pool_size):
+    """
+    Create an HTTP session whose keep-alive connection pool can serve every worker at once.
+
+    Parameters:
+    pool_size (int): Number of connections to keep open per host.
+
+    Returns:
+    Session: requests session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class SportsDataClient:
+    """
+    HTTP client for the SportsDataIO API with an on-disk response cache.
+
+    Responses are cached by URL (without the API key). A cached response younger than
+    the TTL is returned without touching the network; an older one is revalidated with
+    If-None-Match / If-Modified-Since and reused on a 304. The cache is kept under
+    max_cache_bytes by evicting the least recently used entries.
+
+    Parameters:
+    cache_dir (str): Directory for cached responses, None disables caching.
+    ttl (float): Seconds a cached response is served without revalidation.
+    max_cache_bytes (int): Size limit of the cache directory.
+    session (Session): Optional requests session, e.g. a pooled one shared by worker threads.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_CACHE_TTL,
+                 max_cache_bytes=DEFAULT_CACHE_MAX_BYTES, session=None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_cache_bytes = max_cache_bytes
+        self.session = session
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'bytes_downloaded': 0, 'bytes_saved': 0}
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_paths(self, cache_key):
+        digest = hashlib.sha256(cache_key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{digest}.body'), os.path.join(self.cache_dir, f'{digest}.meta.json')
+
+    def _read_cache(self, cache_key):
+        body_path, meta_path = self._cache_paths(cache_key)
+        try:
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            with open(body_path, 'rb') as body_file:
+                body = body_file.read()
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = f'{meta_path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(tmp_path, meta_path)
+
+    def _write_cache(self, cache_key, meta, body=None):
+        body_path, meta_path = self._cache_paths(cache_key)
+        if body is not None:
+            tmp_path = f'{body_path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as body_file:
+                body_file.write(body)
+            os.replace(tmp_path, body_path)
+        self._write_meta(meta_path, meta)
+
+    def _count(self, counter, size=0, size_counter=None):
+        with self._lock:
+            self.stats[counter] += 1
+            if size_counter:
+                self.stats[size_counter] += size
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits in max_cache_bytes.
+        """
+        if not self.cache_dir:
+            return
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith('.meta.json'):
+                continue
+            meta_path = os.path.join(self.cache_dir, file_name)
+            body_path = meta_path[:-len('.meta.json')] + '.body'
+            try:
+                with open(meta_path) as meta_file:
+                    last_access = json.load(meta_file).get('last_access', 0)
+                size = os.path.getsize(body_path) + os.path.getsize(meta_path)
+            except (OSError, ValueError):
+                continue
+            entries.append((last_access, size, body_path, meta_path))
+
+        total_size = sum(entry[1] for entry in entries)
+        for last_access, size, body_path, meta_path in sorted(entries):
+            if total_size <= self.max_cache_bytes:
+                break
+            for path in (body_path, meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total_size -= size
+
+    def get(self, api_url, headers=None, retries=3, delay=5, ttl=None, session=None):
+        """
+        Fetch a URL, serving it from the cache when possible.
+
+        Parameters:
+        api_url (str): URL to fetch.
+        headers (dict): Request headers.
+        retries (int): Number of attempts before giving up.
+        delay (int): Seconds to wait between attempts.
+        ttl (float): Overrides the client's TTL for this call.
+        session (Session): Overrides the client's session for this call.
+
+        Returns:
+        bytes: Response body.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        cache_key = strip_api_key(api_url)
+        request_headers = dict(headers or {})
+
+        meta, body = self._read_cache(cache_key) if self.cache_dir else (None, None)
+        now = time.time()
+        if meta is not None:
+            if now - meta['fetched_at'] < ttl:
+                meta['last_access'] = now
+                self._write_meta(self._cache_paths(cache_key)[1], meta)
+                self._count('hits', len(body), 'bytes_saved')
+                record(http_cache_hits=1)
+                print(f"Serving cached response for {cache_key}")
+                return body
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        http = session or self.session or requests
+        for attempt in range(retries):
+            print(f"Fetching data from API: {cache_key} (Attempt {attempt + 1})")
+            start = time.perf_counter()
+            response = http.get(api_url, headers=request_headers)
+            record_http(time.perf_counter() - start, response.status_code, retry=attempt > 0, size=len(response.content))
+            if response.status_code == 304 and meta is not None:
+                meta['fetched_at'] = meta['last_access'] = time.time()
+                self._write_meta(self._cache_paths(cache_key)[1], meta)
+                self._count('revalidated', len(body), 'bytes_saved')
+                return body
+            if response.status_code == 200:
+                body = response.content
+                self._count('misses', len(body), 'bytes_downloaded')
+                if self.cache_dir:
+                    fetched_at = time.time()
+                    self._write_cache(cache_key, {
+                        'url': cache_key,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'fetched_at': fetched_at,
+                        'last_access': fetched_at,
+                    }, body)
+                    self.evict()
+                return body
+            print(f"Failed to fetch data from API. Status code: {response.status_code}, Response: {response.text}")
+            if attempt < retries - 1:
+                time.sleep(delay)
+        raise Exception("Failed to fetch data from API after multiple attempts.")
+
+    def stream(self, api_url, headers=None, retries=3, delay=5, ttl=None, session=None, chunk_size=1 << 16):
+        """
+        Yield the response body in chunks without holding all of it in memory.
+
+        Uses the cache the same way as get(): fresh or revalidated entries are read back
+        from disk in chunks, and a downloaded body is written to the cache as it streams.
+
+        Parameters:
+        api_url (str): URL to fetch.
+        headers (dict): Request headers.
+        retries (int): Number of attempts before giving up.
+        delay (int): Seconds to wait between attempts.
+        ttl (float): Overrides the client's TTL for this call.
+        session (Session): Overrides the client's session for this call.
+        chunk_size (int): Size of the yielded chunks in bytes.
+
+        Yields:
+        bytes: Consecutive pieces of the response body.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        cache_key = strip_api_key(api_url)
+        request_headers = dict(headers or {})
+
+        meta = None
+        if self.cache_dir:
+            body_path, meta_path = self._cache_paths(cache_key)
+            try:
+                with open(meta_path) as meta_file:
+                    meta = json.load(meta_file)
+                cached_size = os.path.getsize(body_path)
+            except (OSError, ValueError):
+                meta = None
+
+        if meta is not None:
+            if time.time() - meta['fetched_at'] < ttl:
+                meta['last_access'] = time.time()
+                self._write_meta(meta_path, meta)
+                self._count('hits', cached_size, 'bytes_saved')
+                record(http_cache_hits=1)
+                print(f"Serving cached response for {cache_key}")
+                yield from _iter_file(body_path, chunk_size)
+                return
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        http = session or self.session or requests
+        for attempt in range(retries):
+            print(f"Streaming data from API: {cache_key} (Attempt {attempt + 1})")
+            start = time.perf_counter()
+            with http.get(api_url, headers=request_headers, stream=True) as response:
+                # Time to the response headers; the body is counted as it streams
+                record_http(time.perf_counter() - start, response.status_code, retry=attempt > 0)
+                if response.status_code == 304 and meta is not None:
+                    meta['fetched_at'] = meta['last_access'] = time.time()
+                    self._write_meta(meta_path, meta)
+                    self._count('revalidated', cached_size, 'bytes_saved')
+                    yield from _iter_file(body_path, chunk_size)
+                    return
+                if response.status_code == 200:
+                    yield from self._stream_and_cache(cache_key, response, chunk_size)
+                    return
+                print(f"Failed to fetch data from API. Status code: {response.status_code}, Response: {response.text}")
+            if attempt < retries - 1:
+                time.sleep(delay)
+        raise Exception("Failed to fetch data from API after multiple attempts.")
+
+    def _stream_and_cache(self, cache_key, response, chunk_size):
+        """
+        Pass a streamed response through, writing it to the cache once it has been read completely.
+        """
+        size = 0
+        cache_file = None
+        if self.cache_dir:
+            body_path, meta_path = self._cache_paths(cache_key)
+            tmp_path = f'{body_path}.{threading.get_ident()}.tmp'
+            cache_file = open(tmp_path, 'wb')
+
+        completed = False
+        try:
+            for chunk in response.iter_content(chunk_size):
+                size += len(chunk)
+                # Counted per chunk: the consumer may stop reading once it has parsed the payload
+                record(http_bytes=len(chunk))
+                if cache_file:
+                    cache_file.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            if cache_file:
+                cache_file.close()
+                if not completed:
+                    os.remove(tmp_path)
+
+        self._count('misses', size, 'bytes_downloaded')
+        if cache_file:
+            os.replace(tmp_path, body_path)
+            fetched_at = time.time()
+            self._write_meta(meta_path, {
+                'url': cache_key,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': fetched_at,
+                'last_access': fetched_at,
+            })
+            self.evict()
+
+    def get_json(self, api_url, headers=None, retries=3, delay=5, ttl=None, session=None):
+        """
+        Fetch a URL through the cache and decode the JSON body.
+        """
+        return json.loads(self.get(api_url, headers, retries=retries, delay=delay, ttl=ttl, session=session))
+
+    def print_stats(self):
+        print(f"API cache: {self.stats['hits']} hits, {self.stats['revalidated']} revalidated, "
+              f"{self.stats['misses']} misses, {self.stats['bytes_downloaded']} bytes downloaded, "
+              f"{self.stats['bytes_saved']} bytes saved")
+
+def _iter_file(path, chunk_size):
+    with open(path, 'rb') as body_file:
+        while True:
+            chunk = body_file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+_default_client = None
+
+def get_default_client():
+    """
+    Return the process-wide client so every ingest module shares one cache and one set of counters.
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = SportsDataClient()
+    return _default_client
+
+def ingest_data_from_api(api_url, headers, retries=3, delay=5, session=None, client=None, ttl=None):
+    """
+    Fetch JSON from the SportsDataIO API through the shared cached client.
+
+    Parameters:
+    api_url (str): URL to fetch.
+    headers (dict): Request headers.
+    retries (int): Number of attempts before giving up.
+    delay (int): Seconds to wait between attempts.
+    session (Session): Optional requests session to send uncached requests through.
+    client (SportsDataClient): Client to use, the shared default one if not given.
+    ttl (float): Overrides the client's TTL for this call.
+
+    Returns:
+    list: Decoded JSON payload.
+    """
+    client = client or get_default_client()
+    data = client.get_json(api_url, headers, retries=retries, delay=delay, ttl=ttl, session=session)
+    # Print out the first item to inspect for timestamps
+    if data:
+        print("Sample data:", data[0])
+    return data
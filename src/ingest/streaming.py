@@ -0,0 +1,184 @@
+import codecs
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.instrumentation import record, record_file_written
+
+# Integer columns that stay integers; every other number is stored as float64 because
+# the stats API reports most counting stats as decimals
+INTEGER_COLUMNS = {'Season', 'SeasonType', 'Jersey'}
+
+_WHITESPACE = ' \t\n\r,'
+
+def iter_json_array(chunks):
+    """
+    Incrementally parse a top-level JSON array, yielding each element as soon as it is complete.
+
+    Only the element currently being parsed is held in memory, not the whole document.
+
+    Parameters:
+    chunks (iterable): Byte chunks of a UTF-8 encoded JSON array.
+
+    Yields:
+    object: The decoded array elements, in order.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    position = 0
+    started = False
+
+    for chunk in chunks:
+        buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("Expected the response to be a JSON array.")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element continues in the next chunk
+                break
+            yield item
+
+    raise ValueError("The JSON array ended before its closing bracket.")
+
+def iter_batches(items, batch_size):
+    """
+    Group an iterable into lists of at most batch_size items.
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _infer_field(name, values):
+    non_null = [value for value in values if value is not None]
+    if non_null and all(isinstance(value, bool) for value in non_null):
+        return pa.field(name, pa.bool_())
+    if non_null and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in non_null):
+        if name.endswith('ID') or name in INTEGER_COLUMNS:
+            return pa.field(name, pa.int64())
+        return pa.field(name, pa.float64())
+    return pa.field(name, pa.string())
+
+def infer_schema(records, declared=None):
+    """
+    Infer a typed Arrow schema from a batch of API records.
+
+    Columns with no values in the batch are typed as strings.
+
+    Parameters:
+    records (list): List of record dicts.
+    declared (Schema): Columns whose type is fixed rather than inferred; they are always
+        included, after the batch's own columns if the batch doesn't have them.
+
+    Returns:
+    Schema: Arrow schema with the columns in first-seen order.
+    """
+    declared = declared or pa.schema([])
+    names = list(dict.fromkeys([*(name for record in records for name in record), *declared.names]))
+    return pa.schema([
+        declared.field(name) if name in declared.names else _infer_field(name, [record.get(name) for record in records])
+        for name in names
+    ])
+
+def _coerce_value(value, arrow_type):
+    if value is None:
+        return None
+    try:
+        if pa.types.is_string(arrow_type):
+            return value if isinstance(value, str) else json.dumps(value)
+        if pa.types.is_integer(arrow_type):
+            return int(value)
+        if pa.types.is_floating(arrow_type):
+            return float(value)
+        if pa.types.is_boolean(arrow_type):
+            return bool(value)
+    except (TypeError, ValueError):
+        pass
+    return None
+
+def records_to_batch(records, schema):
+    """
+    Convert a list of record dicts into a RecordBatch with the given schema.
+
+    Values that don't fit their column's type are coerced (numbers to strings,
+    numeric strings to numbers) and anything that can't be coerced becomes null.
+    Fields missing from the schema are dropped.
+
+    Parameters:
+    records (list): List of record dicts.
+    schema (Schema): Target Arrow schema.
+
+    Returns:
+    RecordBatch: The typed batch.
+    """
+    arrays = []
+    for field in schema:
+        values = [record.get(field.name) for record in records]
+        try:
+            arrays.append(pa.array(values, type=field.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            arrays.append(pa.array([_coerce_value(value, field.type) for value in values], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def write_records_to_parquet(records, parquet_path, batch_size=5000, schema=None, declared=None):
+    """
+    Write an iterable of record dicts to a Parquet file one batch at a time.
+
+    Peak memory is bounded by batch_size rather than by the number of records. The file
+    is written under a temporary name and moved into place once complete.
+
+    Parameters:
+    records (iterable): Record dicts, e.g. from iter_json_array.
+    parquet_path (str): Destination Parquet file.
+    batch_size (int): Number of records per batch / row group.
+    schema (Schema): Arrow schema to write, inferred from the first batch if not given.
+    declared (Schema): Column types to use instead of inferring them, see infer_schema.
+
+    Returns:
+    int: Number of rows written.
+    """
+    tmp_path = f'{parquet_path}.tmp'
+    writer = None
+    rows = 0
+    try:
+        for batch in iter_batches(records, batch_size):
+            if writer is None:
+                schema = schema or infer_schema(batch, declared)
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_batch(records_to_batch(batch, schema), row_group_size=batch_size)
+            rows += len(batch)
+        if writer is None:
+            # Empty payload: still leave a valid (empty) file behind
+            writer = pq.ParquetWriter(tmp_path, schema or declared or pa.schema([]))
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    writer.close()
+    os.replace(tmp_path, parquet_path)
+    record(rows_out=rows)
+    record_file_written(parquet_path)
+    return rows
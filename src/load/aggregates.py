@@ -0,0 +1,208 @@
+import os
+import sys
+from contextlib import contextmanager
+
+# Add the root directory of the project to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pandas as pd
+from sqlalchemy import text
+from dotenv import load_dotenv
+from src.utils.db_utils import get_engine
+
+load_dotenv()
+
+# Counts per table, aggregate and bucket, kept up to date by every load of the table
+AGGREGATE_TABLE = 'player_aggregates'
+
+# The same counts with each bucket's share of its aggregate, for dashboards
+AGGREGATE_VIEW = 'player_aggregate_shares'
+
+# Fixed histogram bins; buckets are stored by their lower edge, so changing a width needs
+# a rebuild (python src/load/aggregates.py rebuild)
+HEIGHT_BIN_INCHES = 1
+WEIGHT_BIN_LBS = 10
+
+# clean_data's spelling of the USA (see src/transform/normalization.py)
+USA = 'Usa'
+
+# aggregate -> (columns it needs, SQL bucket expression over a row alias r). Rows whose
+# bucket is NULL aren't counted; 'players' counts every row and marks the table as built.
+AGGREGATES = {
+    'players': ((), "'all'"),
+    'birth_state': (('BirthCountry', 'BirthState'), f"CASE WHEN r.\"BirthCountry\" = '{USA}' THEN r.\"BirthState\" END"),
+    'position_category': (('PositionCategory',), 'r."PositionCategory"'),
+    'height': (('Height',), f'CAST(CAST(r."Height" / {HEIGHT_BIN_INCHES} AS INTEGER) * {HEIGHT_BIN_INCHES} AS TEXT)'),
+    'weight': (('Weight',), f'CAST(CAST(r."Weight" / {WEIGHT_BIN_LBS} AS INTEGER) * {WEIGHT_BIN_LBS} AS TEXT)'),
+}
+
+# Aggregates whose buckets are bin edges rather than labels
+HISTOGRAMS = ('height', 'weight')
+
+def create_aggregate_table(connection):
+    connection.execute(text(f'''
+        CREATE TABLE IF NOT EXISTS {AGGREGATE_TABLE} (
+            table_name TEXT NOT NULL,
+            aggregate TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            player_count INTEGER NOT NULL,
+            PRIMARY KEY (table_name, aggregate, bucket)
+        )
+    '''))
+    connection.execute(text(f'''
+        CREATE VIEW IF NOT EXISTS {AGGREGATE_VIEW} AS
+        SELECT table_name, aggregate, bucket, player_count,
+            100.0 * player_count / SUM(player_count) OVER (PARTITION BY table_name, aggregate) AS percentage
+        FROM {AGGREGATE_TABLE}
+    '''))
+
+def _table_columns(connection, table_name):
+    return [row[1] for row in connection.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()]
+
+def _is_built(connection, table_name):
+    return connection.execute(text(
+        f"SELECT 1 FROM {AGGREGATE_TABLE} WHERE table_name = :table_name AND aggregate = 'players'"
+    ), {'table_name': table_name}).fetchone() is not None
+
+def _add_counts(connection, table_name, sign, changed_only=True):
+    """
+    Add (sign=1) or subtract (sign=-1) the buckets of a table's rows to its aggregates: all
+    rows, or only those of the players in temp.aggregate_player_ids.
+    """
+    columns = _table_columns(connection, table_name)
+    if not columns:
+        return
+    buckets = ' UNION ALL '.join(
+        f"SELECT '{aggregate}' AS aggregate, {expression} AS bucket FROM counted r"
+        for aggregate, (needed, expression) in AGGREGATES.items()
+        if all(column in columns for column in needed)
+    )
+    changed = 'JOIN temp.aggregate_player_ids c ON c."PlayerID" = t."PlayerID"' if changed_only else ''
+    connection.execute(text(f'''
+        WITH counted AS (SELECT t.* FROM "{table_name}" t {changed})
+        INSERT INTO {AGGREGATE_TABLE} (table_name, aggregate, bucket, player_count)
+        SELECT :table_name, aggregate, bucket, :sign * COUNT(*)
+        FROM ({buckets})
+        WHERE bucket IS NOT NULL
+        GROUP BY aggregate, bucket
+        ON CONFLICT (table_name, aggregate, bucket) DO UPDATE SET player_count = player_count + excluded.player_count
+    '''), {'table_name': table_name, 'sign': sign})
+
+def rebuild_table_aggregates(connection, table_name):
+    """
+    Recount a table's aggregates from all its rows.
+    """
+    create_aggregate_table(connection)
+    connection.execute(text(f'DELETE FROM {AGGREGATE_TABLE} WHERE table_name = :table_name'), {'table_name': table_name})
+    _add_counts(connection, table_name, 1, changed_only=False)
+
+@contextmanager
+def maintain_aggregates(connection, table_name, player_ids):
+    """
+    Keep a table's aggregates in step with the changes made inside the with block.
+
+    The changed players' rows are subtracted from the aggregates before the block and their
+    rows as they are afterwards are added back, so a load costs work in proportion to the
+    players it changed. Aggregates that were never built are counted from the whole table
+    once, before the changes.
+
+    Parameters:
+    connection (Connection): SQLAlchemy connection with an open transaction.
+    table_name (str): Table the block changes.
+    player_ids (list or str): PlayerIDs the block inserts, updates or deletes, or a SQL
+        query returning them (run before the block).
+    """
+    create_aggregate_table(connection)
+    if not _is_built(connection, table_name):
+        rebuild_table_aggregates(connection, table_name)
+
+    connection.execute(text('CREATE TEMP TABLE IF NOT EXISTS aggregate_player_ids ("PlayerID" INTEGER PRIMARY KEY)'))
+    connection.execute(text('DELETE FROM temp.aggregate_player_ids'))
+    if isinstance(player_ids, str):
+        connection.execute(text(f'INSERT OR IGNORE INTO temp.aggregate_player_ids ("PlayerID") {player_ids}'))
+    else:
+        parameters = [(int(player_id),) for player_id in pd.unique(pd.Series(player_ids).dropna())]
+        if parameters:
+            connection.exec_driver_sql('INSERT OR IGNORE INTO temp.aggregate_player_ids ("PlayerID") VALUES (?)', parameters)
+
+    _add_counts(connection, table_name, -1)
+    yield
+    _add_counts(connection, table_name, 1)
+    connection.execute(text(
+        f'DELETE FROM {AGGREGATE_TABLE} WHERE table_name = :table_name AND player_count = 0'
+    ), {'table_name': table_name})
+    connection.execute(text('DELETE FROM temp.aggregate_player_ids'))
+
+def read_aggregate(db_path, table_name, aggregate):
+    """
+    Read one maintained aggregate, e.g. read_aggregate(db_path, 'players', 'height').
+
+    Returns:
+    DataFrame: bucket, player_count and percentage, labels by count and histogram bins by
+        lower edge (as numbers).
+    """
+    with get_engine(db_path).connect() as connection:
+        result = pd.read_sql(text(f'''
+            SELECT bucket, player_count, percentage FROM {AGGREGATE_VIEW}
+            WHERE table_name = :table_name AND aggregate = :aggregate
+        '''), connection, params={'table_name': table_name, 'aggregate': aggregate})
+    if aggregate in HISTOGRAMS:
+        result['bucket'] = pd.to_numeric(result['bucket'])
+        return result.sort_values('bucket', ignore_index=True)
+    return result.sort_values(['player_count', 'bucket'], ascending=[False, True], ignore_index=True)
+
+def birth_state_comparison(mlb_db_path=None, marlins_db_path=None):
+    """
+    USA birth-state counts and percentages of all MLB players next to the Marlins', the
+    table data/birth_state_comparison.csv was built by hand from.
+
+    Parameters:
+    mlb_db_path (str): Database with the players table, DB_PATH_PLAYERS if not given.
+    marlins_db_path (str): Database with the marlins_players table, DB_PATH if not given.
+
+    Returns:
+    DataFrame: Indexed by state, with counts and percentages for both, zero where a state
+        has no players.
+    """
+    sides = {
+        'MLB': (mlb_db_path or os.getenv('DB_PATH_PLAYERS'), 'players'),
+        'Marlins': (marlins_db_path or os.getenv('DB_PATH'), 'marlins_players'),
+    }
+    columns = {}
+    for label, (db_path, table_name) in sides.items():
+        counts = read_aggregate(db_path, table_name, 'birth_state').set_index('bucket')
+        columns[f'{label} Birth State Counts'] = counts['player_count']
+        columns[f'{label} Percentage'] = counts['percentage']
+    comparison = pd.DataFrame(columns).fillna(0)
+    count_columns = [column for column in comparison.columns if column.endswith('Counts')]
+    comparison[count_columns] = comparison[count_columns].astype(int)
+    comparison.index.name = 'BirthState'
+    return comparison.sort_values(count_columns, ascending=False)
+
+def rebuild_aggregates(db_path, table_name):
+    """
+    Recount a table's aggregates from scratch, e.g. after changing a bin width.
+    """
+    with get_engine(db_path).begin() as connection:
+        rebuild_table_aggregates(connection, table_name)
+
+def _db_path_for(table_name):
+    return os.getenv('DB_PATH') if table_name == 'marlins_players' else os.getenv('DB_PATH_PLAYERS')
+
+if __name__ == "__main__":
+    # python src/load/aggregates.py show [players|marlins_players] [birth_state|position_category|height|weight]
+    # python src/load/aggregates.py comparison  -> MLB vs Marlins birth states
+    # python src/load/aggregates.py rebuild [table_name]
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    with pd.option_context('display.max_rows', 200, 'display.width', 200):
+        if command == 'show':
+            table_name = sys.argv[2] if len(sys.argv) > 2 else 'players'
+            aggregates = sys.argv[3:] or [aggregate for aggregate in AGGREGATES if aggregate != 'players']
+            for aggregate in aggregates:
+                print(f'{table_name} {aggregate}:')
+                print(read_aggregate(_db_path_for(table_name), table_name, aggregate).to_string(index=False))
+        elif command == 'comparison':
+            print(birth_state_comparison())
+        elif command == 'rebuild':
+            table_name = sys.argv[2] if len(sys.argv) > 2 else 'players'
+            rebuild_aggregates(_db_path_for(table_name), table_name)
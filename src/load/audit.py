@@ -0,0 +1,279 @@
+import json
+import os
+import sys
+
+# Add the root directory of the project to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pandas as pd
+from sqlalchemy import text
+from src.utils.db_utils import get_engine, to_sql_parameters
+
+# Audit rows store only what an operation changed: an insert carries the new row's non-null
+# values, a delete the removed row's non-null values and an update the changed columns'
+# old and new values, each as a JSON object keyed by column name
+AUDIT_COLUMNS = ('audit_id', 'operation_type', 'operation_timestamp', 'PlayerID', 'old_values', 'new_values')
+
+# Columns of a full-row (legacy) audit row that are not player values
+LEGACY_AUDIT_COLUMNS = ('audit_id', 'operation_type', 'operation_timestamp', 'PlayerID', 'row_hash')
+
+# SQLite functions take at most 127 arguments, so json_object() is built in pieces
+JSON_OBJECT_MAX_COLUMNS = 60
+
+def _dumps(values):
+    return None if values is None else json.dumps(values, separators=(',', ':'), default=str)
+
+def _format_timestamp(timestamp):
+    # Same text format to_sql writes for datetimes
+    return pd.Timestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+def create_audit_table(connection, audit_table):
+    """
+    Create a delta audit table and its lookup indexes if they don't exist.
+
+    Parameters:
+    connection (Connection): SQLAlchemy connection with an open transaction.
+    audit_table (str): Name of the audit table.
+    """
+    connection.execute(text(f'''
+        CREATE TABLE IF NOT EXISTS "{audit_table}" (
+            audit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            operation_type TEXT NOT NULL,
+            operation_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PlayerID INTEGER,
+            old_values TEXT,
+            new_values TEXT
+        )
+    '''))
+    connection.execute(text(
+        f'CREATE INDEX IF NOT EXISTS "ix_{audit_table}_PlayerID_operation_timestamp" '
+        f'ON "{audit_table}" ("PlayerID", operation_timestamp)'
+    ))
+    connection.execute(text(
+        f'CREATE INDEX IF NOT EXISTS "ix_{audit_table}_operation_type" ON "{audit_table}" (operation_type)'
+    ))
+    # Time-window scans (src/load/history.py) that aren't about one player
+    connection.execute(text(
+        f'CREATE INDEX IF NOT EXISTS "ix_{audit_table}_operation_timestamp" ON "{audit_table}" (operation_timestamp)'
+    ))
+
+def is_legacy_audit_table(connection, audit_table):
+    """
+    True if the audit table exists in the old format with a full copy of every column.
+    """
+    columns = [row[1] for row in connection.execute(text(f'PRAGMA table_info("{audit_table}")')).fetchall()]
+    return bool(columns) and 'new_values' not in columns
+
+def ensure_audit_table(connection, audit_table):
+    """
+    Create the audit table, migrating a full-row audit table to the delta format first.
+    """
+    if is_legacy_audit_table(connection, audit_table):
+        migrate_audit_table(connection, audit_table)
+    create_audit_table(connection, audit_table)
+
+def append_audit_records(connection, audit_table, operation_type, timestamp, player_ids, old_values, new_values):
+    """
+    Append audit rows with one executemany statement.
+
+    Parameters:
+    connection (Connection): SQLAlchemy connection with an open transaction.
+    audit_table (str): Audit table to append to.
+    operation_type (str): 'insert', 'update' or 'delete'.
+    timestamp (datetime): Time of the load the operations belong to.
+    player_ids (list): PlayerID per row.
+    old_values (list): JSON text (or None) per row.
+    new_values (list): JSON text (or None) per row.
+
+    Returns:
+    int: Number of rows appended.
+    """
+    if not len(player_ids):
+        return 0
+    operation_timestamp = _format_timestamp(timestamp)
+    parameters = [
+        (operation_type, operation_timestamp, player_id, old, new)
+        for player_id, old, new in zip(player_ids, old_values, new_values)
+    ]
+    connection.exec_driver_sql(
+        f'INSERT INTO "{audit_table}" (operation_type, operation_timestamp, PlayerID, old_values, new_values) '
+        f'VALUES (?, ?, ?, ?, ?)',
+        parameters
+    )
+    return len(parameters)
+
+def row_values(df, columns):
+    """
+    JSON object of each row's non-null values, for insert and delete audit rows.
+    """
+    values = {column: to_sql_parameters(df[column]) for column in columns if column in df.columns}
+    return [
+        _dumps({column: column_values[i] for column, column_values in values.items() if column_values[i] is not None})
+        for i in range(len(df))
+    ]
+
+def changed_values(old, new, columns):
+    """
+    JSON objects of the old and new values of the columns that differ, for update audit rows.
+
+    Parameters:
+    old (DataFrame): Rows as they were, aligned row for row with new.
+    new (DataFrame): Rows as they are now.
+    columns (list): Columns to compare; columns missing on one side count as NULL there.
+
+    Returns:
+    tuple: (old JSON per row, new JSON per row)
+    """
+    old = old.reindex(columns=columns)
+    new = new.reindex(columns=columns)
+    old_columns = {column: to_sql_parameters(old[column]) for column in columns}
+    new_columns = {column: to_sql_parameters(new[column]) for column in columns}
+
+    old_json, new_json = [], []
+    for i in range(len(new)):
+        changed = [column for column in columns if old_columns[column][i] != new_columns[column][i]]
+        old_json.append(_dumps({column: old_columns[column][i] for column in changed}))
+        new_json.append(_dumps({column: new_columns[column][i] for column in changed}))
+    return old_json, new_json
+
+def row_values_sql(alias, columns):
+    """
+    SQL expression building the JSON object of a row's non-null values.
+
+    json_patch() onto '{}' drops the null members, and also merges the pieces when there
+    are more columns than one json_object() call can take.
+    """
+    expression = "'{}'"
+    for start in range(0, len(columns), JSON_OBJECT_MAX_COLUMNS):
+        pairs = ', '.join(f"'{column}', {alias}.\"{column}\"" for column in columns[start:start + JSON_OBJECT_MAX_COLUMNS])
+        expression = f'json_patch({expression}, json_object({pairs}))'
+    return expression
+
+def changed_values_sql(old_alias, new_alias, columns, side):
+    """
+    SQL subquery building the JSON object of the changed columns' old (side='old') or new
+    (side='new') values between two row aliases.
+    """
+    alias = old_alias if side == 'old' else new_alias
+    changes = ' UNION ALL '.join(
+        f"SELECT '{column}' AS name, {alias}.\"{column}\" AS value "
+        f"WHERE {old_alias}.\"{column}\" IS NOT {new_alias}.\"{column}\""
+        for column in columns
+    )
+    return f'(SELECT json_group_object(name, value) FROM ({changes}))'
+
+def migrate_audit_table(connection, audit_table, chunksize=50000):
+    """
+    Rewrite a full-row audit table in the delta format.
+
+    Rows are replayed in insertion order, keeping the last known values of every player, so
+    each update can be reduced to the columns that actually changed. Updates that changed
+    nothing are dropped; updates of players with no earlier audit row keep their full row.
+    operation_timestamp is preserved, and so is audit_id where the old table had one.
+
+    Only updates get smaller. Insert and delete rows keep the whole row as a JSON object
+    that repeats every column name, two to three times the size of a full-row audit row,
+    so a history made mostly of inserts and deletes takes more space after the migration.
+
+    Parameters:
+    connection (Connection): SQLAlchemy connection with an open transaction.
+    audit_table (str): Audit table to migrate.
+    chunksize (int): Legacy rows read at a time.
+
+    Returns:
+    dict: Number of legacy rows read, rows written and no-op updates dropped.
+    """
+    legacy_table = f'{audit_table}_legacy'
+    connection.execute(text(f'ALTER TABLE "{audit_table}" RENAME TO "{legacy_table}"'))
+    create_audit_table(connection, audit_table)
+
+    legacy_columns = [row[1] for row in connection.execute(text(f'PRAGMA table_info("{legacy_table}")')).fetchall()]
+    value_columns = [column for column in legacy_columns if column not in LEGACY_AUDIT_COLUMNS]
+
+    last_values = {}
+    counts = {'read': 0, 'written': 0, 'dropped': 0}
+    # Tables created by to_sql have no audit_id; rowid follows the insertion order either way
+    query = f'SELECT * FROM "{legacy_table}" ORDER BY rowid'
+    for chunk in pd.read_sql(text(query), connection, chunksize=chunksize):
+        values = {column: to_sql_parameters(chunk[column]) for column in value_columns}
+        audit_ids = chunk['audit_id'].tolist() if 'audit_id' in chunk.columns else [None] * len(chunk)
+        parameters = []
+        for i, (audit_id, operation_type, operation_timestamp, player_id) in enumerate(zip(
+            audit_ids, chunk['operation_type'].tolist(),
+            to_sql_parameters(chunk['operation_timestamp']), chunk['PlayerID'].tolist()
+        )):
+            row = {column: values[column][i] for column in value_columns}
+            previous = last_values.get(player_id)
+            non_null = {column: value for column, value in row.items() if value is not None}
+
+            if operation_type == 'update' and previous is not None:
+                changed = [column for column in value_columns if row[column] != previous[column]]
+                if not changed:
+                    counts['dropped'] += 1
+                    continue
+                old = {column: previous[column] for column in changed}
+                new = {column: row[column] for column in changed}
+            elif operation_type == 'delete':
+                old, new = non_null, None
+            else:
+                old, new = None, non_null
+
+            last_values[player_id] = None if operation_type == 'delete' else row
+            parameters.append((audit_id, operation_type, operation_timestamp, player_id, _dumps(old), _dumps(new)))
+
+        if parameters:
+            connection.exec_driver_sql(
+                f'INSERT INTO "{audit_table}" (audit_id, operation_type, operation_timestamp, PlayerID, old_values, new_values) '
+                f'VALUES (?, ?, ?, ?, ?, ?)',
+                parameters
+            )
+        counts['read'] += len(chunk)
+        counts['written'] += len(parameters)
+
+    connection.execute(text(f'DROP TABLE "{legacy_table}"'))
+    print(f"Migrated '{audit_table}' to the delta format: {counts['read']} rows read, "
+          f"{counts['written']} written, {counts['dropped']} unchanged updates dropped.")
+    return counts
+
+def _database_size(engine, db_path):
+    """
+    Size of the database file once the WAL has been checkpointed into it.
+    """
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text('PRAGMA wal_checkpoint(TRUNCATE)'))
+    return os.path.getsize(db_path)
+
+def migrate_database(db_path, audit_tables=('players_audit', 'active_players_audit')):
+    """
+    One-time migration of a database's full-row audit tables to the delta format, followed
+    by a VACUUM so the file is rewritten at its new size.
+
+    The file shrinks when the history is mostly updates (typically the same roster
+    re-audited on every run) and grows when it is mostly inserts and deletes; see
+    migrate_audit_table. Both sizes are printed.
+    """
+    engine = get_engine(db_path)
+    # The engine is in WAL mode, so the file only reflects committed changes after a checkpoint
+    size_before = _database_size(engine, db_path)
+    with engine.begin() as connection:
+        migrated = [table for table in audit_tables if is_legacy_audit_table(connection, table)]
+        for audit_table in migrated:
+            migrate_audit_table(connection, audit_table)
+    if migrated:
+        # VACUUM can't run inside a transaction
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text('VACUUM'))
+        size_after = _database_size(engine, db_path)
+        print(f"Migrated {db_path}: {size_before / 1e6:.2f} MB -> {size_after / 1e6:.2f} MB")
+    else:
+        print(f"No full-row audit tables to migrate in {db_path}.")
+    return migrated
+
+if __name__ == "__main__":
+    # python src/load/audit.py migrate [db_path ...]  -> defaults to DB_PATH and DB_PATH_PLAYERS
+    from dotenv import load_dotenv
+    load_dotenv()
+    if len(sys.argv) > 1 and sys.argv[1] == 'migrate':
+        db_paths = sys.argv[2:] or [path for path in (os.getenv('DB_PATH'), os.getenv('DB_PATH_PLAYERS')) if path]
+        for db_path in db_paths:
+            migrate_database(db_path)
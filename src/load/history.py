@@ -0,0 +1,285 @@
+import json
+import os
+import sys
+
+# Add the root directory of the project to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pandas as pd
+from sqlalchemy import text
+from dotenv import load_dotenv
+from src.utils.db_utils import get_engine
+
+load_dotenv()
+
+# Audit table logging the changes of each player table; every other table is audited in
+# players_audit (marlins_players and players live in separate databases)
+AUDIT_TABLES = {'active_players': 'active_players_audit'}
+
+# A snapshot is written once this many audit rows have piled up since the previous one, so
+# an as-of query never replays more than about this many rows
+SNAPSHOT_INTERVAL = int(os.getenv('AUDIT_SNAPSHOT_INTERVAL', 5000))
+
+def _audit_table(table_name):
+    return AUDIT_TABLES.get(table_name, 'players_audit')
+
+def _format_timestamp(timestamp):
+    # Audit timestamps are stored as text in to_sql's format, which sorts chronologically
+    return pd.Timestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+def create_snapshot_tables(connection):
+    connection.execute(text('''
+        CREATE TABLE IF NOT EXISTS roster_snapshots (
+            snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            snapshot_timestamp DATETIME NOT NULL,
+            last_audit_id INTEGER NOT NULL,
+            row_count INTEGER
+        )
+    '''))
+    connection.execute(text(
+        'CREATE INDEX IF NOT EXISTS "ix_roster_snapshots_table_name_snapshot_timestamp" '
+        'ON roster_snapshots (table_name, snapshot_timestamp)'
+    ))
+    connection.execute(text('''
+        CREATE TABLE IF NOT EXISTS roster_snapshot_rows (
+            snapshot_id INTEGER NOT NULL,
+            PlayerID INTEGER NOT NULL,
+            row_values TEXT,
+            PRIMARY KEY (snapshot_id, PlayerID)
+        )
+    '''))
+
+def _has_table(connection, table_name):
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': table_name}
+    ).fetchone() is not None
+
+def _latest_snapshot(connection, table_name, as_of=None):
+    """
+    The newest snapshot of a table, or the newest one taken at or before as_of.
+    """
+    query = 'SELECT snapshot_id, snapshot_timestamp, last_audit_id FROM roster_snapshots WHERE table_name = :table_name'
+    parameters = {'table_name': table_name}
+    if as_of is not None:
+        query += ' AND snapshot_timestamp <= :as_of'
+        parameters['as_of'] = as_of
+    return connection.execute(text(query + ' ORDER BY snapshot_timestamp DESC, snapshot_id DESC LIMIT 1'), parameters).fetchone()
+
+def _apply_audit_row(state, operation_type, player_id, new_values):
+    if operation_type == 'delete':
+        state.pop(player_id, None)
+    elif operation_type == 'update' and player_id in state:
+        state[player_id] = {**state[player_id], **json.loads(new_values or '{}')}
+    else:
+        # Inserts carry the full row, as do updates of players with no earlier audit row
+        state[player_id] = json.loads(new_values or '{}')
+
+def _replay(connection, table_name, as_of=None, player_id=None):
+    """
+    Rebuild {PlayerID: {column: value}} from the nearest snapshot plus the audit rows after it.
+
+    Parameters:
+    connection (Connection): SQLAlchemy connection.
+    table_name (str): Player table to rebuild.
+    as_of (str): Formatted timestamp to rebuild at, the latest state if not given.
+    player_id (int): Only rebuild this player (an index lookup instead of a scan).
+
+    Returns:
+    tuple: (state, id of the last audit row applied)
+    """
+    audit_table = _audit_table(table_name)
+    state = {}
+    last_audit_id = 0
+    player_filter = ' AND PlayerID = :player_id' if player_id is not None else ''
+
+    snapshot = _latest_snapshot(connection, table_name, as_of) if _has_table(connection, 'roster_snapshots') else None
+    if snapshot is not None:
+        rows = connection.execute(
+            text(f'SELECT PlayerID, row_values FROM roster_snapshot_rows WHERE snapshot_id = :snapshot_id{player_filter}'),
+            {'snapshot_id': snapshot.snapshot_id, 'player_id': player_id}
+        ).fetchall()
+        # One json.loads over the whole snapshot is several times faster than one per player
+        values = json.loads('[' + ','.join(row_values for _, row_values in rows) + ']')
+        state = dict(zip((row[0] for row in rows), values))
+        last_audit_id = snapshot.last_audit_id
+
+    conditions = ['audit_id > :after']
+    parameters = {'after': last_audit_id}
+    if as_of is not None:
+        conditions.append('operation_timestamp <= :as_of')
+        parameters['as_of'] = as_of
+    if player_id is not None:
+        conditions.append('PlayerID = :player_id')
+        parameters['player_id'] = player_id
+
+    rows = connection.execute(text(f'''
+        SELECT audit_id, operation_type, PlayerID, new_values FROM "{audit_table}"
+        WHERE {' AND '.join(conditions)}
+        ORDER BY audit_id
+    '''), parameters)
+    for audit_id, operation_type, player_id, new_values in rows:
+        _apply_audit_row(state, operation_type, player_id, new_values)
+        last_audit_id = audit_id
+    return state, last_audit_id
+
+def _to_frame(state):
+    df = pd.DataFrame(list(state.values()))
+    df.insert(0, 'PlayerID', list(state.keys()))
+    return df.sort_values('PlayerID', ignore_index=True)
+
+def roster_as_of(db_path, as_of, table_name='players'):
+    """
+    Rebuild a player table as it was at a point in time.
+
+    Starts from the newest snapshot taken at or before as_of and replays only the audit
+    rows logged after it, so the cost depends on the snapshot interval rather than the
+    length of the audit history.
+
+    Parameters:
+    db_path (str): Path to the SQLite database file.
+    as_of (str or datetime): Point in time to rebuild.
+    table_name (str): 'players', 'marlins_players' or 'active_players'.
+
+    Returns:
+    DataFrame: One row per player on the table at that time.
+    """
+    engine = get_engine(db_path)
+    with engine.connect() as connection:
+        state, _ = _replay(connection, table_name, as_of=_format_timestamp(as_of))
+    return _to_frame(state)
+
+def player_as_of(db_path, player_id, as_of, table_name='players'):
+    """
+    A single player's row as it was at a point in time, or None if they weren't on the table.
+
+    Uses the (PlayerID, operation_timestamp) audit index, so it stays fast however long
+    the audit history is.
+    """
+    engine = get_engine(db_path)
+    with engine.connect() as connection:
+        state, _ = _replay(connection, table_name, as_of=_format_timestamp(as_of), player_id=int(player_id))
+    return state.get(int(player_id))
+
+def roster_changes(db_path, start, end, table_name='players'):
+    """
+    Net changes to a player table between two points in time.
+
+    A player inserted and then updated inside the window shows up once as an insert with
+    their values at end; a player changed back and forth doesn't show up at all.
+
+    Parameters:
+    db_path (str): Path to the SQLite database file.
+    start (str or datetime): Beginning of the window (exclusive).
+    end (str or datetime): End of the window (inclusive).
+    table_name (str): 'players', 'marlins_players' or 'active_players'.
+
+    Returns:
+    DataFrame: PlayerID, FirstName, LastName, operation_type ('insert', 'update' or
+        'delete') and the old_values / new_values dicts of the changed columns.
+    """
+    start, end = _format_timestamp(start), _format_timestamp(end)
+    engine = get_engine(db_path)
+    with engine.connect() as connection:
+        before, _ = _replay(connection, table_name, as_of=start)
+        window = connection.execute(text(f'''
+            SELECT audit_id, operation_type, PlayerID, new_values FROM "{_audit_table(table_name)}"
+            WHERE operation_timestamp > :start AND operation_timestamp <= :end
+            ORDER BY audit_id
+        '''), {'start': start, 'end': end}).fetchall()
+
+    # Only the players touched in the window can differ between the two states
+    after = {player_id: dict(before[player_id]) for player_id in {row.PlayerID for row in window} if player_id in before}
+    for _, operation_type, player_id, new_values in window:
+        _apply_audit_row(after, operation_type, player_id, new_values)
+
+    changes = []
+    for player_id in sorted({row.PlayerID for row in window}):
+        old, new = before.get(player_id), after.get(player_id)
+        if old is None and new is None:
+            continue
+        if old is None:
+            operation_type, old_values, new_values = 'insert', {}, new
+        elif new is None:
+            operation_type, old_values, new_values = 'delete', old, {}
+        else:
+            changed = [column for column in old.keys() | new.keys() if old.get(column) != new.get(column)]
+            if not changed:
+                continue
+            operation_type = 'update'
+            old_values = {column: old.get(column) for column in changed}
+            new_values = {column: new.get(column) for column in changed}
+        names = new or old
+        changes.append({
+            'PlayerID': player_id, 'FirstName': names.get('FirstName'), 'LastName': names.get('LastName'),
+            'operation_type': operation_type, 'old_values': old_values, 'new_values': new_values,
+        })
+    return pd.DataFrame(changes, columns=['PlayerID', 'FirstName', 'LastName', 'operation_type', 'old_values', 'new_values'])
+
+def create_snapshot(db_path, table_name='players'):
+    """
+    Save the current state of a player table, as rebuilt from its audit log, as a snapshot.
+
+    Returns:
+    int: The new snapshot_id, or None if the table has no audit rows yet.
+    """
+    engine = get_engine(db_path)
+    with engine.begin() as connection:
+        create_snapshot_tables(connection)
+        state, last_audit_id = _replay(connection, table_name)
+        if not last_audit_id:
+            return None
+        snapshot_timestamp = connection.execute(
+            text(f'SELECT operation_timestamp FROM "{_audit_table(table_name)}" WHERE audit_id = :audit_id'),
+            {'audit_id': last_audit_id}
+        ).scalar()
+        snapshot_id = connection.execute(text('''
+            INSERT INTO roster_snapshots (table_name, snapshot_timestamp, last_audit_id, row_count)
+            VALUES (:table_name, :snapshot_timestamp, :last_audit_id, :row_count)
+        '''), {
+            'table_name': table_name, 'snapshot_timestamp': snapshot_timestamp,
+            'last_audit_id': last_audit_id, 'row_count': len(state),
+        }).lastrowid
+        connection.exec_driver_sql(
+            'INSERT INTO roster_snapshot_rows (snapshot_id, PlayerID, row_values) VALUES (?, ?, ?)',
+            [(snapshot_id, player_id, json.dumps(values, separators=(',', ':'))) for player_id, values in state.items()]
+        )
+    print(f"Saved snapshot {snapshot_id} of '{table_name}' with {len(state)} players (audit_id {last_audit_id}).")
+    return snapshot_id
+
+def snapshot_if_due(db_path, table_name='players', interval=SNAPSHOT_INTERVAL):
+    """
+    Write a snapshot when at least interval audit rows have been logged since the last one.
+    """
+    engine = get_engine(db_path)
+    with engine.connect() as connection:
+        audit_table = _audit_table(table_name)
+        if not _has_table(connection, audit_table):
+            return None
+        snapshot = _latest_snapshot(connection, table_name) if _has_table(connection, 'roster_snapshots') else None
+        pending = connection.execute(
+            text(f'SELECT COUNT(*) FROM "{audit_table}" WHERE audit_id > :after'),
+            {'after': snapshot.last_audit_id if snapshot is not None else 0}
+        ).scalar()
+    if pending < interval:
+        return None
+    return create_snapshot(db_path, table_name)
+
+def _db_path_for(table_name):
+    return os.getenv('DB_PATH') if table_name == 'marlins_players' else os.getenv('DB_PATH_PLAYERS')
+
+if __name__ == "__main__":
+    # python src/load/history.py as-of "2025-02-18 12:00" [table_name]
+    # python src/load/history.py changes "2025-02-17" "2025-02-19" [table_name]
+    # python src/load/history.py snapshot [table_name]
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == 'as-of':
+        table_name = sys.argv[3] if len(sys.argv) > 3 else 'players'
+        print(roster_as_of(_db_path_for(table_name), sys.argv[2], table_name))
+    elif command == 'changes':
+        table_name = sys.argv[4] if len(sys.argv) > 4 else 'players'
+        with pd.option_context('display.max_colwidth', None, 'display.width', 200):
+            print(roster_changes(_db_path_for(table_name), sys.argv[2], sys.argv[3], table_name))
+    elif command == 'snapshot':
+        table_name = sys.argv[2] if len(sys.argv) > 2 else 'players'
+        create_snapshot(_db_path_for(table_name), table_name)
@@ -5,13 +5,151 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 import pandas as pd
-from sqlalchemy import create_engine, inspect
-from src.utils.db_utils import get_db_connection
+from sqlalchemy import inspect, text
+from src.utils.db_utils import get_db_connection, get_engine, to_sql_parameters
+from src.utils.instrumentation import record
+from src.utils.player_io import read_players
+from src.utils.schema import apply_dtypes, create_table_sql
+from src.load.aggregates import maintain_aggregates, rebuild_table_aggregates
+from src.load.audit import (
+    append_audit_records, changed_values, changed_values_sql, ensure_audit_table, row_values, row_values_sql
+)
 from datetime import datetime
 
 # Enable Copy-on-Write mode
 pd.options.mode.copy_on_write = True
 
+# Columns that describe the load itself rather than the player, left out of the row hash
+NON_BUSINESS_COLUMNS = ('operation_timestamp', 'operation_type', 'audit_id', 'row_hash')
+
+# Keep hashes within 53 bits so they survive a round trip through float64 when the
+# row_hash column holds NULLs (rows loaded before hashing was introduced)
+ROW_HASH_MASK = (1 << 53) - 1
+
+def _normalize_for_hash(series):
+    """
+    Render a column as strings so equal values hash the same regardless of dtype drift
+    between runs (e.g. Jersey as int64 one day and float64 the next).
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text_values = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+    elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        text_values = series.astype('float64').astype(str)
+    else:
+        # astype(str) on an object column can write 'None' over the column's own nulls (pandas
+        # 2.1), which to_sql would then store; converting a copy keeps the frame untouched
+        text_values = series.astype(object).astype(str)
+    return text_values.where(series.notna(), '')
+
+def compute_row_hash(df):
+    """
+    Compute a content hash per row over the business columns of a player frame.
+
+    Parameters:
+    df (DataFrame): Player data.
+
+    Returns:
+    Series: int64 hash per row, aligned with df's index.
+    """
+    columns = sorted(column for column in df.columns if column not in NON_BUSINESS_COLUMNS)
+    normalized = pd.DataFrame({column: _normalize_for_hash(df[column]) for column in columns}, index=df.index)
+    hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy() & ROW_HASH_MASK
+    return pd.Series(hashes.astype('int64'), index=df.index)
+
+def find_changed_records(incoming, existing):
+    """
+    Return the incoming rows that already exist in the table but whose row_hash differs.
+
+    Parameters:
+    incoming (DataFrame): Incoming data with a row_hash column.
+    existing (DataFrame): Existing rows with PlayerID and (possibly NULL) row_hash columns.
+
+    Returns:
+    DataFrame: The changed incoming rows.
+    """
+    existing_hashes = existing.drop_duplicates('PlayerID').set_index('PlayerID')['row_hash']
+    previous_hashes = incoming['PlayerID'].map(existing_hashes)
+    is_common = incoming['PlayerID'].isin(existing_hashes.index)
+    return incoming[is_common & (incoming['row_hash'] != previous_hashes)]
+
+def update_records(connection, table_name, records, key='PlayerID'):
+    """
+    Update existing rows with a single prepared executemany statement.
+
+    The frame is turned into parameter tuples column by column instead of row by row,
+    and the statement is compiled once for the whole batch.
+
+    Parameters:
+    connection (Connection): SQLAlchemy connection with an open transaction.
+    table_name (str): Table to update.
+    records (DataFrame): New values, one row per record to update.
+    key (str): Column identifying the row to update.
+
+    Returns:
+    int: Number of rows updated.
+    """
+    if records.empty:
+        return 0
+
+    columns = [column for column in records.columns if column != key]
+    assignments = ', '.join(f'"{column}" = ?' for column in columns)
+    parameters = list(zip(*(to_sql_parameters(records[column]) for column in columns + [key])))
+
+    result = connection.exec_driver_sql(
+        f'UPDATE "{table_name}" SET {assignments} WHERE "{key}" = ?', parameters
+    )
+    return result.rowcount
+
+def _ensure_row_hash_column(connection, table_name):
+    """
+    Add the row_hash column to a table created before hashing was introduced.
+    """
+    columns = _table_columns(connection, table_name)
+    if columns and 'row_hash' not in columns:
+        connection.execute(text(f'ALTER TABLE "{table_name}" ADD COLUMN row_hash INTEGER'))
+
+def _value_columns(columns):
+    """
+    The player value columns of a frame or table, i.e. what the audit tables track.
+    """
+    return [column for column in columns if column not in NON_BUSINESS_COLUMNS + ('PlayerID',)]
+
+def _audit_inserts(connection, audit_table, records, value_columns, operation_timestamp):
+    append_audit_records(
+        connection, audit_table, 'insert', operation_timestamp, records['PlayerID'].tolist(),
+        [None] * len(records), row_values(records, value_columns)
+    )
+
+def _audit_updates(connection, audit_table, existing, records, value_columns, operation_timestamp):
+    # Line the old rows up with the updated ones to record only the columns that changed
+    previous = existing.drop_duplicates('PlayerID').set_index('PlayerID').loc[records['PlayerID']].reset_index()
+    old_values, new_values = changed_values(previous, records.reset_index(drop=True), value_columns)
+    # A changed row hash with no changed value (e.g. the hash of a PlayerID that used to be
+    # text) rewrites the row but isn't worth an audit row
+    changed = [old != '{}' for old in old_values]
+    append_audit_records(
+        connection, audit_table, 'update', operation_timestamp,
+        [player_id for player_id, keep in zip(records['PlayerID'].tolist(), changed) if keep],
+        [old for old, keep in zip(old_values, changed) if keep],
+        [new for new, keep in zip(new_values, changed) if keep],
+    )
+
+def _audit_deletes(connection, audit_table, records, operation_timestamp):
+    append_audit_records(
+        connection, audit_table, 'delete', operation_timestamp, records['PlayerID'].tolist(),
+        row_values(records, _value_columns(records.columns)), [None] * len(records)
+    )
+
+def _ensure_player_index(connection, table_name):
+    """
+    Unique index on PlayerID, used by the per-player UPDATE/DELETE statements and required by
+    the upsert path's ON CONFLICT("PlayerID"). Does nothing if the table doesn't exist yet.
+    """
+    if _table_columns(connection, table_name):
+        connection.execute(text(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS "ix_{table_name}_PlayerID" ON "{table_name}" ("PlayerID")'
+        ))
+
 def create_marlins_players(engine):
     """
     Create the marlins_players table with the correct schema if it doesn't exist.
@@ -19,200 +157,349 @@ def create_marlins_players(engine):
     Parameters:
     engine (Engine): SQLAlchemy engine object.
     """
-    with engine.connect() as connection:
-        connection.execute('''
-            CREATE TABLE IF NOT EXISTS marlins_players (
-                PlayerID INTEGER PRIMARY KEY,
-                SportsDataID TEXT,
-                Status TEXT,
-                TeamID INTEGER,
-                Team TEXT,
-                Jersey INTEGER,
-                PositionCategory TEXT,
-                Position TEXT,
-                MLBAMID INTEGER,
-                FirstName TEXT,
-                LastName TEXT,
-                BatHand TEXT,
-                ThrowHand TEXT,
-                Height REAL,
-                Weight REAL,
-                BirthDate TEXT,
-                BirthCity TEXT,
-                BirthState TEXT,
-                BirthCountry TEXT,
-                HighSchool TEXT,
-                College TEXT,
-                ProDebut TEXT
-            )
-        ''')
+    with engine.begin() as connection:
+        connection.execute(text(create_table_sql('marlins_players', primary_key='PlayerID')))
         
 def create_audit_table(db_path):
     """
     Create the players_audit table to log all changes.
+
+    Each row holds only what the operation changed, see src/load/audit.py.
     
     Parameters:
     db_path (str): Path to the SQLite database file.
     """
-    engine = create_engine(f'sqlite:///{db_path}')
-    with engine.connect() as connection:
-        connection.execute('''
-            CREATE TABLE IF NOT EXISTS players_audit (
-                audit_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                operation_type TEXT NOT NULL,
-                operation_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                PlayerID INTEGER,
-                SportsDataID TEXT,
-                Status TEXT,
-                TeamID INTEGER,
-                Team TEXT,
-                Jersey INTEGER,
-                PositionCategory TEXT,
-                Position TEXT,
-                MLBAMID INTEGER,
-                FirstName TEXT,
-                LastName TEXT,
-                BatHand TEXT,
-                ThrowHand TEXT,
-                Height REAL,
-                Weight REAL,
-                BirthDate TEXT,
-                BirthCity TEXT,
-                BirthState TEXT,
-                BirthCountry TEXT,
-                HighSchool TEXT,
-                College TEXT,
-                ProDebut TEXT
-            )
-        ''')
+    engine = get_engine(db_path)
+    with engine.begin() as connection:
+        ensure_audit_table(connection, 'players_audit')
 
-def load_data_to_db(transformed_data, db_path, table_name):
+def load_data_to_db(transformed_data, db_path, table_name, mode='replace'):
     """
     Load transformed data into the specified SQLite database table.
 
+    The whole load (table, active_players and both audit tables) runs in one transaction
+    and is committed once at the end.
+
     Parameters:
     transformed_data (DataFrame): The data to be loaded into the database.
     db_path (str): Path to the SQLite database file.
     table_name (str): Name of the target table in the database.
+    mode (str): 'replace' diffs the whole table in pandas, 'upsert' stages the data
+        and applies only the changed rows with SQL (see upsert_data_to_db).
     """
-    # Establish a database connection
-    engine = create_engine(f'sqlite:///{db_path}')
-    inspector = inspect(engine)
+    # Frames that didn't come through clean_data (or read_players) get the declared dtypes here
+    transformed_data = apply_dtypes(transformed_data)
+
+    if mode == 'upsert':
+        return upsert_data_to_db(transformed_data, db_path, table_name)
+    if mode != 'replace':
+        raise ValueError(f"Unknown load mode '{mode}', expected 'replace' or 'upsert'.")
+
+    # Get the shared database engine
+    engine = get_engine(db_path)
+    record(rows_in=len(transformed_data))
 
     # Add a timestamp column to the transformed data
-    transformed_data['operation_timestamp'] = datetime.now()
-
-    # Check if the table exists
-    if inspector.has_table(table_name):
-        # Load existing data from the table
-        existing_data = pd.read_sql(table_name, con=engine)
-
-        # Identify new records by checking which IDs are not in the existing data
-        new_records = transformed_data[~transformed_data['PlayerID'].isin(existing_data['PlayerID'])]
-
-        # Identify updated records by checking for differences in existing records
-        common_records = transformed_data[transformed_data['PlayerID'].isin(existing_data['PlayerID'])]
-        updated_records = common_records.merge(existing_data, on='PlayerID', suffixes=('', '_existing'))
-
-        # Ensure matching columns before comparison
-        updated_records_filtered = updated_records.filter(regex='^(?!.*_existing$)')
-        common_records_filtered = common_records[updated_records_filtered.columns]
-
-        if not new_records.empty:
-            # Append new records to the table
-            new_records.to_sql(table_name, con=engine, if_exists='append', index=False)
-            new_records.loc[:,'operation_type'] = 'insert'
-            new_records.to_sql('players_audit', con=engine, if_exists='append', index=False)
-            print(f"Inserted {len(new_records)} new records into the '{table_name}' table.")
-
-        if not updated_records_filtered.empty:
-            # Update existing records in the table
-            updated_records_filtered.to_sql(table_name, con=engine, if_exists='replace', index=False)
-            updated_records_filtered = updated_records_filtered.copy()
-            updated_records_filtered.loc[:, 'operation_type'] = 'update'
-            updated_records_filtered.to_sql('players_audit', con=engine, if_exists='append', index=False)
-            print(f"Updated {len(updated_records_filtered)} records in the '{table_name}' table.")
-
-        # Identify deleted records by checking which IDs are not in the transformed data
-        deleted_records = existing_data[~existing_data['PlayerID'].isin(transformed_data['PlayerID'])]
-        if not deleted_records.empty:
-            deleted_records = deleted_records.copy()
-            deleted_records.loc[:, 'operation_type'] = 'delete'
-            deleted_records.to_sql('players_audit', con=engine, if_exists='append', index=False)
-            print(f"Deleted {len(deleted_records)} records from the '{table_name}' table.")
-    else:
-        # If the table doesn't exist, create it and insert all data
-        transformed_data.to_sql(table_name, con=engine, if_exists='replace', index=False)
-        transformed_data.loc[:, 'operation_type'] = 'insert'
-        transformed_data.to_sql('players_audit', con=engine, if_exists='append', index=False)
-        print(f"Table '{table_name}' created successfully with {len(transformed_data)} entries.")
-        
-    # Filter active players
-    active_players = transformed_data[transformed_data['Status'] == 'Active']
-
-   # Create or update the active_players table
-    if inspector.has_table('active_players'):
-        # Load existing data from the active_players table
-        existing_active_data = pd.read_sql('active_players', con=engine)
-
-        # Identify new active records
-        new_active_records = active_players[~active_players['PlayerID'].isin(existing_active_data['PlayerID'])]
-
-        # Identify updated active records
-        common_active_records = active_players[active_players['PlayerID'].isin(existing_active_data['PlayerID'])]
-        updated_active_records = common_active_records.merge(existing_active_data, on='PlayerID', suffixes=('', '_existing'))
-
-        # Ensure matching columns before comparison
-        updated_active_records_filtered = updated_active_records.filter(regex='^(?!.*_existing$)')
-        common_active_records_filtered = common_active_records[updated_active_records_filtered.columns]
-
-        if not new_active_records.empty:
-            # Append new active records to the active_players table
-            new_active_records.to_sql('active_players', con=engine, if_exists='append', index=False)
-            new_active_records.loc[:,'operation_type'] = 'insert'
-            new_active_records.to_sql('active_players_audit', con=engine, if_exists='append', index=False)
-            print(f"Inserted {len(new_active_records)} new records into the 'active_players' table.")
-
-        if not updated_active_records_filtered.empty:
-            # Update existing active records in the active_players table
-            for index, row in updated_active_records_filtered.iterrows():
-                # Convert row to a dictionary and handle None values
-                row_dict = row.to_dict()
-                row_dict = {k: (None if pd.isna(v) else v) for k, v in row_dict.items()}
-                # Convert Timestamp to string
-                for key in ['BirthDate', 'ProDebut', 'operation_timestamp']:
-                    if key in row_dict and isinstance(row_dict[key], pd.Timestamp):
-                        row_dict[key] = row_dict[key].strftime('%Y-%m-%d %H:%M:%S')
-                engine.execute(f"""
-                    UPDATE active_players
-                    SET {', '.join([f"{col} = ?" for col in updated_active_records_filtered.columns])}
-                    WHERE PlayerID = ?
-                """, tuple(row_dict.values()) + (row_dict['PlayerID'],))
-            updated_active_records_filtered['operation_type'] = 'update'
-            updated_active_records_filtered.to_sql('active_players_audit', con=engine, if_exists='append', index=False)
-            print(f"Updated {len(updated_active_records_filtered)} records in the 'active_players' table.")
-
-        # Identify deleted active records
-        deleted_active_records = existing_active_data[~existing_active_data['PlayerID'].isin(active_players['PlayerID'])]
-        if not deleted_active_records.empty:
-            deleted_active_records = deleted_active_records.copy()
-            deleted_active_records.loc[:, 'operation_type'] = 'delete'
-            deleted_active_records.to_sql('active_players_audit', con=engine, if_exists='append', index=False)
-            engine.execute(f"DELETE FROM active_players WHERE PlayerID IN ({', '.join(map(str, deleted_active_records['PlayerID'].tolist()))})")
-            print(f"Deleted {len(deleted_active_records)} records from the 'active_players' table.")
+    operation_timestamp = datetime.now()
+    transformed_data['operation_timestamp'] = operation_timestamp
+
+    # Hash the business columns so unchanged players can be skipped
+    transformed_data['row_hash'] = compute_row_hash(transformed_data)
+
+    # Columns whose changes are audited
+    value_columns = _value_columns(transformed_data.columns)
+
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+
+        for existing_table in (table_name, 'active_players'):
+            _ensure_row_hash_column(connection, existing_table)
+            _ensure_player_index(connection, existing_table)
+        for audit_table in ('players_audit', 'active_players_audit'):
+            ensure_audit_table(connection, audit_table)
+
+        # Check if the table exists
+        if inspector.has_table(table_name):
+            # Load existing data from the table, in the same dtypes as the incoming frame (tables
+            # loaded before PlayerID was an integer store it as text)
+            existing_data = apply_dtypes(pd.read_sql(table_name, con=connection))
+
+            # Identify new records by checking which IDs are not in the existing data
+            new_records = transformed_data[~transformed_data['PlayerID'].isin(existing_data['PlayerID'])]
+
+            # Identify updated records by comparing content hashes with the existing records
+            updated_records_filtered = find_changed_records(transformed_data, existing_data)
+
+            # Identify deleted records by checking which IDs are not in the transformed data
+            deleted_records = existing_data[~existing_data['PlayerID'].isin(transformed_data['PlayerID'])]
+
+            # The aggregate tables follow the changed players only
+            changed_ids = pd.concat([
+                new_records['PlayerID'], updated_records_filtered['PlayerID'], deleted_records['PlayerID']
+            ])
+            with maintain_aggregates(connection, table_name, changed_ids):
+                if not new_records.empty:
+                    # Append new records to the table
+                    new_records.to_sql(table_name, con=connection, if_exists='append', index=False)
+                    _audit_inserts(connection, 'players_audit', new_records, value_columns, operation_timestamp)
+                    record(rows_inserted=len(new_records))
+                    print(f"Inserted {len(new_records)} new records into the '{table_name}' table.")
+
+                if not updated_records_filtered.empty:
+                    # Rewrite only the changed records in the table
+                    update_records(connection, table_name, updated_records_filtered)
+                    _audit_updates(connection, 'players_audit', existing_data, updated_records_filtered,
+                                   value_columns, operation_timestamp)
+                    record(rows_updated=len(updated_records_filtered))
+                    print(f"Updated {len(updated_records_filtered)} records in the '{table_name}' table.")
+
+                if not deleted_records.empty:
+                    _audit_deletes(connection, 'players_audit', deleted_records, operation_timestamp)
+                    connection.execute(
+                        text(f'DELETE FROM "{table_name}" WHERE "PlayerID" = :player_id'),
+                        [{'player_id': player_id} for player_id in deleted_records['PlayerID'].tolist()]
+                    )
+                    record(rows_deleted=len(deleted_records))
+                    print(f"Deleted {len(deleted_records)} records from the '{table_name}' table.")
+        else:
+            # If the table doesn't exist, create it and insert all data
+            transformed_data.to_sql(table_name, con=connection, if_exists='replace', index=False)
+            _ensure_player_index(connection, table_name)
+            rebuild_table_aggregates(connection, table_name)
+            _audit_inserts(connection, 'players_audit', transformed_data, value_columns, operation_timestamp)
+            record(rows_inserted=len(transformed_data))
+            print(f"Table '{table_name}' created successfully with {len(transformed_data)} entries.")
+
+        # Filter active players
+        active_players = transformed_data[transformed_data['Status'] == 'Active']
+
+        # Create or update the active_players table
+        if inspector.has_table('active_players'):
+            # Load existing data from the active_players table
+            existing_active_data = apply_dtypes(pd.read_sql('active_players', con=connection))
+
+            # Identify new active records
+            new_active_records = active_players[~active_players['PlayerID'].isin(existing_active_data['PlayerID'])]
+
+            # Identify updated active records by comparing content hashes
+            updated_active_records_filtered = find_changed_records(active_players, existing_active_data)
+
+            if not new_active_records.empty:
+                # Append new active records to the active_players table
+                new_active_records.to_sql('active_players', con=connection, if_exists='append', index=False)
+                _audit_inserts(connection, 'active_players_audit', new_active_records, value_columns, operation_timestamp)
+                record(active_rows_inserted=len(new_active_records))
+                print(f"Inserted {len(new_active_records)} new records into the 'active_players' table.")
+
+            if not updated_active_records_filtered.empty:
+                # Update existing active records in the active_players table in one batch
+                update_records(connection, 'active_players', updated_active_records_filtered)
+                _audit_updates(connection, 'active_players_audit', existing_active_data, updated_active_records_filtered,
+                               value_columns, operation_timestamp)
+                record(active_rows_updated=len(updated_active_records_filtered))
+                print(f"Updated {len(updated_active_records_filtered)} records in the 'active_players' table.")
+
+            # Identify deleted active records
+            deleted_active_records = existing_active_data[~existing_active_data['PlayerID'].isin(active_players['PlayerID'])]
+            if not deleted_active_records.empty:
+                _audit_deletes(connection, 'active_players_audit', deleted_active_records, operation_timestamp)
+                connection.execute(
+                    text('DELETE FROM active_players WHERE "PlayerID" = :player_id'),
+                    [{'player_id': player_id} for player_id in deleted_active_records['PlayerID'].tolist()]
+                )
+                record(active_rows_deleted=len(deleted_active_records))
+                print(f"Deleted {len(deleted_active_records)} records from the 'active_players' table.")
+        else:
+            # If the active_players table doesn't exist, create it and insert all active data
+            active_players.to_sql('active_players', con=connection, if_exists='replace', index=False)
+            _ensure_player_index(connection, 'active_players')
+            _audit_inserts(connection, 'active_players_audit', active_players, value_columns, operation_timestamp)
+            record(active_rows_inserted=len(active_players))
+            print(f"Table 'active_players' created successfully with {len(active_players)} entries.")
+
+
+def _table_columns(connection, table_name):
+    """
+    Return an ordered {column: declared type} mapping for a table (empty if it doesn't exist).
+    """
+    rows = connection.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()
+    return {row[1]: row[2] for row in rows}
+
+def _ensure_target_table(connection, staging_table, table_name, audit_table):
+    """
+    Make sure the target and audit tables exist, the target carries every staged column and
+    has a unique index on PlayerID so that INSERT ... ON CONFLICT(PlayerID) can be used.
+    """
+    staged_columns = _table_columns(connection, staging_table)
+
+    if not _table_columns(connection, table_name):
+        connection.execute(text(f'CREATE TABLE "{table_name}" AS SELECT * FROM "{staging_table}" WHERE 0'))
+    _ensure_player_index(connection, table_name)
+
+    ensure_audit_table(connection, audit_table)
+
+    # Add any column the incoming data has but the existing table doesn't
+    existing_columns = _table_columns(connection, table_name)
+    for column, column_type in staged_columns.items():
+        if column not in existing_columns:
+            connection.execute(text(f'ALTER TABLE "{table_name}" ADD COLUMN "{column}" {column_type}'))
+
+def _changed_predicate(left, right, columns):
+    """
+    SQL condition that is true when any of the given columns differ between two row aliases.
+    """
+    return ' OR '.join(f'{left}."{column}" IS NOT {right}."{column}"' for column in columns)
+
+def apply_staged_changes(connection, staging_table, table_name, audit_table, columns, stage_filter=None,
+                         operation_timestamp=None):
+    """
+    Apply the inserts, updates and deletes between a staging table and a target table
+    with set-based SQL, logging each change to the audit table.
+
+    Only rows that are new, changed or gone are written, so the work done scales with the
+    number of changed players rather than the size of the roster.
+
+    Parameters:
+    connection (Connection): SQLAlchemy connection with an open transaction.
+    staging_table (str): Table holding the full incoming data.
+    table_name (str): Target table to bring in line with the staged data.
+    audit_table (str): Audit table the changes are appended to.
+    columns (list): Columns to load, must include PlayerID.
+    stage_filter (str): Optional SQL condition restricting which staged rows apply.
+    operation_timestamp (datetime): Time recorded in the audit rows, now if not given.
+
+    Returns:
+    dict: Number of inserted, updated and deleted rows.
+    """
+    source = f'(SELECT * FROM "{staging_table}" WHERE {stage_filter or 1})'
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    source_columns = ', '.join(f's."{column}"' for column in columns)
+    # With a row hash a single comparison replaces the column-by-column one
+    if 'row_hash' in columns:
+        compared_columns = ['row_hash']
     else:
-        # If the active_players table doesn't exist, create it and insert all active data
-        active_players.to_sql('active_players', con=engine, if_exists='replace', index=False)
-        active_players.loc[:,'operation_type'] = 'insert'
-        active_players.to_sql('active_players_audit', con=engine, if_exists='append', index=False)
-        print(f"Table 'active_players' created successfully with {len(active_players)} entries.")
+        compared_columns = _value_columns(columns)
+    value_columns = _value_columns(columns)
+    audit_parameters = {'operation_timestamp': (operation_timestamp or datetime.now()).strftime('%Y-%m-%d %H:%M:%S.%f')}
+
+    # Audit the changes before they are applied so updates and deletes still see the old rows
+    inserted = connection.execute(text(f'''
+        INSERT INTO "{audit_table}" (operation_type, operation_timestamp, "PlayerID", new_values)
+        SELECT 'insert', :operation_timestamp, s."PlayerID", {row_values_sql('s', value_columns)}
+        FROM {source} s
+        WHERE NOT EXISTS (SELECT 1 FROM "{table_name}" t WHERE t."PlayerID" = s."PlayerID")
+    '''), audit_parameters).rowcount
+
+    updated = connection.execute(text(f'''
+        INSERT INTO "{audit_table}" (operation_type, operation_timestamp, "PlayerID", old_values, new_values)
+        SELECT 'update', :operation_timestamp, s."PlayerID",
+            {changed_values_sql('t', 's', value_columns, 'old')},
+            {changed_values_sql('t', 's', value_columns, 'new')}
+        FROM {source} s
+        JOIN "{table_name}" t ON t."PlayerID" = s."PlayerID"
+        WHERE ({_changed_predicate('t', 's', compared_columns)})
+            AND ({_changed_predicate('t', 's', value_columns)})
+    '''), audit_parameters).rowcount
+
+    deleted = connection.execute(text(f'''
+        INSERT INTO "{audit_table}" (operation_type, operation_timestamp, "PlayerID", old_values)
+        SELECT 'delete', :operation_timestamp, t."PlayerID", {row_values_sql('t', value_columns)}
+        FROM "{table_name}" t
+        WHERE NOT EXISTS (SELECT 1 FROM {source} s WHERE s."PlayerID" = t."PlayerID")
+    '''), audit_parameters).rowcount
+
+    connection.execute(text(f'''
+        DELETE FROM "{table_name}"
+        WHERE NOT EXISTS (SELECT 1 FROM {source} s WHERE s."PlayerID" = "{table_name}"."PlayerID")
+    '''))
+
+    # The WHERE 1 keeps SQLite from reading ON CONFLICT as part of a join
+    update_columns = ', '.join(f'"{column}" = excluded."{column}"' for column in columns if column != 'PlayerID')
+    connection.execute(text(f'''
+        INSERT INTO "{table_name}" ({column_list})
+        SELECT {source_columns} FROM {source} s WHERE 1
+        ON CONFLICT ("PlayerID") DO UPDATE SET {update_columns}
+        WHERE {_changed_predicate(f'"{table_name}"', 'excluded', compared_columns)}
+    '''))
+
+    return {'insert': inserted, 'update': updated, 'delete': deleted}
+
+def upsert_data_to_db(transformed_data, db_path, table_name):
+    """
+    Load transformed data by bulk-copying it into a staging table and applying the
+    differences to the target and active_players tables in a single transaction.
+
+    Unlike the 'replace' path, the existing table is never read into pandas or rewritten.
+
+    Parameters:
+    transformed_data (DataFrame): The data to be loaded into the database.
+    db_path (str): Path to the SQLite database file.
+    table_name (str): Name of the target table in the database.
+
+    Returns:
+    dict: Change counts for the target table and the active_players table.
+    """
+    engine = get_engine(db_path)
+
+    # Add a timestamp column and the content hash to the transformed data
+    operation_timestamp = datetime.now()
+    transformed_data['operation_timestamp'] = operation_timestamp
+    transformed_data['row_hash'] = compute_row_hash(transformed_data)
+    columns = list(transformed_data.columns)
+    staging_table = f'{table_name}_staging'
+
+    with engine.begin() as connection:
+        transformed_data.to_sql(staging_table, con=connection, if_exists='replace', index=False)
+        # The insert and delete checks look players up by PlayerID on both sides
+        connection.execute(text(
+            f'CREATE INDEX "ix_{staging_table}_PlayerID" ON "{staging_table}" ("PlayerID")'
+        ))
+
+        _ensure_target_table(connection, staging_table, table_name, 'players_audit')
+        _ensure_target_table(connection, staging_table, 'active_players', 'active_players_audit')
+
+        # The aggregate tables follow the players whose row is new, changed or gone
+        changed_ids = f'''
+            SELECT s."PlayerID" FROM "{staging_table}" s
+            LEFT JOIN "{table_name}" t ON t."PlayerID" = s."PlayerID"
+            WHERE t.row_hash IS NOT s.row_hash
+            UNION
+            SELECT t."PlayerID" FROM "{table_name}" t
+            WHERE NOT EXISTS (SELECT 1 FROM "{staging_table}" s WHERE s."PlayerID" = t."PlayerID")
+        '''
+        with maintain_aggregates(connection, table_name, changed_ids):
+            table_changes = apply_staged_changes(
+                connection, staging_table, table_name, 'players_audit', columns,
+                operation_timestamp=operation_timestamp
+            )
+
+        changes = {
+            table_name: table_changes,
+            'active_players': apply_staged_changes(
+                connection, staging_table, 'active_players', 'active_players_audit', columns,
+                stage_filter="\"Status\" = 'Active'", operation_timestamp=operation_timestamp
+            ),
+        }
+
+        connection.execute(text(f'DROP TABLE "{staging_table}"'))
+
+    record(rows_in=len(transformed_data))
+    for target, counts in changes.items():
+        # Same counter names as the 'replace' path
+        prefix = 'rows' if target == table_name else 'active_rows'
+        record(**{f'{prefix}_inserted': counts['insert'], f'{prefix}_updated': counts['update'],
+                  f'{prefix}_deleted': counts['delete']})
+        print(f"Inserted {counts['insert']}, updated {counts['update']} and deleted {counts['delete']} "
+              f"records in the '{target}' table.")
+
+    return changes
 
 
 # Example usage
 if __name__ == "__main__":
-    # Read data from CSV file
+    # Read data from the CSV or Parquet file
     csv_file_path = 'C:/Users/Mitch/Desktop/data-engineering-project/data/raw/marlins_roster.csv'
-    transformed_data = pd.read_csv(csv_file_path, parse_dates=['BirthDate'])
+    transformed_data = read_players(csv_file_path)
     
     # Database configuration
     db_config = {
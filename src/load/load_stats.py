@@ -0,0 +1,225 @@
+import sys
+import os
+
+# Add the root directory of the project to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from dotenv import load_dotenv
+from src.utils.db_utils import get_engine, to_sql_parameters
+from src.utils.instrumentation import record
+from src.utils.player_io import read_players
+from src.utils.schema import STATS_SCHEMA, apply_dtypes, create_table_sql
+from src.ingest.fetch_all_player_stats import read_player_season_stats
+from src.load.load_data import NON_BUSINESS_COLUMNS, ROW_HASH_MASK
+from datetime import datetime
+
+load_dotenv()
+
+# One row per player and season, in the players database by default so it joins to
+# players / active_players on PlayerID
+STATS_TABLE = 'player_season_stats'
+STATS_KEY = ('PlayerID', 'Season')
+
+# The table is WITHOUT ROWID, so rows are stored in (PlayerID, Season) order and a player's
+# seasons are one range read. Secondary indexes carry the key columns too, so these cover
+# "who played for a team in a season" and its join to the player tables.
+STATS_INDEXES = {
+    f'ix_{STATS_TABLE}_Season_Team': ('Season', 'Team'),
+    f'ix_{STATS_TABLE}_Team_Season': ('Team', 'Season'),
+}
+
+def stats_db_path():
+    return os.getenv('STATS_DB_PATH') or os.getenv('DB_PATH_PLAYERS')
+
+def create_stats_table(connection, table_name=STATS_TABLE):
+    """
+    Create the season stats table and its indexes if they don't exist.
+
+    Parameters:
+    connection (Connection): SQLAlchemy connection.
+    table_name (str): Table to create.
+    """
+    connection.execute(text(create_table_sql(table_name, STATS_SCHEMA, primary_key=STATS_KEY, extra_columns=[
+        ('operation_timestamp', 'TEXT'),
+        ('row_hash', 'INTEGER'),
+    ], without_rowid=True)))
+    for index_name, columns in STATS_INDEXES.items():
+        index_name = index_name.replace(STATS_TABLE, table_name, 1)
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        connection.execute(text(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{table_name}" ({column_list})'))
+
+def compute_stats_hash(stats):
+    """
+    Content hash per row over the stat columns.
+
+    Unlike the player row hash, numbers are hashed as float64 values rather than text: a
+    stats row is almost all numbers, and the text rendering would dominate the load. Nulls
+    are rewritten as one NaN, since 0/0 and a parsed empty field differ in their bits.
+
+    Returns:
+    Series: int64 hash per row, aligned with stats' index.
+    """
+    columns = sorted(column for column in stats.columns if column not in NON_BUSINESS_COLUMNS)
+    hashed = stats[columns].assign(**{
+        column: np.where(stats[column].isna(), np.nan, stats[column].astype('float64')) for column in columns
+        if pd.api.types.is_numeric_dtype(stats[column]) and not pd.api.types.is_bool_dtype(stats[column])
+    })
+    hashes = pd.util.hash_pandas_object(hashed, index=False).to_numpy() & ROW_HASH_MASK
+    return pd.Series(hashes.astype('int64'), index=stats.index)
+
+def read_stats_file(path):
+    """
+    Read season stats from a CSV or Parquet file, or the season=YYYY/ dataset directory
+    written by fetch_all_player_stats.py backfill, in the dtypes of STATS_SCHEMA.
+    """
+    if os.path.isdir(path):
+        return read_player_season_stats(path)
+    return read_players(path, schema=STATS_SCHEMA)
+
+def load_stats_to_db(stats, db_path=None, table_name=STATS_TABLE):
+    """
+    Load season stats into the stats table in one transaction.
+
+    The rows are bulk-copied into a temporary staging table and applied with one INSERT ... ON
+    CONFLICT(PlayerID, Season) statement that only rewrites rows whose content hash changed.
+    Each season in the incoming data is treated as complete: stored rows of those seasons
+    that are no longer in it are deleted, other seasons are left alone. Only the columns
+    declared in STATS_SCHEMA are stored.
+
+    Parameters:
+    stats (DataFrame): PlayerSeasonStats rows, e.g. from read_stats_file.
+    db_path (str): Path to the SQLite database file, STATS_DB_PATH (or DB_PATH_PLAYERS) if not given.
+    table_name (str): Name of the target table in the database.
+
+    Returns:
+    dict: Number of inserted, updated and deleted rows.
+    """
+    engine = get_engine(db_path or stats_db_path())
+    record(rows_in=len(stats))
+
+    columns = [field.name for field in STATS_SCHEMA if field.name in stats.columns]
+    missing_key = [column for column in STATS_KEY if column not in columns]
+    if missing_key:
+        raise ValueError(f"Season stats are missing the key column(s) {missing_key}.")
+    stats = apply_dtypes(stats[columns], STATS_SCHEMA)
+
+    # The key can't be NULL, and the API sends one row per player and season; if a player
+    # shows up twice the last row wins
+    keyed = stats.dropna(subset=list(STATS_KEY)).drop_duplicates(subset=list(STATS_KEY), keep='last')
+    if len(keyed) < len(stats):
+        print(f"Skipped {len(stats) - len(keyed)} season stats rows without a PlayerID/Season or with a duplicate one.")
+    stats = keyed
+
+    # Hash the stats so unchanged rows aren't rewritten
+    stats['operation_timestamp'] = datetime.now()
+    stats['row_hash'] = compute_stats_hash(stats)
+    columns = list(stats.columns)
+    staging_table = f'{table_name}_staging'
+
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    key_list = ', '.join(f'"{column}"' for column in STATS_KEY)
+    key_match = ' AND '.join(f's."{column}" = t."{column}"' for column in STATS_KEY)
+    update_columns = ', '.join(f'"{column}" = excluded."{column}"' for column in columns if column not in STATS_KEY)
+
+    # Bound straight through sqlite3's executemany; to_sql spends most of its time building
+    # SQLAlchemy parameters for wide frames like this one
+    rows = list(zip(*(to_sql_parameters(stats[column]) for column in columns)))
+
+    with engine.begin() as connection:
+        create_stats_table(connection, table_name)
+        connection.execute(text(f'DROP TABLE IF EXISTS temp."{staging_table}"'))
+        connection.execute(text(
+            f'CREATE TEMP TABLE "{staging_table}" AS SELECT {column_list} FROM "{table_name}" WHERE 0'
+        ))
+        connection.exec_driver_sql(
+            f'INSERT INTO temp."{staging_table}" ({column_list}) VALUES ({", ".join("?" * len(columns))})', rows
+        )
+        connection.execute(text(f'CREATE INDEX temp."ix_{staging_table}_key" ON "{staging_table}" ({key_list})'))
+
+        deleted = connection.execute(text(f'''
+            DELETE FROM "{table_name}" AS t
+            WHERE t."Season" IN (SELECT DISTINCT "Season" FROM "{staging_table}")
+                AND NOT EXISTS (SELECT 1 FROM "{staging_table}" s WHERE {key_match})
+        ''')).rowcount
+
+        inserted, updated = connection.execute(text(f'''
+            SELECT COALESCE(SUM(t."PlayerID" IS NULL), 0),
+                COALESCE(SUM(t."PlayerID" IS NOT NULL AND t.row_hash IS NOT s.row_hash), 0)
+            FROM "{staging_table}" s
+            LEFT JOIN "{table_name}" t ON {key_match}
+        ''')).fetchone()
+
+        # The WHERE 1 keeps SQLite from reading ON CONFLICT as part of a join
+        connection.execute(text(f'''
+            INSERT INTO "{table_name}" ({column_list})
+            SELECT {column_list} FROM "{staging_table}" WHERE 1
+            ON CONFLICT ({key_list}) DO UPDATE SET {update_columns}
+            WHERE "{table_name}".row_hash IS NOT excluded.row_hash
+        '''))
+
+        connection.execute(text(f'DROP TABLE temp."{staging_table}"'))
+
+    changes = {'insert': inserted, 'update': updated, 'delete': deleted}
+    record(rows_inserted=inserted, rows_updated=updated, rows_deleted=deleted)
+    print(f"Inserted {inserted}, updated {updated} and deleted {deleted} records in the '{table_name}' table.")
+    return changes
+
+def read_season_stats(db_path=None, player_ids=None, seasons=None, team=None, columns=None, table_name=STATS_TABLE):
+    """
+    Read season stats from the database through its key and indexes, e.g. every season of
+    a few players, or a team's players in one season.
+
+    Parameters:
+    db_path (str): Path to the SQLite database file, STATS_DB_PATH (or DB_PATH_PLAYERS) if not given.
+    player_ids (list): Players to read, all of them if not given.
+    seasons (list): Seasons to read, all of them if not given.
+    team (str): Team abbreviation to filter on, e.g. 'MIA'.
+    columns (list): Columns to read, all the STATS_SCHEMA columns if not given.
+    table_name (str): Stats table.
+
+    Returns:
+    DataFrame: The rows ordered by PlayerID and Season, in the dtypes of STATS_SCHEMA.
+    """
+    conditions, parameters = [], {}
+    for column, values in (('PlayerID', player_ids), ('Season', seasons)):
+        if values is not None:
+            names = [f'{column}_{position}' for position in range(len(values))]
+            conditions.append(f'"{column}" IN ({", ".join(":" + name for name in names) or "NULL"})')
+            parameters.update({name: int(value) for name, value in zip(names, values)})
+    if team is not None:
+        conditions.append('"Team" = :team')
+        parameters['team'] = team
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    select = ', '.join(f'"{column}"' for column in columns or STATS_SCHEMA.names)
+
+    with get_engine(db_path or stats_db_path()).connect() as connection:
+        stats = pd.read_sql(text(f'SELECT {select} FROM "{table_name}"{where} ORDER BY "PlayerID", "Season"'),
+                            connection, params=parameters)
+    return apply_dtypes(stats, STATS_SCHEMA)
+
+def default_stats_path():
+    """
+    The backfilled season dataset if there is one, else the single-season Parquet or CSV file.
+    """
+    raw_data_path = os.getenv('RAW_STATS_DATA_PATH')
+    for name in ('player_season_stats', 'player_season_stats.parquet', 'player_season_stats.csv'):
+        path = os.path.join(raw_data_path, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No player_season_stats dataset, Parquet or CSV file in {raw_data_path}.")
+
+if __name__ == "__main__":
+    # python src/load/load_stats.py load [file or dataset directory]  -> into STATS_DB_PATH
+    # python src/load/load_stats.py player <PlayerID> [<PlayerID> ...]  -> every season of those players
+    # python src/load/load_stats.py team <Team> <Season>
+    command = sys.argv[1] if len(sys.argv) > 1 else 'load'
+    with pd.option_context('display.max_rows', 200, 'display.width', 200):
+        if command == 'load':
+            load_stats_to_db(read_stats_file(sys.argv[2] if len(sys.argv) > 2 else default_stats_path()))
+        elif command == 'player':
+            print(read_season_stats(player_ids=[int(player_id) for player_id in sys.argv[2:]]))
+        elif command == 'team':
+            print(read_season_stats(team=sys.argv[2], seasons=[int(sys.argv[3])]))
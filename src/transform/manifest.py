@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+
+from sqlalchemy import text
+from src.transform.normalization import LOCATION_MAPPINGS_PATH
+from src.utils.db_utils import get_engine
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+MANIFEST_FILE_NAME = 'transform_manifest.json'
+
+# Source files whose contents decide what the transform produces; editing any of them
+# (or the reviewed location mappings) changes the transform version and invalidates the manifest
+TRANSFORM_SOURCES = [
+    os.path.join(PROJECT_ROOT, 'src', 'transform', 'transform_data.py'),
+    os.path.join(PROJECT_ROOT, 'src', 'transform', 'normalization.py'),
+    os.path.join(PROJECT_ROOT, 'src', 'utils', 'player_io.py'),
+    os.path.join(PROJECT_ROOT, 'src', 'utils', 'schema.py'),
+]
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """
+    Return the sha256 hex digest of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def transform_code_version(sources=TRANSFORM_SOURCES, mappings_path=LOCATION_MAPPINGS_PATH):
+    """
+    Hash of the transform code and the reviewed mappings it applies.
+
+    Only the mapping entries with a target are hashed: the transform itself adds unknown
+    spellings to the file with a null target, and those don't change its output.
+    """
+    digest = hashlib.sha256()
+    for path in sources:
+        if os.path.exists(path):
+            digest.update(os.path.basename(path).encode())
+            digest.update(hash_file(path).encode())
+    if mappings_path and os.path.exists(mappings_path):
+        with open(mappings_path) as mapping_file:
+            mappings = json.load(mapping_file)
+        reviewed = {
+            field: {raw: target for raw, target in entries.items() if target is not None}
+            for field, entries in mappings.items()
+        }
+        reviewed = {field: entries for field, entries in reviewed.items() if entries}
+        if reviewed:
+            digest.update(json.dumps(reviewed, sort_keys=True).encode())
+    return digest.hexdigest()
+
+def file_fingerprint(path, previous=None):
+    """
+    Size, mtime and content hash of an input file.
+
+    The content hash is reused from previous when size and mtime haven't changed, so an
+    unchanged input costs a stat() rather than a full read.
+    """
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+        fingerprint['sha256'] = previous['sha256']
+    else:
+        fingerprint['sha256'] = hash_file(path)
+    return fingerprint
+
+def table_fingerprint(db_path, table_name):
+    """
+    Row count and row-hash total of a loaded table, or None if the database or table is missing.
+    """
+    if not db_path or not os.path.exists(db_path):
+        return None
+    with get_engine(db_path).connect() as connection:
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :table_name"
+        ), {'table_name': table_name}).fetchone()
+        if exists is None:
+            return None
+        rows, hash_total = connection.execute(text(f'SELECT COUNT(*), TOTAL(row_hash) FROM "{table_name}"')).fetchone()
+    return {'rows': rows, 'row_hash_total': hash_total}
+
+class TransformManifest:
+    """
+    Record of the inputs the last successful run transformed, and the outputs it wrote.
+
+    Entries are keyed by absolute input path. An input is unchanged when its content hash
+    and the transform code version both match its entry and the processed output still
+    exists. New entries only reach disk when save() is called, which run_etl does after the
+    load stage succeeds, so a failed load is retried on the next run.
+
+    Inputs with a load target also need the target table to still hold what the last load
+    left there (same row count and row-hash total), so a deleted, rebuilt or restored
+    database is loaded again even though its inputs haven't changed.
+
+    Parameters:
+    path (str): Manifest file, PROCESSED_DATA_PATH/transform_manifest.json if not given.
+    load_targets (dict): {input path: (db_path, table_name)} the inputs are loaded into.
+    """
+
+    def __init__(self, path=None, load_targets=None):
+        self.path = path or os.path.join(os.getenv('PROCESSED_DATA_PATH', '.'), MANIFEST_FILE_NAME)
+        self.version = transform_code_version()
+        self.load_targets = {
+            os.path.abspath(input_path): target for input_path, target in (load_targets or {}).items()
+        }
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path) as manifest_file:
+                self.entries = json.load(manifest_file).get('inputs', {})
+
+    def check(self, input_path, output_path):
+        """
+        Fingerprint an input and compare it against its manifest entry.
+
+        Returns:
+        tuple: (unchanged, fingerprint)
+        """
+        key = os.path.abspath(input_path)
+        entry = self.entries.get(key)
+        fingerprint = file_fingerprint(input_path, previous=entry)
+        unchanged = (
+            entry is not None
+            and entry['sha256'] == fingerprint['sha256']
+            and entry.get('transform_version') == self.version
+            and entry.get('output_path') == os.path.abspath(output_path)
+            and os.path.exists(output_path)
+        )
+        target = self.load_targets.get(key)
+        if unchanged and target is not None:
+            loaded = entry.get('load')
+            unchanged = (
+                loaded is not None
+                and loaded.get('db_path') == os.path.abspath(target[0])
+                and loaded.get('table_name') == target[1]
+                and loaded.get('table') == table_fingerprint(*target)
+            )
+        return unchanged, fingerprint
+
+    def record(self, input_path, fingerprint, output_path):
+        self.entries[os.path.abspath(input_path)] = {
+            **fingerprint,
+            'transform_version': self.version,
+            'output_path': os.path.abspath(output_path),
+        }
+
+    def record_load(self, input_path):
+        """
+        Remember the state of an input's target table after it was loaded.
+        """
+        key = os.path.abspath(input_path)
+        db_path, table_name = self.load_targets[key]
+        if key in self.entries:
+            self.entries[key]['load'] = {
+                'db_path': os.path.abspath(db_path),
+                'table_name': table_name,
+                'table': table_fingerprint(db_path, table_name),
+            }
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as manifest_file:
+            json.dump({'inputs': self.entries}, manifest_file, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.path)
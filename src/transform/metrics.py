@@ -0,0 +1,192 @@
+import sys
+import os
+
+# Add the root directory of the project to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+import pyarrow as pa
+from sqlalchemy import text
+from dotenv import load_dotenv
+from src.utils.db_utils import get_engine, to_sql_parameters
+from src.utils.instrumentation import record
+from src.utils.schema import create_table_sql
+from src.load.load_stats import STATS_KEY, stats_db_path, read_season_stats
+
+load_dotenv()
+
+def _ratio(numerator, denominator):
+    """
+    numerator / denominator, NaN where the denominator is zero or null.
+    """
+    result = np.full(len(denominator), np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+# metric -> (stat columns or earlier metrics it needs, function of {name: float64 array}).
+# Every metric is whole-column arithmetic; a null input gives a null metric. Innings are
+# TotalOutsPitched / 3, so the per-9 rates use 27 outs.
+METRICS = {
+    'AVG': (('Hits', 'AtBats'), lambda c: _ratio(c['Hits'], c['AtBats'])),
+    'OBP': (('Hits', 'Walks', 'HitByPitch', 'AtBats', 'SacrificeFlies'), lambda c: _ratio(
+        c['Hits'] + c['Walks'] + c['HitByPitch'], c['AtBats'] + c['Walks'] + c['HitByPitch'] + c['SacrificeFlies']
+    )),
+    'SLG': (('Hits', 'Doubles', 'Triples', 'HomeRuns', 'AtBats'), lambda c: _ratio(
+        c['Hits'] + c['Doubles'] + 2 * c['Triples'] + 3 * c['HomeRuns'], c['AtBats']
+    )),
+    'OPS': (('OBP', 'SLG'), lambda c: c['OBP'] + c['SLG']),
+    'ERA': (('PitchingEarnedRuns', 'TotalOutsPitched'), lambda c: _ratio(27 * c['PitchingEarnedRuns'], c['TotalOutsPitched'])),
+    'WHIP': (('PitchingWalks', 'PitchingHits', 'TotalOutsPitched'), lambda c: _ratio(
+        3 * (c['PitchingWalks'] + c['PitchingHits']), c['TotalOutsPitched']
+    )),
+    'K9': (('PitchingStrikeouts', 'TotalOutsPitched'), lambda c: _ratio(27 * c['PitchingStrikeouts'], c['TotalOutsPitched'])),
+}
+
+# Suffix of the change since the player's previous season, e.g. OPS_delta
+DELTA_SUFFIX = '_delta'
+
+# The stored metrics, one row per player and season like the stats table
+METRICS_TABLE = 'player_season_metrics'
+METRICS_SCHEMA = pa.schema([
+    pa.field('PlayerID', pa.int32()),
+    pa.field('Season', pa.int16()),
+] + [pa.field(name, pa.float32()) for name in METRICS] + [
+    pa.field(f'{name}{DELTA_SUFFIX}', pa.float32()) for name in METRICS
+])
+
+def _with_dependencies(metrics):
+    """
+    The given metrics and the metrics they are computed from, in METRICS order.
+    """
+    names, pending = set(), list(metrics)
+    while pending:
+        name = pending.pop()
+        if name not in names:
+            names.add(name)
+            pending.extend(needed for needed in METRICS[name][0] if needed in METRICS)
+    return [name for name in METRICS if name in names]
+
+def stat_columns(metrics=None):
+    """
+    The season-stat columns the given metrics (all of them if not given) are computed from.
+    """
+    needed = []
+    for name in _with_dependencies(metrics or METRICS):
+        needed.extend(column for column in METRICS[name][0] if column not in METRICS and column not in needed)
+    return needed
+
+def previous_season_rows(stats):
+    """
+    Position of each row's previous-season row for the same player (and season type, if the
+    frame has one), or -1 where the player has no row for the season before.
+    """
+    player = stats['PlayerID'].to_numpy(dtype='float64', na_value=np.nan)
+    season = stats['Season'].to_numpy(dtype='float64', na_value=np.nan)
+    if 'SeasonType' in stats.columns:
+        season_type = stats['SeasonType'].to_numpy(dtype='float64', na_value=np.nan)
+    else:
+        season_type = np.zeros(len(stats))
+
+    order = np.lexsort((season, season_type, player))
+    current, before = order[1:], order[:-1]
+    follows = (
+        (player[current] == player[before])
+        & (season_type[current] == season_type[before])
+        & (season[current] == season[before] + 1)
+    )
+    previous = np.full(len(stats), -1)
+    previous[current[follows]] = before[follows]
+    return previous
+
+def compute_metrics(stats, metrics=None, deltas=True):
+    """
+    Compute derived batting and pitching metrics over a PlayerSeasonStats frame.
+
+    Each metric is a handful of NumPy operations over whole columns, so the cost is the
+    same few passes over memory whatever the number of rows. Divisions by a zero or null
+    denominator (no at-bats, no outs pitched) give NaN instead of raising or inf.
+
+    Parameters:
+    stats (DataFrame): Season stats with PlayerID, Season and the stat columns.
+    metrics (list): Names from METRICS to compute (with the metrics they build on), all of
+        them if not given. Metrics whose inputs the frame doesn't have are skipped.
+    deltas (bool): Also compute each metric's change since the player's previous season
+        (<name>_delta), NaN for a player's first season or after a gap.
+
+    Returns:
+    DataFrame: The key columns (PlayerID, Season and SeasonType if present) and one float32
+        column per metric, aligned with stats' index.
+    """
+    values = {}
+
+    def column(name):
+        if name not in values:
+            values[name] = stats[name].to_numpy(dtype='float64', na_value=np.nan)
+        return values[name]
+
+    computed = {}
+    for name in _with_dependencies(metrics or METRICS):
+        inputs, function = METRICS[name]
+        if any(needed not in computed and needed not in stats.columns for needed in inputs):
+            continue
+        arrays = {needed: computed[needed] if needed in computed else column(needed) for needed in inputs}
+        computed[name] = function(arrays)
+
+    if deltas and computed:
+        previous = previous_season_rows(stats)
+        has_previous = previous >= 0
+        for name in list(computed):
+            delta = np.full(len(stats), np.nan)
+            delta[has_previous] = computed[name][has_previous] - computed[name][previous[has_previous]]
+            computed[f'{name}{DELTA_SUFFIX}'] = delta
+
+    key_columns = [key for key in ('PlayerID', 'Season', 'SeasonType') if key in stats.columns]
+    return stats[key_columns].assign(**{name: array.astype('float32') for name, array in computed.items()})
+
+def update_season_metrics(db_path=None, seasons=None):
+    """
+    Recompute the stored metrics of some seasons from the stats table.
+
+    A season's deltas depend on the season before it, so the season after each given one is
+    recomputed too.
+
+    Parameters:
+    db_path (str): Database with the stats table, STATS_DB_PATH (or DB_PATH_PLAYERS) if not given.
+    seasons (list): Seasons whose stats changed, every season if not given.
+
+    Returns:
+    DataFrame: The metrics written.
+    """
+    db_path = db_path or stats_db_path()
+    affected, read_seasons = None, None
+    if seasons is not None:
+        affected = sorted({int(season) for season in seasons} | {int(season) + 1 for season in seasons})
+        read_seasons = sorted(set(affected) | {season - 1 for season in affected})
+
+    stats = read_season_stats(db_path, seasons=read_seasons, columns=list(STATS_KEY) + stat_columns())
+    metrics = compute_metrics(stats)
+    if affected is not None:
+        metrics = metrics[metrics['Season'].isin(affected)]
+
+    columns = METRICS_SCHEMA.names
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    rows = list(zip(*(to_sql_parameters(metrics[column]) for column in columns)))
+    with get_engine(db_path).begin() as connection:
+        connection.execute(text(create_table_sql(METRICS_TABLE, METRICS_SCHEMA, primary_key=STATS_KEY, without_rowid=True)))
+        if affected is None:
+            connection.execute(text(f'DELETE FROM "{METRICS_TABLE}"'))
+        elif affected:
+            season_list = ', '.join(str(season) for season in affected)
+            connection.execute(text(f'DELETE FROM "{METRICS_TABLE}" WHERE "Season" IN ({season_list})'))
+        if rows:
+            connection.exec_driver_sql(
+                f'INSERT INTO "{METRICS_TABLE}" ({column_list}) VALUES ({", ".join("?" * len(columns))})', rows
+            )
+
+    record(rows_in=len(stats), rows_out=len(metrics))
+    print(f"Wrote metrics for {len(metrics)} player seasons to the '{METRICS_TABLE}' table.")
+    return metrics
+
+if __name__ == "__main__":
+    # python src/transform/metrics.py [season ...]  -> recompute the stored metrics (all seasons by default)
+    update_season_metrics(seasons=[int(season) for season in sys.argv[1:]] or None)
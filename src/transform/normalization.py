@@ -0,0 +1,205 @@
+import json
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Reviewable mapping file: spellings the tables below don't know are added here with a
+# null target; filling in the target makes later runs apply it
+LOCATION_MAPPINGS_PATH = os.getenv(
+    'LOCATION_MAPPINGS_PATH', os.path.join(PROJECT_ROOT, 'data', 'mappings', 'location_mappings.json')
+)
+
+# Misspelled country names, keyed by their stripped lowercase form
+COUNTRY_MAPPING = {
+    'domincan republic': 'Dominican Republic',
+    'dominican rublic': 'Dominican Republic',
+    'dominincan republic': 'Dominican Republic',
+    'domininican republic': 'Dominican Republic',
+    'domican republic': 'Dominican Republic',
+    'dominicon republic': 'Dominican Republic',
+    'dominican repuplic': 'Dominican Republic',
+    'domnican republic': 'Dominican Republic',
+    'venezula': 'Venezuela',
+    'venezuala': 'Venezuela',
+    'venezeula': 'Venezuela',
+    'venequela': 'Venezuela',
+    'columbia': 'Colombia',
+    'puerto rico': 'Puerto Rico',
+    'usa`': 'USA',
+    'az': 'USA',
+    'ca': 'USA'
+}
+
+# Country names (after title-casing) that are accepted without review
+KNOWN_COUNTRIES = {
+    'Usa', 'Dominican Republic', 'Venezuela', 'Cuba', 'Puerto Rico', 'Mexico', 'Colombia',
+    'Canada', 'Japan', 'Panama', 'Curacao', 'Nicaragua', 'South Korea', 'Korea', 'Taiwan',
+    'Australia', 'Aruba', 'Bahamas', 'Brazil', 'Germany', 'Netherlands', 'Honduras',
+    'Peru', 'Jamaica', 'Virgin Islands', 'Italy', 'United Kingdom', 'Lithuania',
+    'South Africa', 'Czech Republic', 'China', 'Saudi Arabia', 'Philippines', 'Guam',
+    'American Samoa', 'Belgium', 'Spain', 'France', 'Ireland', 'Russia', 'Cayman Islands'
+}
+
+US_STATES = {
+    'ALABAMA': 'AL', 'ALASKA': 'AK', 'ARIZONA': 'AZ', 'ARKANSAS': 'AR', 'CALIFORNIA': 'CA',
+    'COLORADO': 'CO', 'CONNECTICUT': 'CT', 'DELAWARE': 'DE', 'FLORIDA': 'FL', 'GEORGIA': 'GA',
+    'HAWAII': 'HI', 'IDAHO': 'ID', 'ILLINOIS': 'IL', 'INDIANA': 'IN', 'IOWA': 'IA',
+    'KANSAS': 'KS', 'KENTUCKY': 'KY', 'LOUISIANA': 'LA', 'MAINE': 'ME', 'MARYLAND': 'MD',
+    'MASSACHUSETTS': 'MA', 'MICHIGAN': 'MI', 'MINNESOTA': 'MN', 'MISSISSIPPI': 'MS', 'MISSOURI': 'MO',
+    'MONTANA': 'MT', 'NEBRASKA': 'NE', 'NEVADA': 'NV', 'NEW HAMPSHIRE': 'NH', 'NEW JERSEY': 'NJ',
+    'NEW MEXICO': 'NM', 'NEW YORK': 'NY', 'NORTH CAROLINA': 'NC', 'NORTH DAKOTA': 'ND', 'OHIO': 'OH',
+    'OKLAHOMA': 'OK', 'OREGON': 'OR', 'PENNSYLVANIA': 'PA', 'RHODE ISLAND': 'RI', 'SOUTH CAROLINA': 'SC',
+    'SOUTH DAKOTA': 'SD', 'TENNESSEE': 'TN', 'TEXAS': 'TX', 'UTAH': 'UT', 'VERMONT': 'VT',
+    'VIRGINIA': 'VA', 'WASHINGTON': 'WA', 'WEST VIRGINIA': 'WV', 'WISCONSIN': 'WI', 'WYOMING': 'WY'
+}
+
+# Full state names and known abbreviation typos, keyed by their stripped uppercase form
+STATE_MAPPING = {
+    **US_STATES,
+    'CAL': 'CA',
+    'USA': 'US'
+}
+
+KNOWN_STATES = set(US_STATES.values()) | {'DC', 'US'}
+
+def load_reviewed_mappings(field, path=LOCATION_MAPPINGS_PATH):
+    """
+    Return the reviewed (non-null) entries for a field from the mapping file.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as mapping_file:
+        mappings = json.load(mapping_file)
+    return {raw: target for raw, target in mappings.get(field, {}).items() if target is not None}
+
+# field -> unknown values while collect_unknown_values is running, None otherwise
+_collected_unknown = None
+
+@contextmanager
+def collect_unknown_values():
+    """
+    Gather the unknown values found in this process into a dict (field -> list of values)
+    instead of writing them to the mapping file.
+
+    Used in worker processes, which would otherwise race each other rewriting the file; the
+    parent passes them on with record_unknown_values.
+    """
+    global _collected_unknown
+    previous, _collected_unknown = _collected_unknown, {}
+    try:
+        yield _collected_unknown
+    finally:
+        _collected_unknown = previous
+
+def record_unknown_values(field, values, path=LOCATION_MAPPINGS_PATH):
+    """
+    Add spellings nobody has mapped yet to the mapping file with a null target, for review.
+    """
+    if not values:
+        return
+    if _collected_unknown is not None:
+        collected = _collected_unknown.setdefault(field, [])
+        collected.extend(value for value in dict.fromkeys(values) if value not in collected)
+        return
+    if not path:
+        return
+    mappings = {}
+    if os.path.exists(path):
+        with open(path) as mapping_file:
+            mappings = json.load(mapping_file)
+    pending = mappings.setdefault(field, {})
+    new_values = [value for value in values if value not in pending]
+    if not new_values:
+        return
+    for value in new_values:
+        pending[value] = None
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as mapping_file:
+        json.dump(mappings, mapping_file, indent=4, sort_keys=True)
+    os.replace(tmp_path, path)
+    print(f"Added {len(new_values)} unknown {field} values to {path} for review: {sorted(new_values)}")
+
+def canonicalize_uniques(uniques, normalize, table, known, field, finalize=None):
+    """
+    Map each distinct raw value to its canonical form.
+
+    Parameters:
+    uniques (array): Distinct non-null raw values.
+    normalize (callable): Turns a raw value into its lookup key (e.g. strip + lower).
+    table (dict): Canonicalization table keyed by normalized values.
+    known (set): Canonical values accepted without review.
+    field (str): Column name, used for the mapping file.
+    finalize (callable): Applied to every looked-up value (e.g. title-casing).
+
+    Returns:
+    list: Canonical value per unique, in the same order.
+    """
+    table = {**table, **load_reviewed_mappings(field)}
+    finalize = finalize or (lambda value: value)
+
+    canonical = []
+    unknown = []
+    for raw in uniques:
+        key = normalize(raw) if isinstance(raw, str) else raw
+        value = finalize(table.get(key, key)) if isinstance(key, str) else key
+        if key not in table and value not in known:
+            unknown.append(key)
+        canonical.append(value)
+
+    record_unknown_values(field, unknown)
+    return canonical
+
+def _to_categorical(codes, values):
+    """
+    Build a categorical from per-row codes into a list of (possibly repeated) values.
+    """
+    categories = pd.Index(pd.unique(pd.Series(values, dtype=object).dropna()))
+    value_codes = categories.get_indexer(pd.Index(values, dtype=object))
+    # Code -1 (missing) maps to the extra trailing -1
+    value_codes = np.append(value_codes, -1)
+    return pd.Categorical.from_codes(value_codes[codes], categories=categories)
+
+def normalize_countries(series):
+    """
+    Canonicalize birth countries, working on the distinct values only.
+
+    Returns:
+    Categorical: Title-cased canonical country names (e.g. 'Dominican Republic', 'Usa').
+    """
+    codes, uniques = pd.factorize(series)
+    canonical = canonicalize_uniques(
+        uniques, lambda value: value.strip().lower(), COUNTRY_MAPPING, KNOWN_COUNTRIES,
+        'BirthCountry', finalize=str.title
+    )
+    return _to_categorical(codes, canonical)
+
+def normalize_states(series, mask):
+    """
+    Canonicalize birth states for the rows in mask, leaving the other rows as they are.
+
+    Returns:
+    Categorical: Two-letter state codes for the masked rows, original values elsewhere.
+    """
+    codes, uniques = pd.factorize(series)
+    mask = np.asarray(mask, dtype=bool)
+
+    # Only canonicalize the distinct values that actually occur in masked rows
+    masked_codes = np.unique(codes[mask & (codes >= 0)])
+    canonical = list(uniques)
+    for code, value in zip(masked_codes, canonicalize_uniques(
+        uniques[masked_codes], lambda value: value.strip().upper(), STATE_MAPPING, KNOWN_STATES, 'BirthState'
+    )):
+        canonical[code] = value
+
+    # Masked and unmasked rows with the same raw value can end up different, so unmasked
+    # rows point at the raw values appended after the canonical ones
+    values = canonical + list(uniques)
+    row_codes = np.where(mask | (codes < 0), codes, codes + len(uniques))
+    row_codes = np.where(codes < 0, len(values), row_codes)
+    return _to_categorical(row_codes, values)
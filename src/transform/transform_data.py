@@ -1,85 +1,43 @@
-import pandas as pd
+import sys
 import os
+
+# Add the root directory of the project to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 from dotenv import load_dotenv
+from src.utils.player_io import iter_players, read_players, write_players, write_players_chunked
+from src.utils.schema import apply_dtypes
+from src.transform.normalization import normalize_countries, normalize_states, collect_unknown_values, record_unknown_values
+from src.transform.manifest import TransformManifest
+from src.utils.instrumentation import collect, record
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Below this combined input size transform_data stays serial: process startup would cost
+# more than cleaning the files
+TRANSFORM_PARALLEL_MIN_BYTES = int(os.getenv('TRANSFORM_PARALLEL_MIN_BYTES', 8 * 1024 * 1024))
+
 def clean_country_names(df):
-    # Define a mapping of incorrect country names to correct ones
-    country_mapping = {
-        'domincan republic': 'Dominican Republic',
-        'dominican rublic': 'Dominican Republic',
-        'dominincan republic': 'Dominican Republic',
-        'domininican republic': 'Dominican Republic',
-        'domican republic': 'Dominican Republic',
-        'dominicon republic': 'Dominican Republic',
-        'dominican repuplic': 'Dominican Republic',
-        'domnican republic': 'Dominican Republic',
-        'venezula': 'Venezuela',
-        'venezuala': 'Venezuela',
-        'venezeula': 'Venezuela',
-        'venequela': 'Venezuela',
-        'columbia': 'Colombia',
-        'puerto rico': 'Puerto Rico',
-        'usa`': 'USA',
-        'az': 'USA',
-        'ca': 'USA'
-    }
-
-    # Strip whitespace and convert to lowercase
-    df['BirthCountry'] = df['BirthCountry'].str.strip().str.lower()
-
-    # Replace incorrect country names with correct ones
-    df['BirthCountry'] = df['BirthCountry'].replace(country_mapping)
-
-    # Convert back to title case for consistency
-    df['BirthCountry'] = df['BirthCountry'].str.title()
+    """
+    Canonicalize BirthCountry (misspellings, stray characters, casing) into a category column.
 
+    Only the distinct values are cleaned, see src/transform/normalization.py.
+    """
+    df['BirthCountry'] = normalize_countries(df['BirthCountry'])
     return df
 
 def clean_state_labels(df):
-    # Define a mapping of full state names to their abbreviations
-    state_mapping = {
-        'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
-        'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
-        'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
-        'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
-        'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
-        'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
-        'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
-        'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
-        'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
-        'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
-    }
-
-    # Apply cleaning only to players born in the USA
-    usa_players = df['BirthCountry'] == 'Usa'
-
-    # Strip whitespace and convert to uppercase
-    df.loc[usa_players, 'BirthState'] = df.loc[usa_players, 'BirthState'].str.strip().str.upper()
-
-    # Replace full state names with abbreviations
-    df.loc[usa_players, 'BirthState'] = df.loc[usa_players, 'BirthState'].replace(state_mapping)
-    
-    additional_mapping = {
-        'NORTH CAROLINA': 'NC',
-        'FLORIDA': 'FL',
-        'PENNSYLVANIA': 'PA',
-        'UTAH': 'UT',
-        'ARKANSAS': 'AR',
-        'NEW MEXICO': 'NM',
-        'CALIFORNIA': 'CA',
-        'SOUTH CAROLINA': 'SC',
-        'OKLAHOMA': 'OK',
-        'NEW YORK': 'NY',
-        'KENTUCKY': 'KY',
-        'CAL': 'CA',
-        'USA': 'US'
-    }
-
-    df.loc[usa_players, 'BirthState'] = df.loc[usa_players, 'BirthState'].replace(additional_mapping)
+    """
+    Canonicalize BirthState to two-letter codes for players born in the USA, as a category column.
 
+    Full state names and known typos ('CAL', 'USA') are mapped; other countries' states are kept as is.
+    """
+    usa_players = df['BirthCountry'] == 'Usa'
+    df['BirthState'] = normalize_states(df['BirthState'], usa_players)
     return df
 
 
@@ -91,13 +49,6 @@ def clean_data(df):
     critical_columns = ['PlayerID', 'FirstName', 'LastName', 'BirthDate']
     df.dropna(subset=critical_columns, inplace=True)
 
-    # Convert data types
-    df['BirthDate'] = pd.to_datetime(df['BirthDate'], errors='coerce')  # Convert BirthDate column to datetime
-    if 'ProDebut' in df.columns:
-        df['ProDebut'] = pd.to_datetime(df['ProDebut'], errors='coerce')  # Convert ProDebut column to datetime
-    df['PlayerID'] = df['PlayerID'].astype(str)  # Ensure PlayerID is a string
-
-
     # Clean country names
     df = clean_country_names(df)
         # Clean state labels
@@ -115,38 +66,170 @@ def clean_data(df):
     ]
     df.drop(columns=columns_to_drop, inplace=True, errors='ignore')
 
+    # Convert the declared columns to their compact dtypes (src/utils/schema.py): Int32 IDs,
+    # matching the INTEGER PlayerID column, categories, float32 height/weight and datetime dates
+    return apply_dtypes(df)
+
+def processed_output_path(file_path, processed_dir, processed_format=None):
+    """
+    Path of the processed file for an input: same name in processed_dir, with the input's
+    extension unless processed_format overrides it.
+    """
+    file_name, extension = os.path.splitext(os.path.basename(file_path))
+    if processed_format:
+        extension = f'.{processed_format}'
+    return f'{processed_dir}/{file_name}{extension}'
+
+def transform_file(file_path, processed_dir=None, processed_format=None, save=True, chunksize=None):
+    """
+    Read, clean and (optionally) save a single input file.
+
+    Module-level so it can run in a worker process; the cleaned frame is returned to the caller.
+    With chunksize the file is streamed through clean_data chunk by chunk and appended to the
+    processed file instead, and the processed file's path is returned.
+    """
+    # Extract the file name from the file path
+    file_name = os.path.splitext(os.path.basename(file_path))[0]
+    output_path = processed_output_path(file_path, processed_dir, processed_format)
+
+    if chunksize:
+        # clean_data only looks at one row at a time, so cleaning chunk by chunk gives the
+        # same rows as cleaning the whole file
+        cleaned_chunks = (_clean_counted(chunk) for chunk in iter_players(file_path, chunksize))
+        rows = write_players_chunked(cleaned_chunks, output_path)
+        print(f"Processed and saved: {file_name} ({rows} rows in chunks of {chunksize})")
+        return output_path
+
+    # Load the CSV or Parquet file into a DataFrame
+    raw_data = read_players(file_path)
+
+    # Clean the data
+    cleaned_data = _clean_counted(raw_data)
+
+    if save:
+        # Save the cleaned data for the load stage
+        write_players(cleaned_data, output_path)
+        print(f"Processed and saved: {file_name}")
+    else:
+        print(f"Processed: {file_name}")
+
+    return cleaned_data
+
+def _clean_counted(df):
+    rows_in = len(df)
+    cleaned_data = clean_data(df)
+    record(rows_in=rows_in, rows_out=len(cleaned_data))
+    return cleaned_data
+
+def _transform_file_in_worker(*args):
+    """
+    transform_file for the process pool, returning the worker's instrumentation counters
+    and the location spellings it didn't know along with the result, so the parent can add
+    them to its run report and be the only process writing the mapping file.
+    """
+    with collect() as counters, collect_unknown_values() as unknown_values:
+        result = transform_file(*args)
+    return result, counters, unknown_values
+
+def should_run_parallel(file_paths, max_workers, min_bytes=TRANSFORM_PARALLEL_MIN_BYTES):
+    """
+    Use the process pool only when there are several files and enough data that
+    worker startup and pickling the results back won't dominate the run.
+    """
+    if max_workers <= 1 or len(file_paths) < 2:
+        return False
+    total_bytes = sum(os.path.getsize(file_path) for file_path in file_paths if os.path.exists(file_path))
+    return total_bytes >= min_bytes
+
+def transform_data(file_paths, save=True, max_workers=None, chunksize=None, manifest=None):
+    """
+    Clean each input file and (optionally) save the result to PROCESSED_DATA_PATH.
+
+    Files are cleaned in a process pool, one file (or partition) per task, when there are
+    several of them and their combined size is at least TRANSFORM_PARALLEL_MIN_BYTES;
+    smaller inputs are cleaned serially in this process.
+
+    Parameters:
+    file_paths (list): CSV or Parquet files to transform.
+    save (bool): Write the processed files; pass False when the caller loads the
+        returned DataFrames straight away.
+    max_workers (int): Worker processes, TRANSFORM_MAX_WORKERS (or the CPU count) if not given.
+        1 always runs serially.
+    chunksize (int): Stream each file through clean_data in chunks of this many rows, so
+        memory is bounded by the chunk size rather than the file size. Requires save.
+    manifest (TransformManifest): Skip inputs whose content and transform code haven't
+        changed since the manifest was last saved; transformed inputs are recorded in it
+        and the caller saves it once their data has been loaded. Requires save.
+
+    Returns:
+    list: The cleaned DataFrames in input order, or the processed file paths when streaming.
+        Inputs skipped by the manifest are None.
+    """
+    if (chunksize or manifest is not None) and not save:
+        raise ValueError("Chunked and incremental transforms need save=True.")
 
-    return df
-
-def transform_data(file_paths):
     processed_dir = os.getenv('PROCESSED_DATA_PATH')
-    os.makedirs(processed_dir, exist_ok=True)
-    
-    transformed_data_list = []
+    if save:
+        os.makedirs(processed_dir, exist_ok=True)
 
+    # 'parquet' or 'csv'; by default each output keeps the format of its input
+    processed_format = os.getenv('PROCESSED_DATA_FORMAT')
+
+    if max_workers is None:
+        max_workers = int(os.getenv('TRANSFORM_MAX_WORKERS', os.cpu_count() or 1))
+
+    valid_paths = []
     for file_path in file_paths:
         if file_path is None:
             print("Error: One of the file paths is not set in the environment variables.")
             continue
+        valid_paths.append(file_path)
+
+    # Fingerprint the inputs up front and leave the unchanged ones out of the work list
+    pending_paths = valid_paths
+    fingerprints = {}
+    if manifest is not None:
+        pending_paths = []
+        for file_path in valid_paths:
+            output_path = processed_output_path(file_path, processed_dir, processed_format)
+            unchanged, fingerprints[file_path] = manifest.check(file_path, output_path)
+            if unchanged:
+                print(f"Unchanged since the last run, skipped: {os.path.basename(file_path)}")
+            else:
+                pending_paths.append(file_path)
+
+    if not should_run_parallel(pending_paths, max_workers):
+        results = [
+            transform_file(file_path, processed_dir, processed_format, save, chunksize)
+            for file_path in pending_paths
+        ]
+    else:
+        # Executor.map yields the results in input order regardless of which worker finishes first
+        workers = min(max_workers, len(pending_paths))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = []
+            for result, counters, unknown_values in executor.map(
+                _transform_file_in_worker,
+                pending_paths,
+                repeat(processed_dir),
+                repeat(processed_format),
+                repeat(save),
+                repeat(chunksize),
+            ):
+                record(**counters)
+                for field, values in unknown_values.items():
+                    record_unknown_values(field, values)
+                results.append(result)
+
+    record(files_skipped=len(valid_paths) - len(pending_paths))
+    transformed = dict(zip(pending_paths, results))
+    if manifest is not None:
+        for file_path in pending_paths:
+            manifest.record(file_path, fingerprints[file_path],
+                            processed_output_path(file_path, processed_dir, processed_format))
+
+    return [transformed.get(file_path) for file_path in valid_paths]
 
-        # Load the CSV into a DataFrame
-        raw_data = pd.read_csv(file_path)
-
-        # Clean the data
-        cleaned_data = clean_data(raw_data)
-
-        # Extract the file name from the file path
-        file_name = os.path.basename(file_path).replace('.csv', '')
-
-        # Save the cleaned data to a new CSV file
-        cleaned_data.to_csv(f'{processed_dir}/{file_name}.csv', index=False)
-
-        print(f"Processed and saved: {file_name}")
-        
-                # Append the cleaned data to the list
-        transformed_data_list.append(cleaned_data)
-
-    return transformed_data_list
 #Example usage
 if __name__ == "__main__":
     # List of file paths to process
@@ -155,4 +238,14 @@ if __name__ == "__main__":
         os.getenv('CLEANED_PLAYERS_DATA_PATH')
     ]
     
-    transform_data(file_paths)
\ No newline at end of file
+    # python src/transform/transform_data.py stream [chunksize]  -> bounded-memory chunked transform
+    if len(sys.argv) > 1 and sys.argv[1] == 'stream':
+        chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else int(os.getenv('TRANSFORM_CHUNK_SIZE', 100000))
+        transform_data(file_paths, chunksize=chunksize)
+    # python src/transform/transform_data.py incremental  -> only transform new or changed inputs
+    elif len(sys.argv) > 1 and sys.argv[1] == 'incremental':
+        manifest = TransformManifest()
+        transform_data(file_paths, manifest=manifest)
+        manifest.save()
+    else:
+        transform_data(file_paths)
\ No newline at end of file
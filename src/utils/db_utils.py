@@ -1,5 +1,66 @@
 # filepath: /c:/Users/Mitch/Desktop/data-engineering-project/src/utils/db_utils.py
-from sqlalchemy import create_engine
+import os
+
+import pandas as pd
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+from src.utils.instrumentation import count_sql_statement
+
+# Applied to every new SQLite connection. WAL lets readers (notebooks, history queries) keep
+# reading while a load writes; synchronous=NORMAL is durable in WAL mode at a fraction of the
+# fsyncs; the negative cache_size is in KiB
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024)) * -1,
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
+# One engine per database file, shared by every module in the process
+_engines = {}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f'PRAGMA {pragma} = {value}')
+    cursor.close()
+
+def get_engine(db_path):
+    """
+    Return the shared engine for a SQLite database file, creating it on first use.
+
+    Connections are pooled and configured with SQLITE_PRAGMAS when they are opened.
+
+    Parameters:
+    db_path (str): Path to the SQLite database file.
+
+    Returns:
+    engine: SQLAlchemy engine object.
+    """
+    key = os.path.abspath(db_path)
+    engine = _engines.get(key)
+    if engine is None:
+        engine = create_engine(
+            f'sqlite:///{key}',
+            poolclass=QueuePool,
+            connect_args={'check_same_thread': False},
+        )
+        event.listen(engine, 'connect', _set_sqlite_pragmas)
+        # Statement counts for the run report of the stage that is running, if any
+        event.listen(engine, 'before_cursor_execute', count_sql_statement)
+        _engines[key] = engine
+    return engine
+
+def dispose_engines():
+    """
+    Close the pooled connections of every shared engine (e.g. before forking or deleting a file).
+    """
+    for engine in _engines.values():
+        engine.dispose()
+    _engines.clear()
 
 def get_db_connection(db_config):
     """
@@ -11,12 +72,18 @@ def get_db_connection(db_config):
     Returns:
     engine: SQLAlchemy engine object.
     """
-    database = db_config['database']
-    
-    connection_string = f"sqlite:///{database}"
-    engine = create_engine(connection_string)
-    
-    return engine
+    return get_engine(db_config['database'])
+
+def to_sql_parameters(series):
+    """
+    Convert a column to a list of plain Python values sqlite3 can bind, with NULLs as None.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Same text format to_sql writes, so updated and appended rows compare alike
+        values = series.dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+    else:
+        values = series.astype(object)
+    return values.where(series.notna(), None).tolist()
 
 def execute_query(engine, query):
     with engine.connect() as connection:
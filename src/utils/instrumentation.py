@@ -0,0 +1,326 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# One JSON report per run is written here
+REPORT_DIR = os.getenv('ETL_REPORT_DIR', os.path.join(PROJECT_ROOT, 'data', 'reports'))
+
+# Comma-separated stage names to run under cProfile, or '*' for every stage
+PROFILE_STAGES = os.getenv('ETL_PROFILE_STAGES', '')
+
+# Seconds between resident memory samples while a stage runs
+MEMORY_SAMPLE_INTERVAL = float(os.getenv('ETL_MEMORY_SAMPLE_INTERVAL', '0.05'))
+
+# Functions listed in a stage's report when it is profiled
+PROFILE_TOP_FUNCTIONS = 15
+
+# Stages currently recording, innermost last; counters go to the innermost one. A plain
+# list rather than a context variable so ingest worker threads record into it too.
+_active = []
+_lock = threading.Lock()
+
+def _current_rss():
+    """
+    Resident set size of this process in bytes, None where it can't be read.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _max_rss():
+    """
+    Highest resident set size this process has reached, in bytes.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+class _MemorySampler:
+    """
+    Background thread keeping the highest resident memory seen while a stage runs.
+
+    ru_maxrss is exact but process-wide: when it grows during a stage, that stage set
+    the process peak and its value is used; otherwise the sampled peak is.
+    """
+
+    def __init__(self, interval=MEMORY_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = _current_rss() or 0
+        self._max_rss_before = _max_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _current_rss() or 0)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss() or 0)
+        max_rss_after = _max_rss()
+        if max_rss_after is not None and self._max_rss_before is not None and max_rss_after > self._max_rss_before:
+            self.peak = max_rss_after
+        return self.peak or None
+
+def _add_counters(counters, values):
+    for name, value in values.items():
+        if value is None:
+            continue
+        if name.endswith('_max'):
+            counters[name] = max(counters.get(name, value), value)
+        else:
+            counters[name] = counters.get(name, 0) + value
+
+def record(**counters):
+    """
+    Add to the counters of the stage that is running, e.g. record(rows_in=len(df)).
+
+    Counters are summed, except names ending in _max which keep the largest value. A no-op
+    when no stage is running, so library code can call it unconditionally.
+    """
+    if not _active:
+        return
+    with _lock:
+        if _active:
+            _add_counters(_active[-1], counters)
+
+def record_file_read(path):
+    if _active and path and os.path.exists(path):
+        record(files_read=1, bytes_read=os.path.getsize(path))
+
+def record_file_written(path):
+    if _active and path and os.path.exists(path):
+        record(files_written=1, bytes_written=os.path.getsize(path))
+
+def record_http(seconds, status_code=None, retry=False, size=0):
+    """
+    Count one HTTP request (one attempt) and its latency.
+    """
+    record(
+        http_requests=1, http_retries=int(retry), http_errors=int(status_code not in (200, 304)),
+        http_seconds=seconds, http_seconds_max=seconds, http_bytes=size,
+    )
+
+def count_sql_statement(conn, cursor, statement, parameters, context, executemany):
+    """
+    SQLAlchemy before_cursor_execute listener counting statements and executemany parameter sets.
+    """
+    if _active:
+        record(sql_statements=1, sql_parameter_sets=len(parameters) if executemany else 1)
+
+@contextmanager
+def collect():
+    """
+    Gather the counters recorded in this process into a dict, without a run report.
+
+    Used in worker processes, whose counters the parent then passes on with record(**counters).
+    """
+    counters = {}
+    with _lock:
+        _active.append(counters)
+    try:
+        yield counters
+    finally:
+        with _lock:
+            _active.remove(counters)
+
+def _profile_summary(profiler, limit=PROFILE_TOP_FUNCTIONS):
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    summary = []
+    for (file_name, line, function), (_, calls, total, cumulative, _) in sorted(
+        stats.stats.items(), key=lambda item: item[1][3], reverse=True
+    )[:limit]:
+        if file_name.startswith(PROJECT_ROOT):
+            file_name = os.path.relpath(file_name, PROJECT_ROOT)
+        summary.append({
+            'function': f'{file_name}:{line}({function})',
+            'calls': calls,
+            'total_seconds': round(total, 6),
+            'cumulative_seconds': round(cumulative, 6),
+        })
+    return summary
+
+class RunReport:
+    """
+    Structured metrics for one pipeline run: wall time, rows and bytes in and out, HTTP
+    latency and retries, peak resident memory and SQL statement counts, per stage.
+
+    Stages are recorded with the stage() context manager. Code running inside a stage adds
+    to its counters with record() and friends; SQL statements on the shared engines (see
+    src/utils/db_utils.get_engine) are counted automatically.
+
+    Parameters:
+    name (str): Name of the run, e.g. 'run_etl'.
+    report_dir (str): Where save() writes the JSON report, REPORT_DIR if not given.
+    profile_stages (str or list): Stages to run under cProfile (comma-separated or '*'),
+        ETL_PROFILE_STAGES if not given. The .prof file is saved next to the report and
+        the slowest functions are listed in the report.
+    """
+
+    def __init__(self, name, report_dir=None, profile_stages=None):
+        self.name = name
+        self.run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.report_dir = report_dir or REPORT_DIR
+        profile_stages = PROFILE_STAGES if profile_stages is None else profile_stages
+        if isinstance(profile_stages, str):
+            profile_stages = [stage.strip() for stage in profile_stages.split(',') if stage.strip()]
+        self.profile_stages = set(profile_stages)
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self.status = 'running'
+        self.stages = []
+        self._start = time.perf_counter()
+        self._wall_seconds = None
+        self._profiling = False
+
+    def _should_profile(self, stage):
+        return not self._profiling and ('*' in self.profile_stages or stage in self.profile_stages)
+
+    @contextmanager
+    def stage(self, name, **counters):
+        """
+        Record one stage; yields its counters dict, which the caller may also add to.
+        """
+        stage_counters = dict(counters)
+        entry = {'stage': name, 'status': 'ok', 'counters': stage_counters}
+        with _lock:
+            _active.append(stage_counters)
+        sampler = _MemorySampler().start()
+        profiler = None
+        if self._should_profile(name):
+            profiler = cProfile.Profile()
+            self._profiling = True
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield stage_counters
+        except BaseException as error:
+            entry['status'] = 'failed'
+            entry['error'] = repr(error)
+            raise
+        finally:
+            entry['wall_seconds'] = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+                entry['profile'] = self._save_profile(name, profiler)
+            entry['peak_rss_bytes'] = sampler.stop()
+            with _lock:
+                _active.remove(stage_counters)
+            self.stages.append(entry)
+
+    def _save_profile(self, stage, profiler):
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, f'{self.run_id}_{stage}.prof')
+        profiler.dump_stats(path)
+        return {'path': path, 'top_functions': _profile_summary(profiler)}
+
+    def stage_timings(self):
+        return {entry['stage']: entry['wall_seconds'] for entry in self.stages}
+
+    def finish(self, status='succeeded'):
+        self.status = status
+        self.finished_at = datetime.now()
+        self._wall_seconds = time.perf_counter() - self._start
+
+    def totals(self):
+        """
+        Counters summed over the stages, leaving out rows_in and rows_out: the same rows flow
+        through every stage, so their sum would mean nothing.
+        """
+        totals = {}
+        for entry in self.stages:
+            _add_counters(totals, {name: value for name, value in entry['counters'].items()
+                                   if name not in ('rows_in', 'rows_out')})
+        return totals
+
+    def to_dict(self):
+        peaks = [entry['peak_rss_bytes'] for entry in self.stages if entry.get('peak_rss_bytes')]
+        return {
+            'run_id': self.run_id,
+            'name': self.name,
+            'status': self.status,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'wall_seconds': self._wall_seconds if self._wall_seconds is not None else time.perf_counter() - self._start,
+            'peak_rss_bytes': max(peaks) if peaks else None,
+            'pid': os.getpid(),
+            'totals': self.totals(),
+            'stages': self.stages,
+        }
+
+    def save(self, path=None):
+        """
+        Write the report as JSON, by default to <report_dir>/<run_id>.json.
+        """
+        path = path or os.path.join(self.report_dir, f'{self.run_id}.json')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as report_file:
+            json.dump(self.to_dict(), report_file, indent=4, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    def append_to_db(self, db_path):
+        """
+        Append the report as one row of the etl_runs table of a SQLite database.
+        """
+        from sqlalchemy import text
+        from src.utils.db_utils import get_engine
+
+        report = self.to_dict()
+        with get_engine(db_path).begin() as connection:
+            connection.execute(text('''
+                CREATE TABLE IF NOT EXISTS etl_runs (
+                    run_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    started_at DATETIME NOT NULL,
+                    finished_at DATETIME,
+                    wall_seconds REAL,
+                    peak_rss_bytes INTEGER,
+                    report TEXT
+                )
+            '''))
+            connection.execute(text('''
+                INSERT INTO etl_runs (run_id, name, status, started_at, finished_at, wall_seconds, peak_rss_bytes, report)
+                VALUES (:run_id, :name, :status, :started_at, :finished_at, :wall_seconds, :peak_rss_bytes, :report)
+            '''), {
+                **{key: report[key] for key in ('run_id', 'name', 'status', 'started_at', 'finished_at',
+                                                'wall_seconds', 'peak_rss_bytes')},
+                'report': json.dumps(report, default=str),
+            })
+
+    def print_summary(self):
+        for entry in self.stages:
+            counters = entry['counters']
+            details = ', '.join(f'{name}={value:.3f}' if isinstance(value, float) else f'{name}={value}'
+                                for name, value in sorted(counters.items()))
+            peak = entry.get('peak_rss_bytes')
+            peak = f'{peak / 1e6:8.1f} MB' if peak else ' ' * 11
+            print(f"{entry['stage']:<24}{entry['wall_seconds']:8.3f}s {peak}  {details}")
+        print(f"{'total':<24}{sum(self.stage_timings().values()):8.3f}s")
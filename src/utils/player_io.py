@@ -0,0 +1,195 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.instrumentation import record_file_read, record_file_written
+from src.utils.schema import PLAYER_SCHEMA, apply_dtypes, coerce_column
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() == '.parquet'
+
+def _to_arrow_array(series, arrow_type):
+    """
+    Convert a column to the declared Arrow type, treating unparseable values as null.
+    """
+    if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type):
+        return pa.array(coerce_column(series, pa.field(series.name, arrow_type)), type=arrow_type, from_pandas=True)
+    if pa.types.is_date(arrow_type) or pa.types.is_timestamp(arrow_type):
+        dates = pd.to_datetime(series, errors='coerce')
+        return pa.array(dates, from_pandas=True).cast(arrow_type, safe=False)
+    # Categorical columns are widened to object first. The copy's astype(str) can overwrite its
+    # nulls with 'None', so the null mask comes from the original column
+    text_values = series.astype(object).astype(str)
+    return pa.array(text_values.where(series.notna(), None), type=arrow_type, from_pandas=True)
+
+def _read_csv(path, columns, schema, **kwargs):
+    """
+    read_csv with the declared columns read as text and parsed by apply_dtypes, so their
+    dtypes never depend on which values a particular file or chunk happens to contain.
+    """
+    declared = {field.name: str for field in schema}
+    result = pd.read_csv(path, usecols=columns, dtype=declared, **kwargs)
+    frames = result if kwargs.get('chunksize') else [result]
+    for df in frames:
+        yield apply_dtypes(df, schema)
+
+def _table_to_frame(table, schema):
+    df = table.to_pandas(
+        types_mapper={pa.int64(): pd.Int64Dtype(), pa.int32(): pd.Int32Dtype()}.get,
+        date_as_object=False,
+    )
+    return apply_dtypes(df, schema)
+
+def _write_csv(df, path_or_file, schema, header=True):
+    # Declared date columns are always written as plain dates, so the text doesn't depend on
+    # whether some other row in the same write happens to carry a time of day
+    date_columns = [field.name for field in schema if pa.types.is_date(field.type) and field.name in df.columns]
+    if date_columns:
+        df = df.assign(**{
+            column: pd.to_datetime(df[column], errors='coerce').dt.strftime('%Y-%m-%d')
+            for column in date_columns
+        })
+    df.to_csv(path_or_file, index=False, header=header)
+
+def to_player_table(df, schema=PLAYER_SCHEMA):
+    """
+    Convert a player frame to an Arrow table, casting the declared columns to their schema types.
+
+    Parameters:
+    df (DataFrame): Player data.
+    schema (Schema): Declared Arrow schema.
+
+    Returns:
+    Table: Arrow table with the frame's columns in their original order.
+    """
+    arrays = []
+    fields = []
+    for column in df.columns:
+        if column in schema.names:
+            field = schema.field(column)
+            arrays.append(_to_arrow_array(df[column], field.type))
+        else:
+            try:
+                array = pa.array(df[column], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Mixed object columns are kept as text
+                array = _to_arrow_array(df[column], pa.string())
+            field = pa.field(column, array.type)
+            arrays.append(array)
+        fields.append(field)
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+def write_players(df, path, schema=PLAYER_SCHEMA):
+    """
+    Write a player frame for the next stage: typed Parquet for .parquet paths, CSV otherwise.
+
+    Parameters:
+    df (DataFrame or list): Player data.
+    path (str): Destination file.
+    schema (Schema): Declared Arrow schema for Parquet output (and the CSV date columns).
+    """
+    df = df if isinstance(df, pd.DataFrame) else pd.DataFrame(df)
+    if _is_parquet(path):
+        pq.write_table(to_player_table(df, schema), path)
+    else:
+        _write_csv(df, path, schema)
+    record_file_written(path)
+
+def write_players_chunked(frames, path, schema=PLAYER_SCHEMA):
+    """
+    Write player frames one after another to a single file, without holding them all in memory.
+
+    Parquet output gets one row group per frame, with the column types fixed by the first
+    frame; CSV output gets a single header. The file is written under a temporary name and
+    only moved into place once every frame has been written.
+
+    Parameters:
+    frames (iterable): DataFrames with the same columns.
+    path (str): Destination file.
+    schema (Schema): Declared Arrow schema.
+
+    Returns:
+    int: Number of rows written.
+    """
+    tmp_path = f'{path}.tmp'
+    rows = 0
+    writer = None
+    try:
+        if _is_parquet(path):
+            for df in frames:
+                table = to_player_table(df, schema)
+                if writer is None:
+                    # A column that is all null in the first frame would otherwise be typed null
+                    pinned = pa.schema([
+                        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                        for field in table.schema
+                    ])
+                    writer = pq.ParquetWriter(tmp_path, pinned)
+                writer.write_table(table.cast(writer.schema))
+                rows += len(df)
+            if writer is None:
+                pq.write_table(to_player_table(pd.DataFrame(columns=schema.names), schema), tmp_path)
+        else:
+            with open(tmp_path, 'w', newline='') as csv_file:
+                for df in frames:
+                    _write_csv(df, csv_file, schema, header=csv_file.tell() == 0)
+                    rows += len(df)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if writer is not None:
+        writer.close()
+    os.replace(tmp_path, path)
+    record_file_written(path)
+    return rows
+
+def read_players(path, columns=None, schema=PLAYER_SCHEMA):
+    """
+    Read a player file written by write_players.
+
+    Declared columns come back in their compact dtypes (see src/utils/schema.py): nullable
+    Int32 IDs, categories, float32 height and weight, datetime64 dates. Parquet files need no
+    text parsing for this; CSV files are parsed into the same dtypes.
+
+    Parameters:
+    path (str): File to read.
+    columns (list): Columns to read, all of them if not given.
+    schema (Schema): Declared Arrow schema.
+
+    Returns:
+    DataFrame: The player data.
+    """
+    record_file_read(path)
+    if not _is_parquet(path):
+        return next(_read_csv(path, columns, schema))
+    return _table_to_frame(pq.read_table(path, columns=columns), schema)
+
+def iter_players(path, chunksize, columns=None, schema=PLAYER_SCHEMA):
+    """
+    Read a player file in chunks of at most chunksize rows.
+
+    Each chunk has the same dtypes read_players would give the whole file for the declared
+    columns. Undeclared CSV columns are inferred per chunk by pandas.
+
+    Parameters:
+    path (str): File to read.
+    chunksize (int): Rows per chunk (Parquet files are read in record batches of this size).
+    columns (list): Columns to read, all of them if not given.
+    schema (Schema): Declared Arrow schema.
+
+    Yields:
+    DataFrame: The next chunk of player data.
+    """
+    record_file_read(path)
+    if not _is_parquet(path):
+        yield from _read_csv(path, columns, schema, chunksize=chunksize)
+        return
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield _table_to_frame(pa.Table.from_batches([batch]), schema)
@@ -0,0 +1,213 @@
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+
+# Every player and season-stat column is declared once here. The Arrow type is what
+# Parquet files store; the pandas dtype (derived from the Arrow type, or 'category' where
+# the field says so) is what readers, clean_data and the loaders hand around; the SQL type
+# is what the DDL declares. Frames may carry extra columns (e.g. raw API fields that
+# clean_data drops later); those keep their inferred types.
+
+def category(name):
+    """
+    A text column with few distinct values, held as a pandas category.
+    """
+    return pa.field(name, pa.string(), metadata={'dtype': 'category'})
+
+PLAYER_SCHEMA = pa.schema([
+    pa.field('PlayerID', pa.int32()),
+    pa.field('SportsDataID', pa.string()),
+    category('Status'),
+    pa.field('TeamID', pa.int32()),
+    category('Team'),
+    pa.field('Jersey', pa.int32()),
+    category('PositionCategory'),
+    category('Position'),
+    pa.field('MLBAMID', pa.int32()),
+    pa.field('FirstName', pa.string()),
+    pa.field('LastName', pa.string()),
+    category('BatHand'),
+    category('ThrowHand'),
+    pa.field('Height', pa.float32()),
+    pa.field('Weight', pa.float32()),
+    pa.field('BirthDate', pa.date32()),
+    pa.field('BirthCity', pa.string()),
+    category('BirthState'),
+    category('BirthCountry'),
+    pa.field('HighSchool', pa.string()),
+    pa.field('College', pa.string()),
+    pa.field('ProDebut', pa.date32()),
+    pa.field('Experience', pa.int32()),
+    category('RosterTeam'),
+])
+
+# PlayerSeasonStats: one row per player, season and season type. Counting and rate stats
+# fit float32 (the API sends most of them as decimals)
+STATS_SCHEMA = pa.schema([
+    pa.field('StatID', pa.int32()),
+    pa.field('TeamID', pa.int32()),
+    pa.field('PlayerID', pa.int32()),
+    pa.field('SeasonType', pa.int16()),
+    pa.field('Season', pa.int16()),
+    pa.field('Name', pa.string()),
+    category('Team'),
+    category('Position'),
+    category('PositionCategory'),
+    pa.field('GlobalTeamID', pa.int32()),
+] + [pa.field(name, pa.float32()) for name in [
+    'Games', 'Started', 'AtBats', 'Runs', 'Hits', 'Singles', 'Doubles', 'Triples', 'HomeRuns',
+    'RunsBattedIn', 'BattingAverage', 'Outs', 'Strikeouts', 'Walks', 'HitByPitch', 'Sacrifices',
+    'SacrificeFlies', 'GroundIntoDoublePlay', 'StolenBases', 'CaughtStealing', 'PitchesSeen',
+    'OnBasePercentage', 'SluggingPercentage', 'OnBasePlusSlugging', 'Errors', 'Wins', 'Losses',
+    'Saves', 'InningsPitchedDecimal', 'TotalOutsPitched', 'InningsPitchedFull', 'InningsPitchedOuts',
+    'EarnedRunAverage', 'PitchingHits', 'PitchingRuns', 'PitchingEarnedRuns', 'PitchingWalks',
+    'PitchingStrikeouts', 'PitchingHomeRuns', 'PitchesThrown', 'WalksHitsPerInningsPitched',
+]] + [
+    pa.field('Updated', pa.timestamp('ns')),
+])
+
+def pandas_dtype(field):
+    """
+    The pandas dtype a declared column is held in.
+    """
+    metadata = field.metadata or {}
+    if b'dtype' in metadata:
+        return metadata[b'dtype'].decode()
+    if pa.types.is_integer(field.type):
+        # Nullable integers, e.g. 'Int32'
+        return f'Int{field.type.bit_width}'
+    if pa.types.is_floating(field.type):
+        return f'float{field.type.bit_width}'
+    if pa.types.is_date(field.type) or pa.types.is_timestamp(field.type):
+        return 'datetime64[ns]'
+    return 'object'
+
+def sql_type(field):
+    """
+    The SQLite column type of a declared column. Dates are stored as text, as to_sql writes them.
+    """
+    if pa.types.is_integer(field.type):
+        return 'INTEGER'
+    if pa.types.is_floating(field.type):
+        return 'REAL'
+    return 'TEXT'
+
+def coerce_column(series, field):
+    """
+    Convert a column to the pandas dtype of its declared field.
+
+    Values that can't be converted become null instead of raising: text in a numeric
+    column, a fraction in an integer column, an unparseable date.
+    """
+    dtype = pandas_dtype(field)
+    if str(series.dtype) == dtype:
+        return series
+    if dtype.startswith('Int'):
+        numbers = pd.to_numeric(series, errors='coerce')
+        if pd.api.types.is_float_dtype(numbers):
+            numbers = numbers.where(numbers % 1 == 0)
+        return numbers.astype(dtype)
+    if dtype.startswith('float'):
+        return pd.to_numeric(series, errors='coerce').astype(dtype)
+    if dtype == 'datetime64[ns]':
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series.astype(dtype)
+        return pd.to_datetime(series, format='ISO8601', errors='coerce')
+    if dtype == 'category':
+        return series.astype('category')
+    return series
+
+def apply_dtypes(df, schema=PLAYER_SCHEMA):
+    """
+    Convert the declared columns of a frame to their compact dtypes, e.g. Int32 IDs,
+    category Team/Position/Status and float32 Height/Weight.
+
+    Returns:
+    DataFrame: The frame with its declared columns converted; other columns untouched.
+    """
+    return df.assign(**{
+        field.name: coerce_column(df[field.name], field) for field in schema if field.name in df.columns
+    })
+
+def create_table_sql(table_name, schema=PLAYER_SCHEMA, primary_key=None, extra_columns=(), without_rowid=False):
+    """
+    CREATE TABLE IF NOT EXISTS statement for a table with the declared columns.
+
+    Parameters:
+    table_name (str): Table to create.
+    schema (Schema): Declared columns.
+    primary_key (str or tuple): Column to declare as the primary key, or the columns of a
+        composite key (declared NOT NULL).
+    extra_columns (list): (name, definition) pairs placed before the declared columns.
+    without_rowid (bool): Store the rows in primary key order (needs a primary key).
+
+    Returns:
+    str: The DDL statement.
+    """
+    key_columns = [primary_key] if isinstance(primary_key, str) else list(primary_key or ())
+    definitions = [f'{name} {definition}' for name, definition in extra_columns]
+    for field in schema:
+        definition = f'{field.name} {sql_type(field)}'
+        if len(key_columns) == 1 and field.name == key_columns[0]:
+            definition += ' PRIMARY KEY'
+        elif field.name in key_columns:
+            definition += ' NOT NULL'
+        definitions.append(definition)
+    if len(key_columns) > 1:
+        definitions.append(f"PRIMARY KEY ({', '.join(key_columns)})")
+    columns = ',\n    '.join(definitions)
+    options = ' WITHOUT ROWID' if without_rowid else ''
+    return f'CREATE TABLE IF NOT EXISTS "{table_name}" (\n    {columns}\n){options}'
+
+def memory_report(df, schema=PLAYER_SCHEMA):
+    """
+    Per-column memory of a frame before and after apply_dtypes.
+
+    Returns:
+    DataFrame: column, dtype and bytes before and after, and the bytes saved, with a
+        total row at the end.
+    """
+    compact = apply_dtypes(df, schema)
+    rows = []
+    for column in df.columns:
+        before = int(df[column].memory_usage(index=False, deep=True))
+        after = int(compact[column].memory_usage(index=False, deep=True))
+        rows.append({
+            'column': column, 'dtype_before': str(df[column].dtype), 'bytes_before': before,
+            'dtype_after': str(compact[column].dtype), 'bytes_after': after, 'bytes_saved': before - after,
+        })
+    report = pd.DataFrame(rows)
+    total = report[['bytes_before', 'bytes_after', 'bytes_saved']].sum()
+    return pd.concat([report, pd.DataFrame([{'column': 'total', 'dtype_before': '', 'dtype_after': '', **total}])],
+                     ignore_index=True)
+
+def print_memory_report(frames, schema=PLAYER_SCHEMA):
+    """
+    Print the memory saved by the compact dtypes for each named frame.
+
+    Parameters:
+    frames (dict): {name: DataFrame} with the frames as read without the declared dtypes.
+    """
+    for name, df in frames.items():
+        report = memory_report(df, schema)
+        before, after = report.iloc[-1]['bytes_before'], report.iloc[-1]['bytes_after']
+        print(f"{name}: {len(df)} rows, {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB "
+              f"({1 - after / max(before, 1):.0%} smaller)")
+        with pd.option_context('display.width', 200, 'display.max_rows', None):
+            print(report.to_string(index=False))
+
+if __name__ == "__main__":
+    # python src/utils/schema.py memory <file> [<file> ...] [--stats]
+    # Reads each CSV or Parquet file with plain pandas and shows what the declared dtypes save
+    if len(sys.argv) > 2 and sys.argv[1] == 'memory':
+        paths = [path for path in sys.argv[2:] if path != '--stats']
+        schema = STATS_SCHEMA if '--stats' in sys.argv else PLAYER_SCHEMA
+        frames = {}
+        for path in paths:
+            if os.path.splitext(path)[1].lower() == '.parquet':
+                frames[os.path.basename(path)] = pd.read_parquet(path)
+            else:
+                frames[os.path.basename(path)] = pd.read_csv(path)
+        print_memory_report(frames, schema)